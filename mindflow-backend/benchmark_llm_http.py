@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+LLM transport benchmark: per-call latency to an OpenAI-compatible endpoint
+with and without the shared keep-alive client from ``src.llm.http``.
+
+Each call is ``GET /models`` through the ``openai`` SDK, so the numbers are
+transport overhead (connect, TLS, request) rather than generation time.
+Compares:
+
+- fresh: a new SDK client per call, as the separate route-level clients
+  did, paying a new TCP (and TLS) handshake each time
+- shared: every call on the pooled client ``OpenAIProvider`` now uses
+
+Calls are spaced by ``--interval`` seconds; with the SDK's default pool an
+idle connection is dropped after 5 s, the shared pool keeps it for
+``LLM_KEEPALIVE_EXPIRY`` (default 60 s).
+
+Usage::
+
+    python benchmark_llm_http.py                                   # OpenAI, needs OPENAI_API_KEY
+    python benchmark_llm_http.py --base-url http://localhost:11434/v1   # Ollama
+    python benchmark_llm_http.py --base-url http://localhost:1234/v1 --calls 50 --interval 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from openai import OpenAI
+from src.llm.http import get_http_client, http_client_status, llm_timeout
+
+
+def measure(make_client, calls, interval):
+    """Latencies of *calls* ``models.list()`` requests, in milliseconds"""
+    latencies = []
+    for i in range(calls):
+        if i and interval:
+            time.sleep(interval)
+        client = make_client()
+        start = time.perf_counter()
+        client.models.list()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label, latencies):
+    # The first call opens the connection in both modes
+    steady = latencies[1:] or latencies
+    print(f"  {label:<7} first {latencies[0]:8.1f} ms   median {statistics.median(steady):8.1f} ms   "
+          f"mean {statistics.mean(steady):8.1f} ms")
+    return statistics.median(steady)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default=os.environ.get('OPENAI_API_BASE') or None,
+                        help='endpoint (default OPENAI_API_BASE, else the OpenAI API)')
+    parser.add_argument('--api-key', default=os.environ.get('OPENAI_API_KEY') or 'lm-studio',
+                        help='API key (default OPENAI_API_KEY; local servers accept any)')
+    parser.add_argument('--calls', type=int, default=20, help='calls per mode (default 20)')
+    parser.add_argument('--interval', type=float, default=0, help='seconds between calls (default 0)')
+    args = parser.parse_args()
+
+    kwargs = {'api_key': args.api_key, 'base_url': args.base_url}
+    shared = OpenAI(http_client=get_http_client(args.base_url), timeout=llm_timeout(), **kwargs)
+
+    status = http_client_status()
+    print(f"{args.base_url or 'https://api.openai.com/v1'}: {args.calls} calls, {args.interval:g} s apart; "
+          f"http2 {'on' if status['http2_available'] and status['http2_enabled'] else 'off'}")
+    fresh_ms = report('fresh', measure(lambda: OpenAI(**kwargs), args.calls, args.interval))
+    shared_ms = report('shared', measure(lambda: shared, args.calls, args.interval))
+    print(f"  saved   {fresh_ms - shared_ms:8.1f} ms per call ({fresh_ms / shared_ms:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
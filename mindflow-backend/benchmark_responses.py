@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Response benchmark: serialization time and transfer size of the
+``/api/stakeholders`` and ``/api/tasks`` list payloads.
+
+Seeds a throw-away SQLite database, builds each payload the way its route
+does (one page of ``to_dict`` rows) and compares:
+
+- serialization: Flask's default provider (stdlib ``json``, the previous
+  behaviour) against ``OrjsonProvider``
+- transfer: identity against gzip and brotli as applied by
+  ``init_compression``
+
+Usage::
+
+    python benchmark_responses.py
+    python benchmark_responses.py --rows 5000 --limit 500 --repeat 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from src.models.db import db
+from src.models.user import User
+from src.models.task import Task
+from src.models.stakeholder import Stakeholder
+from src.models.note import Note  # noqa: F401 - mapped by User relationships
+from src.models.enhanced_task import EnhancedTask  # noqa: F401
+from src.models.stakeholder_relationship import StakeholderRelationship  # noqa: F401
+from src.pagination import priority_rank
+from src.responses import OrjsonProvider, available_encodings, compress, orjson
+
+
+def create_app(database_url):
+    """Create Flask app bound to the benchmark database"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(rows):
+    """Insert *rows* stakeholders and tasks for one user, with realistic text lengths"""
+    now = datetime.utcnow()
+    db.session.add(User(id=1, username='bench', email='bench@example.com'))
+    db.session.flush()
+    db.session.bulk_insert_mappings(Stakeholder, [{
+        'user_id': 1,
+        'name': f'Person {i}',
+        'role': ['Engineer', 'Manager', 'Director', 'Designer'][i % 4],
+        'company': f'Company {i % 50}',
+        'department': ['Sales', 'R&D', 'Finance'][i % 3],
+        'email': f'person{i}@company{i % 50}.example.com',
+        'phone': f'+41 79 {i:07d}',
+        'personal_notes': 'Prefers short meetings, follow up by email after each call. ' * 2,
+        'job_title': 'Senior Product Manager',
+        'specializations': 'strategy, roadmaps, pricing',
+        'location': 'Zurich',
+        'timezone': 'Europe/Zurich',
+        'tags': 'partner, q3, renewal',
+        'created_at': now - timedelta(days=i % 400),
+        'updated_at': now - timedelta(days=i % 30),
+        'last_contact': now - timedelta(days=i % 60),
+    } for i in range(rows)])
+    db.session.bulk_insert_mappings(Task, [{
+        'user_id': 1,
+        'title': f'Follow up with Person {i} about the proposal',
+        'description': 'Send the revised numbers and schedule a review call. ' * 2,
+        'due_date': (now + timedelta(days=i % 45)).strftime('%Y-%m-%d'),
+        'priority': ['low', 'medium', 'high'][i % 3],
+        'completed': i % 4 == 0,
+        'board_column': ['todo', 'in_progress', 'done'][i % 3],
+        'status': ['todo', 'in_progress', 'done'][i % 3],
+        'board_rank': f'i{i:06d}',
+        'created_at': now - timedelta(hours=i),
+        'updated_at': now - timedelta(minutes=i),
+    } for i in range(rows)])
+    db.session.commit()
+
+
+def payloads(limit):
+    """The first page of each list route, as the routes build it"""
+    stakeholders = Stakeholder.query.filter_by(user_id=1).order_by(Stakeholder.name, Stakeholder.id).limit(limit).all()
+    tasks = Task.query.filter_by(user_id=1).order_by(
+        priority_rank(Task.priority), Task.created_at, Task.id
+    ).limit(limit).all()
+    return {
+        '/api/stakeholders': {'stakeholders': [s.to_dict() for s in stakeholders], 'next_cursor': None},
+        '/api/tasks': {'tasks': [t.to_dict() for t in tasks], 'next_cursor': None},
+    }
+
+
+def timed(fn, repeat):
+    """Best of *repeat* runs, in milliseconds"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='rows per table (default 2000)')
+    parser.add_argument('--limit', type=int, default=500, help='page size (default 500, the maximum)')
+    parser.add_argument('--repeat', type=int, default=20, help='timing runs per measurement (default 20)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        with app.app_context():
+            db.create_all()
+            seed(args.rows)
+            pages = payloads(args.limit)
+
+            legacy, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+            print(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}; encodings: {', '.join(available_encodings())}")
+            for path, page in pages.items():
+                # The stdlib provider cannot serialize datetimes as ISO strings; give it the old isoformat() output
+                legacy_page = fast.loads(fast.dumps(page))
+                with app.test_request_context(path):
+                    legacy_ms, _ = timed(lambda: legacy.response(legacy_page).get_data(), args.repeat)
+                    fast_ms, body = timed(lambda: fast.response(page).get_data(), args.repeat)
+                rows = len(next(iter(page.values())))
+                print(f"\n{path} ({rows} rows, {len(body):,} bytes)")
+                print(f"  serialize  json {legacy_ms:7.2f} ms   orjson {fast_ms:7.2f} ms   ({legacy_ms / fast_ms:.1f}x)")
+                for encoding in available_encodings()[::-1]:
+                    ms, compressed = timed(lambda: compress(body, encoding), args.repeat)
+                    print(f"  {encoding:<5}      {len(compressed):>9,} bytes  {len(compressed) / len(body):6.1%}   {ms:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
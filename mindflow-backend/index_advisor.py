@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Index advisor: EXPLAIN the hot route queries against a seeded database and
+report every table scan that the composite indexes do not cover.
+
+By default a throw-away SQLite database is created and seeded, so the
+script is safe to run anywhere.  Point it at a scratch PostgreSQL database
+with ``--database-url`` to check the Postgres planner instead (the database
+is seeded with synthetic rows, never use a production URL).
+
+Usage::
+
+    python index_advisor.py                     # temporary SQLite database
+    python index_advisor.py --rows 20000
+    python index_advisor.py --database-url postgresql://localhost/mindflow_scratch
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask import Flask
+from src.models.db import db
+from src.models.user import User
+from src.models.task import Task
+from src.models.stakeholder import Stakeholder
+from src.models.note import Note
+from src.models.enhanced_task import EnhancedTask, TaskCategory
+from src.models.stakeholder_relationship import StakeholderRelationship, StakeholderInteraction
+from src.migrations import ensure_schema
+from src.pagination import priority_rank
+
+
+def create_app(database_url):
+    """Create Flask app bound to the advisor database"""
+    app = Flask(__name__)
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(user_id, rows):
+    """Insert *rows* synthetic rows per table for one user plus a noisy neighbour"""
+    now = datetime.utcnow()
+    columns = ['todo', 'in_progress', 'review', 'done']
+    priorities = ['low', 'medium', 'high', 'urgent']
+    for owner in (user_id, user_id + 1):
+        db.session.add(User(id=owner, username=f'advisor{owner}', email=f'advisor{owner}@example.com'))
+    db.session.flush()
+
+    for owner in (user_id, user_id + 1):
+        stakeholders = [
+            Stakeholder(user_id=owner, name=f'Person {i}', company=f'Company {i % 50}',
+                        sentiment=random.choice(['positive', 'neutral', 'negative']),
+                        influence=random.randint(1, 10))
+            for i in range(max(rows // 10, 10))
+        ]
+        db.session.add_all(stakeholders)
+        db.session.flush()
+        for i in range(rows):
+            column = random.choice(columns)
+            db.session.add(Task(
+                user_id=owner, title=f'Task {i}', priority=random.choice(priorities[:3]),
+                due_date=(now + timedelta(days=random.randint(-30, 30))).strftime('%Y-%m-%d'),
+                board_column=column, board_position=i, status=column,
+                created_at=now - timedelta(minutes=i),
+            ))
+            db.session.add(EnhancedTask(
+                user_id=owner, title=f'Enhanced {i}', priority=random.choice(priorities),
+                status=column, board_column=column, board_position=i,
+                due_date=now + timedelta(days=random.randint(-30, 30)),
+                created_at=now - timedelta(minutes=i),
+            ))
+            db.session.add(Note(
+                user_id=owner, content=f'Note {i}', category=random.choice(['general', 'meeting', 'idea']),
+                stakeholder_id=random.choice(stakeholders).id, created_at=now - timedelta(minutes=i),
+            ))
+            db.session.add(StakeholderInteraction(
+                user_id=owner, stakeholder_id=random.choice(stakeholders).id,
+                interaction_type='meeting', title=f'Meeting {i}',
+                interaction_date=now - timedelta(hours=i),
+            ))
+            if i % 5 == 0:
+                a, b = random.sample(stakeholders, 2)
+                db.session.add(StakeholderRelationship(
+                    user_id=owner, source_stakeholder_id=a.id, target_stakeholder_id=b.id,
+                    relationship_type='colleague', is_active=i % 10 != 0,
+                ))
+        db.session.flush()
+    db.session.commit()
+
+
+def route_queries(user_id):
+    """The queries issued by the hot list routes, keyed by route name"""
+    now = datetime.utcnow()
+    return {
+        'tasks.get_tasks': Task.query.filter_by(user_id=user_id)
+            .order_by(priority_rank(Task.priority), Task.created_at, Task.id),
+        'tasks.get_tasks (priority filter)': Task.query.filter_by(user_id=user_id, priority='high')
+            .order_by(priority_rank(Task.priority), Task.created_at, Task.id),
+        'tasks.move_task (rank neighbours)': db.session.query(Task.board_rank).filter(
+            Task.user_id == user_id, Task.board_column == 'todo')
+            .order_by(Task.board_rank, Task.id).offset(9).limit(2),
+        'enhanced_tasks.get_tasks': EnhancedTask.query.filter_by(user_id=user_id).order_by(
+            EnhancedTask.board_column, EnhancedTask.board_rank,
+            EnhancedTask.priority.desc(), EnhancedTask.due_date.asc().nullslast()),
+        'enhanced_tasks.get_kanban_board': EnhancedTask.query.filter(
+            EnhancedTask.user_id == user_id,
+            EnhancedTask.board_column.in_(['todo', 'in_progress', 'review', 'done']))
+            .order_by(EnhancedTask.board_column, EnhancedTask.board_rank, EnhancedTask.id),
+        'enhanced_tasks.get_task_analytics (overdue)': EnhancedTask.query.filter(
+            EnhancedTask.user_id == user_id, EnhancedTask.due_date < now,
+            EnhancedTask.status.notin_(['done', 'cancelled'])),
+        'enhanced_tasks.get_task_analytics (done)': EnhancedTask.query.filter_by(
+            user_id=user_id, status='done'),
+        'enhanced_tasks.get_categories': TaskCategory.query.filter_by(
+            user_id=user_id, is_active=True).order_by(TaskCategory.sort_order, TaskCategory.name),
+        'notes.get_notes': Note.query.filter_by(user_id=user_id).order_by(Note.created_at.desc()),
+        'notes.get_notes (category filter)': Note.query.filter_by(
+            user_id=user_id, category='meeting').order_by(Note.created_at.desc()),
+        'stakeholders.get_stakeholders': Stakeholder.query.filter_by(user_id=user_id)
+            .order_by(Stakeholder.name),
+        'stakeholder_interactions.get_interactions': StakeholderInteraction.query.filter_by(
+            user_id=user_id).order_by(StakeholderInteraction.interaction_date.desc()),
+        'stakeholder_interactions.get_interactions (stakeholder filter)': StakeholderInteraction.query
+            .filter_by(user_id=user_id, stakeholder_id=1)
+            .order_by(StakeholderInteraction.interaction_date.desc()),
+        'stakeholder_relationships.get_relationships': StakeholderRelationship.query.filter_by(
+            user_id=user_id, is_active=True),
+        'ai_assistant._exec_list_tasks': Task.query.filter_by(user_id=user_id)
+            .order_by(Task.created_at.desc()),
+    }
+
+
+def explain(conn, query):
+    """Return the plan lines for a query on the current dialect"""
+    compiled = query.statement.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    sql = str(compiled)
+    if conn.dialect.name == 'sqlite':
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+        return [row[-1] for row in rows]
+    rows = conn.exec_driver_sql(f'EXPLAIN {sql}', compiled.params).fetchall()
+    return [row[0] for row in rows]
+
+
+def find_misses(dialect_name, plan):
+    """Classify plan lines into full scans (misses) and sorts the index does not serve"""
+    misses, sorts = [], []
+    for line in plan:
+        if dialect_name == 'sqlite':
+            if line.startswith('SCAN') and 'USING' not in line:
+                misses.append(line)
+            elif 'TEMP B-TREE' in line:
+                sorts.append(line)
+        else:
+            if 'Seq Scan' in line:
+                misses.append(line.strip())
+            elif line.strip().startswith('Sort'):
+                sorts.append(line.strip())
+    return misses, sorts
+
+
+def run_advisor(database_url, rows):
+    app = create_app(database_url)
+    user_id = 424242
+
+    with app.app_context():
+        print(f"🌱 Seeding {rows} rows per table into {db.engine.url.render_as_string(hide_password=True)}")
+        ensure_schema(db.engine)
+        seed(user_id, rows)
+
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql('ANALYZE')
+            if conn.dialect.name == 'postgresql':
+                # Ask "could an index serve this?" rather than "is a seq scan cheaper on this sample?"
+                conn.exec_driver_sql('SET enable_seqscan = off')
+
+            total_misses = 0
+            for route, query in route_queries(user_id).items():
+                plan = explain(conn, query)
+                misses, sorts = find_misses(conn.dialect.name, plan)
+                total_misses += len(misses)
+                status = '❌' if misses else ('⚠️ ' if sorts else '✅')
+                print(f"{status} {route}")
+                for line in plan:
+                    print(f"      {line}")
+                for line in misses:
+                    print(f"   ➜ full scan not covered by an index: {line}")
+                for line in sorts:
+                    print(f"   ➜ sort not served by an index: {line}")
+
+    print(f"\n{'❌' if total_misses else '✅'} {total_misses} uncovered scan(s)")
+    return total_misses == 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='Scratch database to seed (default: temporary SQLite file)')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows per table to seed (default: 2000)')
+    args = parser.parse_args()
+
+    if args.database_url:
+        ok = run_advisor(args.database_url, args.rows)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            ok = run_advisor(f"sqlite:///{os.path.join(tmp, 'advisor.db')}", args.rows)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,60 @@
+"""
+JSON serialization shared by the responses, the caches and the LLM layer.
+
+``json_dumps`` goes through orjson when it is installed and the standard
+library otherwise.  Datetimes and dates are written as ISO 8601 in both
+cases, which lets ``to_dict`` methods hand over datetime values as they
+are.  Nothing here depends on Flask; the Flask JSON provider built on it
+lives in ``src.responses``.
+
+Usage::
+
+    from src.jsonutil import json_dumps
+
+    json_dumps({"created_at": datetime.utcnow()})
+"""
+from __future__ import annotations
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def json_default(value):
+    """Serialize the types the standard library and orjson cannot"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def json_dumps(value, sort_keys: bool = False, indent: bool = False) -> str:
+    """``json.dumps`` with ISO datetimes, through orjson when available"""
+    return json_dumps_bytes(value, sort_keys, indent).decode('utf-8')
+
+
+def json_dumps_bytes(value, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """``json_dumps`` as UTF-8 bytes, without the decode/encode round trip"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, default=json_default, option=option)
+    return json.dumps(
+        value, default=json_default, sort_keys=sort_keys, ensure_ascii=False,
+        indent=2 if indent else None, separators=None if indent else (',', ':'),
+    ).encode('utf-8')
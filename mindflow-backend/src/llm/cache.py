@@ -0,0 +1,417 @@
+"""
+Exact-match response cache for deterministic LLM calls.
+
+Classification and extraction prompts run at low temperature and are
+often repeated verbatim: retried webhooks, duplicate emails, voice notes
+parsed twice.  ``CachingProvider`` wraps any ``LlmProvider`` and serves
+such calls from a cache keyed on a SHA-256 of the canonical request
+(backend, model, messages, tools and sampling parameters).
+
+A call is cached when it does not stream and either its temperature is at
+most ``CACHEABLE_MAX_TEMPERATURE`` (0.3) or the caller passes a
+``cache_site``.  The site selects the TTL (``SITE_TTLS``, overridable per
+site with ``LLM_CACHE_TTL_<SITE>``) and the bucket its hits and misses are
+counted in.
+
+Tiers:
+
+- an in-process LRU (``LLM_CACHE_MEMORY_ENTRIES``, default 1024) in front of
+- a persistent tier chosen by ``LLM_CACHE_BACKEND``: ``sqlite`` (a local
+  file at ``LLM_CACHE_PATH``; the default), ``redis`` (the default when
+  ``REDIS_URL`` is set), ``memory`` (no persistent tier) or ``off``.
+
+A failing persistent tier is logged and skipped; the call goes to the
+provider.
+
+Usage::
+
+    from src.llm.cache import CachingProvider, get_llm_cache
+
+    provider = CachingProvider(OpenAIProvider(...), get_llm_cache())
+    provider.chat_completion(messages, temperature=0.2, cache_site="classify")
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from src.llm.provider import ChatChunk, ChatResponse, LlmProvider, ToolCall
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_MAX_TEMPERATURE = 0.3
+DEFAULT_TTL = 24 * 3600
+MEMORY_CACHE_SIZE = 1024
+# Expired rows are swept from the SQLite file every this many stores
+SQLITE_PRUNE_EVERY = 500
+KEY_PREFIX = "mindflow:llm"
+
+DEFAULT_SQLITE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "database", "llm_cache.sqlite3"
+)
+
+# Seconds a response may be reused, per call site
+SITE_TTLS: Dict[str, int] = {
+    "default": DEFAULT_TTL,
+    "classify": 7 * 24 * 3600,
+    "extract": DEFAULT_TTL,
+    "summarise": DEFAULT_TTL,
+    # Profiles change slowly and the extraction prompt is expensive
+    "linkedin": 7 * 24 * 3600,
+}
+
+
+def site_ttl(site: str) -> int:
+    override = os.environ.get(f"LLM_CACHE_TTL_{site.upper()}")
+    if override:
+        return int(override)
+    return SITE_TTLS.get(site, SITE_TTLS["default"])
+
+
+# ------------------------------------------------------------------
+# Keys and serialization
+# ------------------------------------------------------------------
+
+def _canonical_default(value):
+    # SDK message objects (pydantic models) replayed into a conversation
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def request_key(namespace: str, model: Optional[str], messages: List[Any], params: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical request; identical requests to one backend share it."""
+    canonical = json.dumps(
+        {"backend": namespace, "model": model, "messages": messages, "params": params},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_canonical_default,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _encode(response: ChatResponse, expires_at: float) -> bytes:
+    # Token usage is left out: a cache hit spends no tokens and must not log any
+    return json.dumps({
+        "expires_at": expires_at,
+        "content": response.content,
+        "tool_calls": [
+            {"id": tc.id, "function_name": tc.function_name, "arguments": tc.arguments}
+            for tc in response.tool_calls
+        ],
+        "finish_reason": response.finish_reason,
+    }).encode("utf-8")
+
+
+def _decode(body: bytes) -> tuple:
+    data = json.loads(body)
+    response = ChatResponse(
+        content=data["content"],
+        tool_calls=[ToolCall(**tc) for tc in data["tool_calls"]],
+        finish_reason=data["finish_reason"],
+    )
+    return data["expires_at"], response
+
+
+# ------------------------------------------------------------------
+# Persistent tiers
+# ------------------------------------------------------------------
+
+class SqliteTier:
+    """
+    Responses in a local SQLite file, shared by the workers on one host.
+
+    Parameters
+    ----------
+    path : str
+        Database file; created with its directory on first use.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._stores = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, body BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connect().execute(
+            "SELECT body FROM llm_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, body: bytes, ttl: int) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, body, expires_at) VALUES (?, ?, ?)",
+                (key, body, now + ttl),
+            )
+            self._stores += 1
+            if self._stores % SQLITE_PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+
+
+class RedisTier:
+    """
+    Responses in Redis (``SETEX``), shared by every worker.
+
+    Parameters
+    ----------
+    url : str
+        Redis URL, e.g. ``REDIS_URL``.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("The redis package is required for LLM_CACHE_BACKEND=redis")
+        self._client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(f"{KEY_PREFIX}:{key}")
+
+    def set(self, key: str, body: bytes, ttl: int) -> None:
+        self._client.setex(f"{KEY_PREFIX}:{key}", ttl, body)
+
+
+# ------------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------------
+
+class LlmCache:
+    """
+    In-process LRU in front of an optional persistent tier, with per-site counters.
+
+    Parameters
+    ----------
+    tier : SqliteTier or RedisTier, optional
+        Shared tier consulted on memory misses.
+    max_entries : int
+        Least recently used responses are evicted from memory beyond this size.
+    """
+
+    def __init__(self, tier=None, max_entries: int = MEMORY_CACHE_SIZE):
+        self.tier = tier
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "memory_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+        )
+
+    def _count(self, site: str, counter: str) -> None:
+        with self._lock:
+            self._stats[site][counter] += 1
+
+    def _remember(self, key: str, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, site: str, key: str) -> Optional[ChatResponse]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+        if body is not None:
+            expires_at, response = _decode(body)
+            if expires_at > time.time():
+                self._count(site, "hits")
+                self._count(site, "memory_hits")
+                return response
+            with self._lock:
+                self._entries.pop(key, None)
+
+        if self.tier is not None:
+            try:
+                body = self.tier.get(key)
+            except Exception as exc:
+                logger.warning("LLM cache lookup failed (%s): %s", self.tier.name, exc)
+                self._count(site, "errors")
+                body = None
+            if body is not None:
+                expires_at, response = _decode(body)
+                if expires_at > time.time():
+                    self._remember(key, body)
+                    self._count(site, "hits")
+                    return response
+
+        self._count(site, "misses")
+        return None
+
+    def set(self, site: str, key: str, response: ChatResponse, ttl: int) -> None:
+        body = _encode(response, time.time() + ttl)
+        self._remember(key, body)
+        self._count(site, "stores")
+        if self.tier is not None:
+            try:
+                self.tier.set(key, body, ttl)
+            except Exception as exc:
+                logger.warning("LLM cache store failed (%s): %s", self.tier.name, exc)
+                self._count(site, "errors")
+
+    def get_status(self) -> dict:
+        with self._lock:
+            sites = {}
+            for site, stats in self._stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                sites[site] = dict(stats, hit_rate=round(stats["hits"] / lookups, 4) if lookups else None)
+            entries = len(self._entries)
+        hits = sum(stats["hits"] for stats in sites.values())
+        lookups = hits + sum(stats["misses"] for stats in sites.values())
+        return {
+            "backend": self.tier.name if self.tier else "memory",
+            "memory_entries": entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "sites": sites,
+        }
+
+
+_cache: Optional[LlmCache] = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def _build_cache() -> Optional[LlmCache]:
+    choice = os.environ.get("LLM_CACHE_BACKEND", "").strip().lower()
+    if not choice:
+        choice = "redis" if os.environ.get("REDIS_URL") else "sqlite"
+    if choice == "off":
+        return None
+
+    tier = None
+    try:
+        if choice == "redis":
+            tier = RedisTier(os.environ["REDIS_URL"])
+        elif choice == "sqlite":
+            tier = SqliteTier(os.environ.get("LLM_CACHE_PATH") or DEFAULT_SQLITE_PATH)
+    except Exception as exc:
+        logger.warning("LLM cache persistent tier (%s) unavailable, using memory only: %s", choice, exc)
+    max_entries = int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", MEMORY_CACHE_SIZE))
+    cache = LlmCache(tier, max_entries)
+    logger.info("LLM response cache: %s", cache.tier.name if cache.tier else "memory")
+    return cache
+
+
+def get_llm_cache() -> Optional[LlmCache]:
+    """The process-wide cache, configured from the environment on first use (None when off)."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        if not _cache_configured:
+            _cache = _build_cache()
+            _cache_configured = True
+        return _cache
+
+
+def llm_cache_status() -> dict:
+    cache = get_llm_cache()
+    return cache.get_status() if cache else {"backend": "off"}
+
+
+# ------------------------------------------------------------------
+# Provider wrapper
+# ------------------------------------------------------------------
+
+class CachingProvider(LlmProvider):
+    """
+    Serves cacheable ``chat_completion`` calls of *inner* from *cache*.
+
+    Parameters
+    ----------
+    inner : LlmProvider
+        The provider that answers misses and every other call.
+    cache : LlmCache
+    """
+
+    def __init__(self, inner: LlmProvider, cache: LlmCache):
+        self.inner = inner
+        self.cache = cache
+        self.provider_name = inner.provider_name
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[str] = None,
+        response_format: Optional[Dict] = None,
+        stream: bool = False,
+        cache_site: Optional[str] = None,
+    ) -> Union[ChatResponse, Iterator[ChatChunk]]:
+        kwargs = dict(
+            model=model, temperature=temperature, max_tokens=max_tokens, tools=tools,
+            tool_choice=tool_choice, response_format=response_format,
+        )
+        if stream or (cache_site is None and temperature > CACHEABLE_MAX_TEMPERATURE):
+            return self.inner.chat_completion(messages, stream=stream, **kwargs)
+
+        site = cache_site or "default"
+        key = request_key(
+            self.inner.cache_namespace,
+            model or self.inner.default_model,
+            messages,
+            {name: value for name, value in kwargs.items() if name != "model" and value is not None},
+        )
+        cached = self.cache.get(site, key)
+        if cached is not None:
+            return cached
+
+        response = self.inner.chat_completion(messages, **kwargs)
+        # Truncated or empty answers are not worth replaying
+        if response.finish_reason in (None, "stop", "tool_calls") and (response.content or response.tool_calls):
+            self.cache.set(site, key, response, site_ttl(site))
+        return response
+
+    # Everything else goes straight to the wrapped provider
+
+    def embed(self, texts: List[str], *, model: Optional[str] = None) -> List[List[float]]:
+        return self.inner.embed(texts, model=model)
+
+    @property
+    def embedding_model(self) -> Optional[str]:
+        return self.inner.embedding_model
+
+    @property
+    def default_model(self) -> Optional[str]:
+        return self.inner.default_model
+
+    @property
+    def cache_namespace(self) -> str:
+        return self.inner.cache_namespace
+
+    def health_check(self) -> None:
+        self.inner.health_check()
+
+    def is_available(self) -> bool:
+        return self.inner.is_available()
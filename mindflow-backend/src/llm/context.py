@@ -0,0 +1,240 @@
+"""
+Token-budgeted prompt assembly for the assistant.
+
+Every chat turn used to send the whole system prompt, all tool schemas, the
+last 20 history messages whatever their length, and full ``to_dict()`` rows
+in tool results.  The helpers here keep each part within a budget:
+
+- ``fit_history`` keeps the newest history messages that fit
+  ``CHAT_HISTORY_TOKEN_BUDGET`` (default 2000), truncating any single
+  message over ``CHAT_MESSAGE_TOKEN_LIMIT`` (default 600).
+- ``route_tools`` sends only the tool groups the user's message is about
+  (tasks, stakeholders, notes, insights); when nothing matches, all tools
+  are sent so follow-ups like "yes, do it" keep working.
+- ``tool_result_content`` serializes a tool result for the model within
+  ``CHAT_TOOL_RESULT_TOKEN_BUDGET`` (default 1500): empty fields are
+  dropped and long texts in listed records shortened until it fits.  Items
+  are never dropped, so the list tools' ``next_cursor`` stays valid.
+- ``pack_batches`` groups items for the batched ``classify_batch`` /
+  ``extract_json_batch`` requests: as many as fit
+  ``LLM_BATCH_TOKEN_BUDGET`` (default 6000), at most ``LLM_BATCH_MAX_ITEMS``
+  (default 25), each cut to ``LLM_BATCH_ITEM_TOKEN_LIMIT`` (default 800).
+
+Tokens are counted with ``tiktoken`` when it is installed and its encoding
+can be loaded, otherwise estimated at four characters per token.
+
+Usage::
+
+    from src.llm.context import fit_history, route_tools, tool_result_content
+
+    messages += fit_history(history)
+    tools = route_tools(TOOLS, TOOL_GROUPS, user_message)
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.jsonutil import json_dumps
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TOKEN_BUDGET = int(os.environ.get("CHAT_HISTORY_TOKEN_BUDGET", 2000))
+MESSAGE_TOKEN_LIMIT = int(os.environ.get("CHAT_MESSAGE_TOKEN_LIMIT", 600))
+TOOL_RESULT_TOKEN_BUDGET = int(os.environ.get("CHAT_TOOL_RESULT_TOKEN_BUDGET", 1500))
+MAX_HISTORY_MESSAGES = 20
+BATCH_TOKEN_BUDGET = int(os.environ.get("LLM_BATCH_TOKEN_BUDGET", 6000))
+BATCH_ITEM_TOKEN_LIMIT = int(os.environ.get("LLM_BATCH_ITEM_TOKEN_LIMIT", 800))
+BATCH_MAX_ITEMS = int(os.environ.get("LLM_BATCH_MAX_ITEMS", 25))
+
+# Per-message framing the chat format adds around the content
+MESSAGE_OVERHEAD_TOKENS = 4
+# The {"id": n, "text": ...} wrapper around each batched item
+BATCH_ITEM_OVERHEAD_TOKENS = 10
+CHARS_PER_TOKEN = 4
+# Long text fields in tool results start at this length and halve until the result fits
+TOOL_FIELD_CHARS = 400
+MIN_TOOL_FIELD_CHARS = 40
+ELLIPSIS = "…"
+
+# ------------------------------------------------------------------
+# Token counting
+# ------------------------------------------------------------------
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as exc:
+            # The encoding files are downloaded on first use; offline hosts estimate instead
+            logger.info("tiktoken unavailable, estimating token counts: %s", exc)
+            _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Tokens in *text* (exact with tiktoken, otherwise estimated)."""
+    if not text:
+        return 0
+    encoding = _get_encoding() if tiktoken is not None else None
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    return count_tokens(message.get("content")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Cut *text* to about *max_tokens*, marking the cut."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding() if tiktoken is not None else None
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]) + ELLIPSIS
+    return text[:max_tokens * CHARS_PER_TOKEN] + ELLIPSIS
+
+
+# ------------------------------------------------------------------
+# History
+# ------------------------------------------------------------------
+
+def fit_history(
+    history: Iterable[Dict[str, Any]],
+    budget: int = HISTORY_TOKEN_BUDGET,
+    message_limit: int = MESSAGE_TOKEN_LIMIT,
+) -> List[Dict[str, str]]:
+    """The newest user/assistant messages of *history* that fit *budget* tokens, oldest first."""
+    recent = [
+        {"role": msg["role"], "content": msg.get("content") or ""}
+        for msg in list(history)[-MAX_HISTORY_MESSAGES:]
+        if isinstance(msg, dict) and msg.get("role") in ("user", "assistant")
+    ]
+    kept: List[Dict[str, str]] = []
+    used = 0
+    for msg in reversed(recent):
+        msg["content"] = truncate_text(msg["content"], message_limit)
+        cost = message_tokens(msg)
+        if used + cost > budget:
+            break
+        kept.append(msg)
+        used += cost
+    kept.reverse()
+    return kept
+
+
+# ------------------------------------------------------------------
+# Tool routing
+# ------------------------------------------------------------------
+
+# Words that make a tool group relevant to a message
+TOOL_GROUP_KEYWORDS = {
+    "tasks": r"task|to-?dos?|remind|deadline|due|overdue|kanban|board|priorit|urgent|finish|complete|done|"
+             r"follow[- ]?up|schedule|need to|have to|must|should",
+    "stakeholders": r"stakeholder|contact|person|people|colleague|client|customer|partner|met |meet|"
+                    r"call|phone|e-?mail|company|linkedin|who ",
+    "notes": r"note|idea|jot|write down|remember|thought|journal|minutes",
+    "insights": r"insight|review|productiv|summar|stats|statistic|progress|analy|how am i|overview|week|month",
+}
+
+
+def route_tools(
+    tools: List[Dict[str, Any]],
+    groups: Dict[str, List[str]],
+    text: str,
+) -> List[Dict[str, Any]]:
+    """
+    The schemas in *tools* whose group (``groups``: group -> tool names)
+    matches *text*; all of them when no group does.
+    """
+    lowered = f" {text.lower()} "
+    wanted = {
+        name
+        for group, pattern in TOOL_GROUP_KEYWORDS.items()
+        if re.search(pattern, lowered)
+        for name in groups.get(group, ())
+    }
+    if not wanted:
+        return tools
+    return [tool for tool in tools if tool["function"]["name"] in wanted]
+
+
+def tools_tokens(tools: List[Dict[str, Any]]) -> int:
+    return sum(count_tokens(json_dumps(tool)) for tool in tools)
+
+
+# ------------------------------------------------------------------
+# Tool results
+# ------------------------------------------------------------------
+
+def _compact(value: Any, max_chars: int, in_list: bool = False) -> Any:
+    # Only strings inside listed records are shortened; top-level fields such
+    # as ``message`` and ``next_cursor`` must reach the model intact
+    if isinstance(value, dict):
+        return {
+            key: _compact(item, max_chars, in_list)
+            for key, item in value.items()
+            if item is not None and item != "" and item != [] and item != {}
+        }
+    if isinstance(value, list):
+        return [_compact(item, max_chars, True) for item in value]
+    if in_list and isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + ELLIPSIS
+    return value
+
+
+def tool_result_content(result: Dict[str, Any], budget: int = TOOL_RESULT_TOKEN_BUDGET) -> str:
+    """JSON for a tool message, shortened to about *budget* tokens."""
+    content = json_dumps(result)
+    if count_tokens(content) <= budget:
+        return content
+    max_chars = TOOL_FIELD_CHARS
+    while True:
+        content = json_dumps(_compact(result, max_chars))
+        if count_tokens(content) <= budget or max_chars <= MIN_TOOL_FIELD_CHARS:
+            return content
+        max_chars //= 2
+
+
+# ------------------------------------------------------------------
+# Batches
+# ------------------------------------------------------------------
+
+def pack_batches(
+    texts: Sequence[str],
+    budget: int = BATCH_TOKEN_BUDGET,
+    item_limit: int = BATCH_ITEM_TOKEN_LIMIT,
+    max_items: int = BATCH_MAX_ITEMS,
+) -> List[List[Tuple[int, str]]]:
+    """
+    *texts* as consecutive batches of ``(index, text)`` that fit *budget*
+    tokens; each text is cut to *item_limit* tokens first.
+    """
+    batches: List[List[Tuple[int, str]]] = []
+    batch: List[Tuple[int, str]] = []
+    used = 0
+    for index, text in enumerate(texts):
+        text = truncate_text(text or "", item_limit)
+        cost = count_tokens(text) + BATCH_ITEM_OVERHEAD_TOKENS
+        if batch and (used + cost > budget or len(batch) >= max_items):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append((index, text))
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
@@ -12,13 +12,22 @@ OPENAI_API_BASE      : Custom base URL (e.g. http://localhost:1234/v1)
 LLM_MODEL            : Override the default model name
 LLM_CUSTOM_BASE_URL  : Alternative to OPENAI_API_BASE for custom providers
 LLM_CUSTOM_API_KEY   : Alternative to OPENAI_API_KEY for custom providers
+LLM_EMBEDDING_MODEL  : Override the default embedding model name
+LLM_CACHE_BACKEND    : Response cache tier, see ``src.llm.cache``  (default: "sqlite", "redis" with REDIS_URL)
+LLM_CONNECT_TIMEOUT  : Connection pool and timeouts (also LLM_READ_TIMEOUT, LLM_HTTP2, ...), see ``src.llm.http``
+LLM_FALLBACK_PROVIDERS : Backends to fail over to, in order, e.g. "openai" or "ollama:llama3.1,openai"
+                         (circuit breaker settings: see ``src.llm.failover``)
 """
 from __future__ import annotations
 
 import logging
 import os
+from functools import lru_cache
 from typing import Optional
 
+from src.llm.cache import CachingProvider, get_llm_cache
+from src.llm.failover import FailoverProvider, get_health_monitor
+from src.llm.http import DEFAULT_BASE_URL
 from src.llm.openai_provider import OpenAIProvider
 from src.llm.provider import LlmProvider
 
@@ -26,6 +35,8 @@ logger = logging.getLogger(__name__)
 
 # Module-level cache (one provider per configuration fingerprint)
 _provider_cache: dict[str, LlmProvider] = {}
+# Backends shared by the chains, so they share circuit-breaker state
+_backend_cache: dict[str, OpenAIProvider] = {}
 
 # Well-known local provider defaults
 _LOCAL_DEFAULTS = {
@@ -34,6 +45,57 @@ _LOCAL_DEFAULTS = {
 }
 
 
+def _get_backend(ptype: str, key: str, url: str, mdl: str, embedding_model: str = "",
+                 max_retries: Optional[int] = None) -> OpenAIProvider:
+    cache_key = f"{ptype}|{key[:8] if key else ''}|{url}|{mdl}|{embedding_model}|{max_retries}"
+    if cache_key not in _backend_cache:
+        _backend_cache[cache_key] = OpenAIProvider(
+            api_key=key or None,
+            base_url=url or None,
+            default_model=mdl or None,
+            provider_type=ptype,
+            embedding_model=embedding_model or None,
+            max_retries=max_retries,
+        )
+    return _backend_cache[cache_key]
+
+
+@lru_cache(maxsize=8)
+def _parse_fallbacks(spec: str, openai_key: str, custom_key: str, custom_url: str) -> tuple:
+    configs = []
+    for entry in spec.split(","):
+        ptype, _, mdl = entry.strip().lower().partition(":")
+        if not ptype:
+            continue
+        if ptype == "openai":
+            key, url = openai_key, DEFAULT_BASE_URL
+        elif ptype in _LOCAL_DEFAULTS:
+            key, url = "", _LOCAL_DEFAULTS[ptype]["base_url"]
+            mdl = mdl or _LOCAL_DEFAULTS[ptype]["model"]
+        elif ptype == "custom":
+            key, url = custom_key, custom_url
+        else:
+            logger.warning("Ignoring unknown LLM fallback provider %r", ptype)
+            continue
+        if (ptype == "openai" and not key) or (ptype == "custom" and not url):
+            logger.warning("Ignoring LLM fallback provider %r: not configured", ptype)
+            continue
+        configs.append((ptype, key, url, mdl))
+    return tuple(configs)
+
+
+def _fallback_configs(primary_type: str, primary_url: str) -> list[tuple[str, str, str, str]]:
+    """``(type, key, url, model)`` for each configured entry of ``LLM_FALLBACK_PROVIDERS``."""
+    configs = _parse_fallbacks(
+        os.environ.get("LLM_FALLBACK_PROVIDERS", ""),
+        os.environ.get("OPENAI_API_KEY", ""),
+        os.environ.get("LLM_CUSTOM_API_KEY", ""),
+        os.environ.get("LLM_CUSTOM_BASE_URL", ""),
+    )
+    # The primary backend is not its own fallback
+    return [config for config in configs if not (config[0] == primary_type and config[2] == (primary_url or config[2]))]
+
+
 def get_llm_provider(
     *,
     provider_type: Optional[str] = None,
@@ -47,11 +109,16 @@ def get_llm_provider(
     Parameters are optional; when omitted the factory reads from
     environment variables.  Results are cached so that repeated calls
     with the same configuration reuse the same client.
+
+    With ``LLM_FALLBACK_PROVIDERS`` the configured backend and its
+    fallbacks are wrapped in a ``FailoverProvider``, so an unreachable
+    backend is skipped instead of timing out every request.
     """
     ptype = (provider_type or os.environ.get("LLM_PROVIDER", "openai")).strip().lower()
     key = api_key or os.environ.get("LLM_CUSTOM_API_KEY") or os.environ.get("OPENAI_API_KEY", "")
     url = base_url or os.environ.get("LLM_CUSTOM_BASE_URL") or os.environ.get("OPENAI_API_BASE", "")
     mdl = model or os.environ.get("LLM_MODEL", "")
+    embedding_model = os.environ.get("LLM_EMBEDDING_MODEL", "")
 
     # Apply well-known defaults for local providers
     if ptype in _LOCAL_DEFAULTS:
@@ -60,7 +127,8 @@ def get_llm_provider(
         if not mdl:
             mdl = _LOCAL_DEFAULTS[ptype]["model"]
 
-    cache_key = f"{ptype}|{key[:8] if key else ''}|{url}|{mdl}"
+    fallbacks = _fallback_configs(ptype, url)
+    cache_key = f"{ptype}|{key[:8] if key else ''}|{url}|{mdl}|{embedding_model}|{fallbacks}"
     if cache_key in _provider_cache:
         return _provider_cache[cache_key]
 
@@ -71,12 +139,19 @@ def get_llm_provider(
         mdl or "(default)",
     )
 
-    provider = OpenAIProvider(
-        api_key=key or None,
-        base_url=url or None,
-        default_model=mdl or None,
-        provider_type=ptype,
-    )
+    # Backends with a fallback behind them fail over instead of retrying
+    backends = [_get_backend(ptype, key, url, mdl, embedding_model, max_retries=0 if fallbacks else None)]
+    for index, (fb_type, fb_key, fb_url, fb_model) in enumerate(fallbacks, start=1):
+        backends.append(_get_backend(fb_type, fb_key, fb_url, fb_model,
+                                     max_retries=0 if index < len(fallbacks) else None))
+    provider: LlmProvider = backends[0]
+    if fallbacks:
+        logger.info("LLM fallbacks: %s", ", ".join(backend.cache_namespace for backend in backends[1:]))
+        provider = FailoverProvider(backends)
+    # Low-temperature calls are answered from the response cache when possible
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        provider = CachingProvider(provider, llm_cache)
 
     _provider_cache[cache_key] = provider
     return provider
@@ -85,4 +160,6 @@ def get_llm_provider(
 def clear_provider_cache() -> None:
     """Clear the provider cache (useful when configuration changes)."""
     _provider_cache.clear()
+    _backend_cache.clear()
+    get_health_monitor().clear()
     logger.info("LLM provider cache cleared.")
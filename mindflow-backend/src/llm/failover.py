@@ -0,0 +1,405 @@
+"""
+Failover across LLM backends with per-backend circuit breakers.
+
+A stopped LM Studio or Ollama server used to cost every request a full
+connect timeout (plus the SDK's retries) before it failed.
+``FailoverProvider`` wraps an ordered list of providers, for example local
+Ollama first and OpenAI second, and sends each call to the first backend
+whose circuit is closed:
+
+- Every call records its outcome and latency in the backend's
+  ``BackendHealth``: a rolling window of the last ``LLM_HEALTH_WINDOW``
+  calls (default 20).
+- ``LLM_CIRCUIT_FAILURES`` consecutive failures (default 3), or an error
+  rate of ``LLM_CIRCUIT_ERROR_RATE`` (default 0.5) over a full window,
+  open the circuit.  Open backends are skipped without a request.
+- After ``LLM_CIRCUIT_COOLDOWN`` seconds (default 30) one live call may
+  try the backend again (half-open); success closes the circuit.
+- Chains of more than one backend are probed from a background thread
+  with ``health_check()``: backends whose circuit is not closed every
+  ``LLM_HEALTH_PROBE_INTERVAL`` seconds (default 15, ``0`` disables
+  probing), so recovered ones are closed before a request has to find
+  out, and healthy ones once they have been idle for
+  ``LLM_HEALTH_KEEPWARM_INTERVAL`` seconds (default 300, ``0`` disables
+  it), so a dead fallback is opened before a request waits on it.  A
+  single backend has nothing to fail over to and is never probed.
+
+Health is kept per backend instance, so chains that share a backend share
+what is known about it.  Errors that blame the request (HTTP 400, 413,
+422) are raised as they are and do not count against the backend.  When
+no backend is available the call fails at once with
+``ProviderUnavailableError``.
+
+Usage::
+
+    from src.llm.failover import FailoverProvider
+
+    provider = FailoverProvider([ollama_provider, openai_provider])
+    provider.chat_completion(messages)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from src.llm.provider import ChatChunk, ChatResponse, LlmProvider
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.environ.get("LLM_CIRCUIT_FAILURES", 3))
+MAX_ERROR_RATE = float(os.environ.get("LLM_CIRCUIT_ERROR_RATE", 0.5))
+COOLDOWN_SECONDS = float(os.environ.get("LLM_CIRCUIT_COOLDOWN", 30))
+HEALTH_WINDOW = int(os.environ.get("LLM_HEALTH_WINDOW", 20))
+PROBE_INTERVAL = float(os.environ.get("LLM_HEALTH_PROBE_INTERVAL", 15))
+KEEPWARM_INTERVAL = float(os.environ.get("LLM_HEALTH_KEEPWARM_INTERVAL", 300))
+
+# Status codes that blame the request rather than the backend
+REQUEST_ERROR_STATUSES = frozenset({400, 413, 422})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderUnavailableError(RuntimeError):
+    """No backend of a ``FailoverProvider`` could take the call."""
+
+
+def _is_request_error(exc: Exception) -> bool:
+    return getattr(exc, "status_code", None) in REQUEST_ERROR_STATUSES
+
+
+def _label(provider: LlmProvider) -> str:
+    return provider.cache_namespace
+
+
+# ------------------------------------------------------------------
+# Health
+# ------------------------------------------------------------------
+
+class BackendHealth:
+    """
+    Rolling outcome window and circuit state of one backend.
+
+    Parameters
+    ----------
+    name : str
+        Label for logs and status.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._window: "deque[tuple]" = deque(maxlen=HEALTH_WINDOW)
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._last_activity = 0.0
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if now - self._opened_at >= COOLDOWN_SECONDS:
+            return HALF_OPEN
+        return OPEN
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def idle_for(self) -> float:
+        with self._lock:
+            return time.monotonic() - self._last_activity
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the backend; a half-open backend takes one trial at a time."""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency_ms: float) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("LLM backend %s recovered, closing its circuit", self.name)
+                # Failures from before the outage must not reopen it
+                self._window.clear()
+            self._window.append((True, latency_ms))
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+            self._last_activity = time.monotonic()
+
+    def record_failure(self, latency_ms: float, error: Exception) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._window.append((False, latency_ms))
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            self._last_activity = now
+            self._last_error = f"{type(error).__name__}: {error}"
+            failures = sum(1 for ok, _ in self._window if not ok)
+            tripped = (
+                self._consecutive_failures >= FAILURE_THRESHOLD
+                or (len(self._window) == self._window.maxlen and failures / len(self._window) >= MAX_ERROR_RATE)
+            )
+            if self._opened_at is not None or tripped:
+                if self._opened_at is None:
+                    logger.warning("LLM backend %s failing (%s), opening its circuit", self.name, self._last_error)
+                # A failed trial or probe starts a new cooldown
+                self._opened_at = now
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(latency for ok, latency in self._window if ok)
+            calls = len(self._window)
+            return {
+                "state": self._state(time.monotonic()),
+                "calls": calls,
+                "error_rate": round(sum(1 for ok, _ in self._window if not ok) / calls, 4) if calls else None,
+                "consecutive_failures": self._consecutive_failures,
+                "latency_ms_p50": round(latencies[len(latencies) // 2], 1) if latencies else None,
+                "latency_ms_mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+                "last_error": self._last_error,
+            }
+
+
+class HealthMonitor:
+    """
+    Health of every registered backend; backends registered with
+    ``probe=True`` are probed from a daemon thread.
+
+    Parameters
+    ----------
+    interval : float
+        Seconds between probe passes, in which backends whose circuit is
+        not closed are probed; ``0`` disables probing.
+    keepwarm_interval : float
+        Idle seconds after which a healthy backend is probed; ``0`` disables it.
+    """
+
+    def __init__(self, interval: float = PROBE_INTERVAL, keepwarm_interval: float = KEEPWARM_INTERVAL):
+        self._interval = interval
+        self._keepwarm_interval = keepwarm_interval
+        self._backends: Dict[int, tuple] = {}
+        self._probed: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, backend: LlmProvider, probe: bool = True) -> BackendHealth:
+        """The health record of *backend*, created on first use; ``probe`` starts probing it."""
+        with self._lock:
+            entry = self._backends.get(id(backend))
+            if entry is None:
+                entry = (backend, BackendHealth(_label(backend)))
+                self._backends[id(backend)] = entry
+            if not probe:
+                return entry[1]
+            self._probed.add(id(backend))
+            if self._interval > 0 and (self._thread is None or not self._thread.is_alive()):
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="llm-health")
+                self._thread.start()
+            return entry[1]
+
+    def probe(self, backend: LlmProvider, health: BackendHealth) -> bool:
+        """Run *backend*'s health check now and record the result."""
+        start = time.perf_counter()
+        try:
+            backend.health_check()
+        except Exception as exc:
+            health.record_failure((time.perf_counter() - start) * 1000, exc)
+            return False
+        health.record_success((time.perf_counter() - start) * 1000)
+        return True
+
+    def clear(self) -> None:
+        """Forget all backends (after the provider configuration changed)."""
+        with self._lock:
+            self._backends.clear()
+            self._probed.clear()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._backends.values())
+        return {
+            "probe_interval": self._interval,
+            "keepwarm_interval": self._keepwarm_interval,
+            "backends": [dict(health.snapshot(), name=health.name) for _, health in entries],
+        }
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            with self._lock:
+                entries = [self._backends[key] for key in self._probed]
+            for backend, health in entries:
+                if health.state != CLOSED:
+                    self.probe(backend, health)
+                elif self._keepwarm_interval > 0 and health.idle_for() >= self._keepwarm_interval:
+                    self.probe(backend, health)
+
+
+_monitor = HealthMonitor()
+
+
+def get_health_monitor() -> HealthMonitor:
+    return _monitor
+
+
+def llm_health_status() -> Dict[str, Any]:
+    return _monitor.get_status()
+
+
+# ------------------------------------------------------------------
+# Provider wrapper
+# ------------------------------------------------------------------
+
+class FailoverProvider(LlmProvider):
+    """
+    Sends each call to the first healthy provider of *providers*.
+
+    Parameters
+    ----------
+    providers : list of LlmProvider
+        Backends in order of preference.  A ``model`` given per call only
+        goes to the first; the others use their own default model.
+    monitor : HealthMonitor, optional
+        Where health is kept; defaults to the shared monitor.
+    """
+
+    def __init__(self, providers: List[LlmProvider], monitor: Optional[HealthMonitor] = None):
+        if not providers:
+            raise ValueError("FailoverProvider needs at least one provider")
+        self.providers = list(providers)
+        self.monitor = monitor or _monitor
+        self.provider_name = providers[0].provider_name if len(providers) == 1 else "failover"
+
+    def _health(self, backend: LlmProvider) -> BackendHealth:
+        # A lone backend has nothing to fail over to, so it is not probed
+        return self.monitor.register(backend, probe=len(self.providers) > 1)
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        tools: Optional[List[Dict]] = None,
+        tool_choice: Optional[str] = None,
+        response_format: Optional[Dict] = None,
+        stream: bool = False,
+        cache_site: Optional[str] = None,
+    ) -> Union[ChatResponse, Iterator[ChatChunk]]:
+        kwargs = dict(
+            temperature=temperature, max_tokens=max_tokens, tools=tools, tool_choice=tool_choice,
+            response_format=response_format, stream=stream, cache_site=cache_site,
+        )
+        errors: List[str] = []
+        for index, backend in enumerate(self.providers):
+            health = self._health(backend)
+            if not health.allow_request():
+                errors.append(f"{health.name}: circuit open")
+                continue
+            start = time.perf_counter()
+            try:
+                result = backend.chat_completion(messages, model=model if index == 0 else None, **kwargs)
+            except Exception as exc:
+                elapsed = (time.perf_counter() - start) * 1000
+                if _is_request_error(exc):
+                    # The backend answered; another one would reject the request too
+                    health.record_success(elapsed)
+                    raise
+                health.record_failure(elapsed, exc)
+                logger.warning("LLM backend %s failed: %s", health.name, exc)
+                errors.append(f"{health.name}: {exc}")
+                continue
+            if stream:
+                return self._track_stream(result, health, start)
+            health.record_success((time.perf_counter() - start) * 1000)
+            if index:
+                logger.info("LLM call served by fallback backend %s", health.name)
+            return result
+        raise ProviderUnavailableError("No LLM backend available (" + "; ".join(errors) + ")")
+
+    @staticmethod
+    def _track_stream(chunks: Iterator[ChatChunk], health: BackendHealth, start: float) -> Iterator[ChatChunk]:
+        # Tokens have been sent by the time a stream breaks, so it is not
+        # retried elsewhere; the outcome still counts towards the backend
+        try:
+            yield from chunks
+        except GeneratorExit:
+            health.record_success((time.perf_counter() - start) * 1000)
+            raise
+        except Exception as exc:
+            health.record_failure((time.perf_counter() - start) * 1000, exc)
+            raise
+        health.record_success((time.perf_counter() - start) * 1000)
+
+    def embed(self, texts: List[str], *, model: Optional[str] = None) -> List[List[float]]:
+        # Vectors from another backend's model would not be comparable, so
+        # embeddings never fail over
+        backend = self.providers[0]
+        health = self._health(backend)
+        if not health.allow_request():
+            raise ProviderUnavailableError(f"LLM backend {health.name} is unavailable (circuit open)")
+        start = time.perf_counter()
+        try:
+            vectors = backend.embed(texts, model=model)
+        except Exception as exc:
+            if not _is_request_error(exc) and not isinstance(exc, NotImplementedError):
+                health.record_failure((time.perf_counter() - start) * 1000, exc)
+            raise
+        health.record_success((time.perf_counter() - start) * 1000)
+        return vectors
+
+    @property
+    def embedding_model(self) -> Optional[str]:
+        return self.providers[0].embedding_model
+
+    @property
+    def default_model(self) -> Optional[str]:
+        return self.providers[0].default_model
+
+    @property
+    def cache_namespace(self) -> str:
+        return ">".join(backend.cache_namespace for backend in self.providers)
+
+    def health_check(self) -> None:
+        """Probe every backend now; raises unless at least one is healthy."""
+        results = [self.monitor.probe(backend, self._health(backend)) for backend in self.providers]
+        if not any(results):
+            raise ProviderUnavailableError("No LLM backend passed its health check")
+
+    def is_available(self) -> bool:
+        """A backend is configured and its circuit is not open."""
+        return any(
+            backend.is_available() and self._health(backend).state != OPEN
+            for backend in self.providers
+        )
+
+    def get_status(self) -> Dict[str, Any]:
+        """Chain order with each backend's health."""
+        return {
+            "backends": [
+                dict(self._health(backend).snapshot(), name=_label(backend), model=backend.default_model)
+                for backend in self.providers
+            ],
+        }
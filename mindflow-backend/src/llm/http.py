@@ -0,0 +1,141 @@
+"""
+Shared HTTP clients for LLM endpoints.
+
+Every ``OpenAIProvider`` used to let the SDK build its own connection pool,
+and the Telegram, parser and LinkedIn routes each kept another client, so
+the same endpoint was reached through several pools and most calls paid
+for a fresh TCP (and TLS) handshake.  All providers now share one
+``httpx.Client`` per endpoint origin (scheme, host and port):
+
+- connections are kept alive between calls for ``LLM_KEEPALIVE_EXPIRY``
+  seconds (default 60), up to ``LLM_MAX_KEEPALIVE_CONNECTIONS`` idle ones
+  (default 10) out of ``LLM_MAX_CONNECTIONS`` (default 20);
+- HTTPS endpoints speak HTTP/2 when the ``h2`` package is installed
+  (``pip install httpx[http2]``), so concurrent calls share one
+  connection; ``LLM_HTTP2=0`` turns it off.  Local servers (Ollama,
+  LM Studio) are plain HTTP and stay on keep-alive HTTP/1.1;
+- ``LLM_CONNECT_TIMEOUT`` (default 5 s) bounds connecting and
+  ``LLM_READ_TIMEOUT`` (default 120 s) the wait for each chunk of the
+  reply, so an unreachable endpoint fails fast while slow local models
+  can still finish.
+
+The clients are closed at interpreter exit.
+
+Usage::
+
+    from src.llm.http import get_http_client, llm_timeout
+
+    OpenAI(api_key=key, base_url=url, http_client=get_http_client(url), timeout=llm_timeout())
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("LLM_READ_TIMEOUT", 120))
+MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", 20))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", 10))
+KEEPALIVE_EXPIRY = float(os.environ.get("LLM_KEEPALIVE_EXPIRY", 60))
+HTTP2_ENABLED = os.environ.get("LLM_HTTP2", "1").strip().lower() not in ("0", "false", "no", "off")
+
+_clients: Dict[str, "httpx.Client"] = {}
+_lock = threading.Lock()
+
+
+def origin(base_url: Optional[str]) -> str:
+    """``scheme://host:port`` of *base_url* (the OpenAI API when empty)."""
+    parts = urlsplit(base_url or DEFAULT_BASE_URL)
+    scheme = (parts.scheme or "https").lower()
+    port = parts.port or (443 if scheme == "https" else 80)
+    return f"{scheme}://{(parts.hostname or '').lower()}:{port}"
+
+
+def use_http2(base_url: Optional[str]) -> bool:
+    """HTTP/2 is negotiated over TLS only; plain-HTTP local servers keep HTTP/1.1."""
+    return HTTP2_ENABLED and HTTP2_AVAILABLE and origin(base_url).startswith("https:")
+
+
+def llm_timeout():
+    """Connect/read/write/pool timeouts for LLM requests, ``None`` without httpx."""
+    if httpx is None:
+        return None
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def get_http_client(base_url: Optional[str] = None):
+    """
+    The pooled client for *base_url*'s origin, created on first use.
+
+    Returns ``None`` when httpx is not installed; the SDK then builds its
+    own client.
+    """
+    if httpx is None:
+        return None
+    key = origin(base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            http2 = use_http2(base_url)
+            client = httpx.Client(
+                http2=http2,
+                timeout=llm_timeout(),
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                follow_redirects=True,
+            )
+            _clients[key] = client
+            logger.info("LLM HTTP client for %s (http2=%s)", key, http2)
+        return client
+
+
+def http_client_status() -> dict:
+    """Settings and open pools, for diagnostics."""
+    with _lock:
+        origins = sorted(_clients)
+    return {
+        "httpx_available": httpx is not None,
+        "http2_available": HTTP2_AVAILABLE,
+        "http2_enabled": HTTP2_ENABLED,
+        "connect_timeout": CONNECT_TIMEOUT,
+        "read_timeout": READ_TIMEOUT,
+        "max_connections": MAX_CONNECTIONS,
+        "max_keepalive_connections": MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": KEEPALIVE_EXPIRY,
+        "origins": origins,
+    }
+
+
+@atexit.register
+def close_http_clients() -> None:
+    """Close every pooled client."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as exc:
+            logger.debug("Closing LLM HTTP client failed: %s", exc)
@@ -6,14 +6,19 @@ Works with the official OpenAI API as well as any OpenAI-compatible endpoint
 """
 from __future__ import annotations
 
+import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
-from src.llm.provider import ChatResponse, LlmProvider, ToolCall
+from src.llm.http import CONNECT_TIMEOUT, get_http_client, llm_timeout
+from src.llm.provider import ChatChunk, ChatResponse, LlmProvider, ToolCall
 
 logger = logging.getLogger(__name__)
 
+# Health probes give up quickly; a slow /models answer is a bad sign anyway
+PROBE_TIMEOUT = CONNECT_TIMEOUT
+
 # Default models per provider type
 DEFAULT_MODELS = {
     "openai": "gpt-4o-mini",
@@ -22,6 +27,32 @@ DEFAULT_MODELS = {
     "custom": "default",
 }
 
+# Default embedding models per provider type
+DEFAULT_EMBEDDING_MODELS = {
+    "openai": "text-embedding-3-small",
+    "lmstudio": "text-embedding-nomic-embed-text-v1.5",
+    "ollama": "nomic-embed-text",
+    "custom": "default",
+}
+
+
+def _tool_call(call_id: str, name: str, arguments: Optional[str]) -> ToolCall:
+    try:
+        args = json.loads(arguments)
+    except (ValueError, TypeError):
+        args = {}
+    return ToolCall(id=call_id, function_name=name, arguments=args)
+
+
+def _usage(raw) -> Optional[Dict[str, int]]:
+    if getattr(raw, "usage", None):
+        return {
+            "prompt_tokens": raw.usage.prompt_tokens,
+            "completion_tokens": raw.usage.completion_tokens,
+            "total_tokens": raw.usage.total_tokens,
+        }
+    return None
+
 
 class OpenAIProvider(LlmProvider):
     """
@@ -39,6 +70,11 @@ class OpenAIProvider(LlmProvider):
         Model name to use when none is specified per-call.
     provider_type : str
         One of ``"openai"``, ``"lmstudio"``, ``"ollama"``, ``"custom"``.
+    embedding_model : str, optional
+        Model name ``embed`` uses when none is specified per-call.
+    max_retries : int, optional
+        SDK retries per request (SDK default when omitted).  Backends with
+        a fallback behind them use ``0`` and fail over instead.
     """
 
     provider_name = "openai_compatible"
@@ -50,11 +86,15 @@ class OpenAIProvider(LlmProvider):
         base_url: Optional[str] = None,
         default_model: Optional[str] = None,
         provider_type: str = "openai",
+        embedding_model: Optional[str] = None,
+        max_retries: Optional[int] = None,
     ):
         self.provider_type = provider_type
         self._api_key = (api_key or os.environ.get("OPENAI_API_KEY", "")).strip()
         self._base_url = (base_url or os.environ.get("OPENAI_API_BASE", "")).strip() or None
         self._default_model = default_model or DEFAULT_MODELS.get(provider_type, "gpt-4o-mini")
+        self._embedding_model = embedding_model or DEFAULT_EMBEDDING_MODELS.get(provider_type, "text-embedding-3-small")
+        self._max_retries = max_retries
         self._client = None
 
         # For local providers, a dummy key is acceptable
@@ -76,6 +116,13 @@ class OpenAIProvider(LlmProvider):
             kwargs: Dict[str, Any] = {"api_key": self._api_key}
             if self._base_url:
                 kwargs["base_url"] = self._base_url
+            # Providers for the same endpoint share one keep-alive pool
+            http_client = get_http_client(self._base_url)
+            if http_client is not None:
+                kwargs["http_client"] = http_client
+                kwargs["timeout"] = llm_timeout()
+            if self._max_retries is not None:
+                kwargs["max_retries"] = self._max_retries
             self._client = OpenAI(**kwargs)
             logger.info(
                 "OpenAI-compatible client initialised (type=%s, base_url=%s)",
@@ -101,7 +148,9 @@ class OpenAIProvider(LlmProvider):
         tools: Optional[List[Dict]] = None,
         tool_choice: Optional[str] = None,
         response_format: Optional[Dict] = None,
-    ) -> ChatResponse:
+        stream: bool = False,
+        cache_site: Optional[str] = None,
+    ) -> Union[ChatResponse, Iterator[ChatChunk]]:
         client = self._get_client()
         model = model or self._default_model
 
@@ -118,6 +167,11 @@ class OpenAIProvider(LlmProvider):
         if response_format:
             # Some local models don't support response_format; wrap in try
             kwargs["response_format"] = response_format
+        if stream:
+            kwargs["stream"] = True
+            if self.provider_type == "openai":
+                # Local servers may reject stream_options; usage is optional there
+                kwargs["stream_options"] = {"include_usage": True}
 
         try:
             raw = client.chat.completions.create(**kwargs)
@@ -130,48 +184,98 @@ class OpenAIProvider(LlmProvider):
             else:
                 raise
 
+        if stream:
+            return self._iter_stream(raw)
+
         choice = raw.choices[0]
         msg = choice.message
 
         # Parse tool calls
         parsed_tool_calls: List[ToolCall] = []
         if msg.tool_calls:
-            import json as _json
-
             for tc in msg.tool_calls:
-                try:
-                    args = _json.loads(tc.function.arguments)
-                except (ValueError, TypeError):
-                    args = {}
-                parsed_tool_calls.append(
-                    ToolCall(
-                        id=tc.id,
-                        function_name=tc.function.name,
-                        arguments=args,
-                    )
-                )
-
-        usage = None
-        if hasattr(raw, "usage") and raw.usage:
-            usage = {
-                "prompt_tokens": raw.usage.prompt_tokens,
-                "completion_tokens": raw.usage.completion_tokens,
-                "total_tokens": raw.usage.total_tokens,
-            }
+                parsed_tool_calls.append(_tool_call(tc.id, tc.function.name, tc.function.arguments))
 
         return ChatResponse(
             content=msg.content,
             tool_calls=parsed_tool_calls,
             finish_reason=choice.finish_reason,
-            usage=usage,
+            usage=_usage(raw),
             raw=raw,
         )
 
+    @staticmethod
+    def _iter_stream(raw) -> Iterator[ChatChunk]:
+        """Yield content deltas from an SDK stream, then the assembled response."""
+        content: List[str] = []
+        # Tool calls arrive in fragments keyed by their position in the reply
+        calls: Dict[int, Dict[str, str]] = {}
+        finish_reason = None
+        usage = None
+        try:
+            for chunk in raw:
+                usage = _usage(chunk) or usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta
+                if delta is None:
+                    continue
+                if delta.content:
+                    content.append(delta.content)
+                    yield ChatChunk(content=delta.content)
+                for tc in delta.tool_calls or ():
+                    call = calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                    if tc.id:
+                        call["id"] = tc.id
+                    if tc.function is not None:
+                        call["name"] += tc.function.name or ""
+                        call["arguments"] += tc.function.arguments or ""
+        finally:
+            # Closing early (client went away) releases the HTTP connection
+            close = getattr(raw, "close", None)
+            if close is not None:
+                close()
+
+        yield ChatChunk(response=ChatResponse(
+            content="".join(content) or None,
+            tool_calls=[_tool_call(c["id"], c["name"], c["arguments"]) for _, c in sorted(calls.items())],
+            finish_reason=finish_reason,
+            usage=usage,
+        ))
+
+    def embed(self, texts: List[str], *, model: Optional[str] = None) -> List[List[float]]:
+        if not texts:
+            return []
+        client = self._get_client()
+        raw = client.embeddings.create(model=model or self._embedding_model, input=texts)
+        # The API may return items out of order; ``index`` is authoritative
+        return [item.embedding for item in sorted(raw.data, key=lambda item: item.index)]
+
+    @property
+    def embedding_model(self) -> Optional[str]:
+        return self._embedding_model
+
+    @property
+    def default_model(self) -> Optional[str]:
+        return self._default_model
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.provider_type}|{self._base_url or 'default'}"
+
     # ------------------------------------------------------------------
     # Availability check
     # ------------------------------------------------------------------
 
+    def health_check(self) -> None:
+        """List the models: cheap, and served by OpenAI, LM Studio and Ollama alike."""
+        client = self._get_client().with_options(timeout=PROBE_TIMEOUT, max_retries=0)
+        client.models.list()
+
     def is_available(self) -> bool:
+        """Configured with a usable client; reachability is tracked by ``FailoverProvider``."""
         try:
             self._get_client()
             return True
@@ -10,10 +10,18 @@ import json
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from src.llm.context import BATCH_MAX_ITEMS, BATCH_TOKEN_BUDGET, count_tokens, pack_batches
+from src.jsonutil import json_dumps
 
 logger = logging.getLogger(__name__)
 
+# Completion tokens a batched request may ask for, whatever its size
+BATCH_MAX_OUTPUT_TOKENS = 4000
+# Completion tokens per item of a batched classification
+CLASSIFY_TOKENS_PER_ITEM = 15
+
 
 @dataclass
 class ChatMessage:
@@ -42,13 +50,42 @@ class ChatResponse:
     usage: Optional[Dict[str, int]] = None
     raw: Any = None  # The raw response object from the SDK
 
+    def to_message(self) -> Dict[str, Any]:
+        """The assistant turn in chat-completions form, for replaying tool calls."""
+        message: Dict[str, Any] = {"role": "assistant", "content": self.content}
+        if self.tool_calls:
+            message["tool_calls"] = [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {"name": tc.function_name, "arguments": json.dumps(tc.arguments)},
+                }
+                for tc in self.tool_calls
+            ]
+        return message
+
+
+@dataclass
+class ChatChunk:
+    """
+    One event of a streamed chat completion.
+
+    Content deltas arrive as they are generated; the last chunk carries the
+    assembled ``ChatResponse`` (full content, tool calls, usage) in
+    ``response``.
+    """
+    content: Optional[str] = None
+    response: Optional[ChatResponse] = None
+
 
 class LlmProvider(ABC):
     """
     Abstract interface that every LLM backend must implement.
 
-    Concrete subclasses only need to implement ``chat_completion``.
-    Higher-level helpers (``classify_text``, ``extract_json``, etc.) are
+    Concrete subclasses only need to implement ``chat_completion``.  With
+    ``stream=True`` it returns an iterator of ``ChatChunk`` instead of a
+    ``ChatResponse``; backends without native streaming can return
+    ``stream_once(response)``.  Higher-level helpers (``classify_text``, ``extract_json``, etc.) are
     provided as convenience wrappers.
     """
 
@@ -69,14 +106,59 @@ class LlmProvider(ABC):
         tools: Optional[List[Dict]] = None,
         tool_choice: Optional[str] = None,
         response_format: Optional[Dict] = None,
-    ) -> ChatResponse:
-        """Send a chat-completion request and return a ``ChatResponse``."""
+        stream: bool = False,
+        cache_site: Optional[str] = None,
+    ) -> Union[ChatResponse, Iterator[ChatChunk]]:
+        """Send a chat-completion request and return a ``ChatResponse``.
+
+        With ``stream=True`` the request is sent before returning and the
+        result is an iterator of ``ChatChunk``: content deltas, then one
+        chunk holding the complete ``ChatResponse``.
+
+        ``cache_site`` names the call site for a response cache wrapped
+        around the provider (see ``src.llm.cache``): it selects the TTL and
+        opts in to caching regardless of temperature.  Providers ignore it.
+        """
         ...
 
+    @staticmethod
+    def stream_once(response: ChatResponse) -> Iterator[ChatChunk]:
+        """Present a complete response as a stream (for backends that cannot stream)."""
+        if response.content:
+            yield ChatChunk(content=response.content)
+        yield ChatChunk(response=response)
+
+    def embed(self, texts: List[str], *, model: Optional[str] = None) -> List[List[float]]:
+        """Return one embedding vector per entry of *texts*, in order."""
+        raise NotImplementedError(f"{self.provider_name} does not support embeddings")
+
+    @property
+    def embedding_model(self) -> Optional[str]:
+        """Model ``embed`` uses by default; vectors from different models are not comparable."""
+        return None
+
+    @property
+    def default_model(self) -> Optional[str]:
+        """Model ``chat_completion`` uses when none is given."""
+        return None
+
+    @property
+    def cache_namespace(self) -> str:
+        """Identifies the backend in cache keys; responses are only shared within it."""
+        return self.provider_name
+
     # ------------------------------------------------------------------
     # Convenience helpers (shared across all providers)
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _match_category(answer: Any, categories: List[str]) -> Optional[str]:
+        result = str(answer or "").strip().strip('"').lower()
+        for cat in categories:
+            if cat.lower() in result:
+                return cat
+        return None
+
     def classify_text(self, text: str, categories: List[str]) -> str:
         """Classify *text* into one of the given *categories*."""
         cats = ", ".join(f'"{c}"' for c in categories)
@@ -84,13 +166,9 @@ class LlmProvider(ABC):
             {"role": "system", "content": f"Classify the following text into exactly one of these categories: {cats}. Respond with ONLY the category name, nothing else."},
             {"role": "user", "content": text},
         ]
-        resp = self.chat_completion(messages, temperature=0.2, max_tokens=20)
-        result = (resp.content or "").strip().strip('"').lower()
+        resp = self.chat_completion(messages, temperature=0.2, max_tokens=20, cache_site="classify")
         # Ensure the result is one of the valid categories
-        for cat in categories:
-            if cat.lower() in result:
-                return cat
-        return categories[-1]  # fallback to last category
+        return self._match_category(resp.content, categories) or categories[-1]  # fallback to last category
 
     def extract_json(self, text: str, system_prompt: str) -> Dict[str, Any]:
         """Ask the LLM to extract structured JSON from *text*."""
@@ -103,6 +181,7 @@ class LlmProvider(ABC):
             temperature=0.2,
             max_tokens=800,
             response_format={"type": "json_object"},
+            cache_site="extract",
         )
         try:
             return json.loads(resp.content or "{}")
@@ -110,15 +189,126 @@ class LlmProvider(ABC):
             logger.warning("LLM returned non-JSON content: %s", resp.content)
             return {}
 
+    # ------------------------------------------------------------------
+    # Batched helpers: many items per request
+    # ------------------------------------------------------------------
+
+    def _run_batches(
+        self,
+        texts: List[str],
+        system_prompt: str,
+        tokens_per_item: int,
+        cache_site: str,
+        parse: Callable[[Dict[str, Any]], Any],
+    ) -> Dict[int, Any]:
+        """
+        Send *texts* in packed batches and return ``{index: parse(answer)}``
+        for every item answered validly; the rest are left to the caller.
+        """
+        results: Dict[int, Any] = {}
+        batches = pack_batches(
+            texts,
+            budget=BATCH_TOKEN_BUDGET - count_tokens(system_prompt),
+            # The answers have to fit the completion too
+            max_items=min(BATCH_MAX_ITEMS, max(1, BATCH_MAX_OUTPUT_TOKENS // tokens_per_item)),
+        )
+        for batch in batches:
+            payload = json_dumps({"items": [{"id": index, "text": text} for index, text in batch]})
+            try:
+                resp = self.chat_completion(
+                    [{"role": "system", "content": system_prompt}, {"role": "user", "content": payload}],
+                    temperature=0.2,
+                    max_tokens=min(BATCH_MAX_OUTPUT_TOKENS, tokens_per_item * len(batch) + 50),
+                    response_format={"type": "json_object"},
+                    cache_site=cache_site,
+                )
+                answers = json.loads(resp.content or "{}").get("results")
+            except (ValueError, AttributeError) as exc:
+                logger.warning("Batched %s answer for %d items not parseable: %s", cache_site, len(batch), exc)
+                continue
+            wanted = {index for index, _ in batch}
+            for answer in answers if isinstance(answers, list) else ():
+                if not isinstance(answer, dict):
+                    continue
+                try:
+                    index = int(answer.get("id"))
+                except (TypeError, ValueError):
+                    continue
+                if index in wanted and index not in results:
+                    value = parse(answer)
+                    if value is not None:
+                        results[index] = value
+        logger.info(
+            "Batched %s: %d items in %d requests, %d answered",
+            cache_site, len(texts), len(batches), len(results),
+        )
+        return results
+
+    def classify_batch(self, texts: List[str], categories: List[str]) -> List[str]:
+        """
+        ``classify_text`` for many texts, packed into as few requests as
+        the token budget allows (see ``src.llm.context.pack_batches``).
+        Items the batched answer misses or garbles are classified one by one.
+        """
+        if len(texts) <= 1:
+            return [self.classify_text(text, categories) for text in texts]
+        cats = ", ".join(f'"{c}"' for c in categories)
+        system_prompt = (
+            f"Classify the text of each item into exactly one of these categories: {cats}. "
+            'Respond with JSON: {"results": [{"id": <item id>, "category": "<category>"}]}, '
+            "one entry per item."
+        )
+        answered = self._run_batches(
+            texts, system_prompt, CLASSIFY_TOKENS_PER_ITEM, "classify",
+            lambda answer: self._match_category(answer.get("category"), categories),
+        )
+        return [
+            answered[index] if index in answered else self.classify_text(text, categories)
+            for index, text in enumerate(texts)
+        ]
+
+    def extract_json_batch(
+        self,
+        texts: List[str],
+        system_prompt: str,
+        *,
+        tokens_per_item: int = 300,
+    ) -> List[Dict[str, Any]]:
+        """
+        ``extract_json`` for many texts, packed into as few requests as the
+        token budget allows.  *tokens_per_item* sizes the completion; items
+        the batched answer misses or garbles are extracted one by one.
+        """
+        if len(texts) <= 1:
+            return [self.extract_json(text, system_prompt) for text in texts]
+        batch_prompt = (
+            f"{system_prompt}\n\n"
+            "You receive several items. Apply the instructions to the text of each item separately. "
+            'Respond with JSON: {"results": [{"id": <item id>, "data": {<the JSON object for that item>}}]}, '
+            "one entry per item."
+        )
+        answered = self._run_batches(
+            texts, batch_prompt, tokens_per_item, "extract",
+            lambda answer: answer["data"] if isinstance(answer.get("data"), dict) else None,
+        )
+        return [
+            answered[index] if index in answered else self.extract_json(text, system_prompt)
+            for index, text in enumerate(texts)
+        ]
+
     def summarise(self, text: str, *, max_words: int = 100) -> str:
         """Return a concise summary of *text*."""
         messages = [
             {"role": "system", "content": f"Summarise the following text in at most {max_words} words. Be concise and informative."},
             {"role": "user", "content": text},
         ]
-        resp = self.chat_completion(messages, temperature=0.3, max_tokens=300)
+        resp = self.chat_completion(messages, temperature=0.3, max_tokens=300, cache_site="summarise")
         return resp.content or ""
 
+    def health_check(self) -> None:
+        """Raise if the backend cannot serve requests right now (used by health probes)."""
+        self.chat_completion([{"role": "user", "content": "ping"}], temperature=0, max_tokens=1)
+
     def is_available(self) -> bool:
         """Return ``True`` if the provider is configured and reachable."""
         try:
@@ -32,8 +32,13 @@ from src.routes.telegram_bot import telegram_bp
 from src.routes.llm_settings import llm_settings_bp
 from src.routes.messaging import messaging_bp
 from src.routes.services import services_bp, init_services
+from src.routes.search import search_bp
+from src.routes.bulk_import import bulk_import_bp
+from src.routes.export import export_bp
 from datetime import timedelta
 from src.extensions import limiter
+from src.responses import OrjsonProvider, init_compression
+from src.response_cache import init_response_cache
 from flask_limiter.util import get_remote_address
 from src.models.user import User
 # from src.models.organization import Organization  # Temporarily disabled
@@ -42,9 +47,14 @@ from src.models.stakeholder import Stakeholder
 from src.models.note import Note
 from src.models.enhanced_task import EnhancedTask, TaskCategory
 from src.models.stakeholder_relationship import StakeholderRelationship, StakeholderInteraction
+from src.migrations import ensure_schema
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 
+# orjson-backed jsonify (ISO datetimes) and gzip/brotli for large text responses
+app.json = OrjsonProvider(app)
+init_compression(app)
+
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 # JWT_SECRET_KEY - CRITICAL: Must match between token creation and validation
@@ -149,6 +159,9 @@ app.register_blueprint(telegram_bp, url_prefix='/api')
 app.register_blueprint(llm_settings_bp, url_prefix='/api')
 app.register_blueprint(messaging_bp, url_prefix='/api')
 app.register_blueprint(services_bp, url_prefix='/api')
+app.register_blueprint(search_bp, url_prefix='/api')
+app.register_blueprint(bulk_import_bp, url_prefix='/api')
+app.register_blueprint(export_bp, url_prefix='/api')
 
 # Initialise background services
 init_services(app)
@@ -178,6 +191,9 @@ else:
     app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
     logger.info("Using SQLite database for development")
 
+# Per-user cache of the list endpoints (memory for SQLite, Redis when REDIS_URL is set)
+init_response_cache(app)
+
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
 engine_options = {
@@ -221,8 +237,8 @@ def initialize_database(max_retries=15, base_delay_seconds=5):
             with app.app_context():
                 # Test connection first
                 db.session.execute(text('SELECT 1'))
-                # Then create tables
-                db.create_all()
+                # Then create tables and apply pending migrations
+                ensure_schema(db.engine)
                 logger.info("Database initialized successfully")
                 db_initialized = True
                 break
@@ -265,190 +281,12 @@ def initialize_database_async():
     thread.start()
     logger.info("Database initialization started in background thread")
 
-# Try to initialize immediately, but don't block if it fails
+# Try to initialize immediately, but don't block if it fails.
+# ensure_schema() is a single fingerprint lookup once the schema is current;
+# otherwise one worker migrates under a lock while the others wait.
 try:
     with app.app_context():
-        db.create_all()
-        # Try to add OAuth columns if they don't exist (for existing databases)
-        try:
-            from sqlalchemy import inspect, text
-            inspector = inspect(db.engine)
-            if 'user' in inspector.get_table_names():
-                columns = [col['name'] for col in inspector.get_columns('user')]
-                required_oauth_columns = ['oauth_provider', 'oauth_provider_id', 'avatar_url']
-                missing_columns = [col for col in required_oauth_columns if col not in columns]
-                
-                if missing_columns:
-                    logger.info(f"Adding missing OAuth columns: {missing_columns}")
-                    with db.engine.connect() as conn:
-                        # PostgreSQL doesn't support IF NOT EXISTS for ALTER TABLE ADD COLUMN
-                        # So we check first and only add if missing
-                        if 'oauth_provider' not in columns:
-                            conn.execute(text('ALTER TABLE "user" ADD COLUMN oauth_provider VARCHAR(20)'))
-                        if 'oauth_provider_id' not in columns:
-                            conn.execute(text('ALTER TABLE "user" ADD COLUMN oauth_provider_id VARCHAR(255)'))
-                        if 'avatar_url' not in columns:
-                            conn.execute(text('ALTER TABLE "user" ADD COLUMN avatar_url VARCHAR(500)'))
-                        # Make password_hash nullable if needed (PostgreSQL specific)
-                        conn.execute(text("""
-                            DO $$ 
-                            BEGIN
-                                IF EXISTS (
-                                    SELECT 1 FROM information_schema.columns 
-                                    WHERE table_name = 'user' 
-                                    AND column_name = 'password_hash' 
-                                    AND is_nullable = 'NO'
-                                ) THEN
-                                    ALTER TABLE "user" ALTER COLUMN password_hash DROP NOT NULL;
-                                END IF;
-                            END $$;
-                        """))
-                        conn.commit()
-                    logger.info("OAuth columns added successfully")
-        except Exception as migration_error:
-            logger.warning(f"Could not add OAuth columns automatically: {str(migration_error)[:200]}")
-            logger.info("You may need to run add_oauth_columns.py manually")
-        
-        # Try to add telegram_chat_id column if it doesn't exist
-        try:
-            from sqlalchemy import inspect, text
-            inspector = inspect(db.engine)
-            if 'user' in inspector.get_table_names():
-                columns = [col['name'] for col in inspector.get_columns('user')]
-                if 'telegram_chat_id' not in columns:
-                    logger.info("Adding missing telegram_chat_id column")
-                    with db.engine.connect() as conn:
-                        conn.execute(text('ALTER TABLE "user" ADD COLUMN telegram_chat_id VARCHAR(50)'))
-                        conn.commit()
-                    logger.info("telegram_chat_id column added successfully")
-        except Exception as migration_error:
-            logger.warning(f"Could not add telegram_chat_id column: {str(migration_error)[:200]}")
-        
-        # Try to add missing task columns if they don't exist
-        try:
-            from sqlalchemy import inspect, text
-            inspector = inspect(db.engine)
-            if 'task' in inspector.get_table_names():
-                columns = [col['name'] for col in inspector.get_columns('task')]
-                required_task_columns = ['board_column', 'board_position', 'status']
-                missing_task_columns = [col for col in required_task_columns if col not in columns]
-                
-                if missing_task_columns:
-                    logger.info(f"Adding missing Task columns: {missing_task_columns}")
-                    with db.engine.connect() as conn:
-                        if 'board_column' not in columns:
-                            conn.execute(text('ALTER TABLE task ADD COLUMN board_column VARCHAR(50) DEFAULT \'todo\''))
-                        if 'board_position' not in columns:
-                            conn.execute(text('ALTER TABLE task ADD COLUMN board_position INTEGER DEFAULT 0'))
-                        if 'status' not in columns:
-                            conn.execute(text('ALTER TABLE task ADD COLUMN status VARCHAR(50) DEFAULT \'todo\''))
-                        conn.commit()
-                    logger.info("Task columns added successfully")
-        except Exception as migration_error:
-            logger.warning(f"Could not add Task columns automatically: {str(migration_error)[:200]}")
-        
-        # Try to add missing stakeholder columns if they don't exist
-        try:
-            from sqlalchemy import inspect, text
-            inspector = inspect(db.engine)
-            if 'stakeholder' in inspector.get_table_names():
-                columns = [col['name'] for col in inspector.get_columns('stakeholder')]
-                # All columns from the Stakeholder model that might be missing
-                required_stakeholder_columns = [
-                    'family_info', 'hobbies', 'education', 'career_history',
-                    'job_title', 'seniority_level', 'years_experience', 'specializations',
-                    'decision_making_authority', 'budget_authority', 'location', 'timezone',
-                    'preferred_language', 'cultural_background', 'preferred_communication_method',
-                    'communication_frequency', 'best_contact_time', 'communication_style',
-                    'linkedin_url', 'twitter_handle', 'other_social_links', 'current_projects',
-                    'availability_status', 'trust_level', 'collaboration_history',
-                    'conflict_resolution_style', 'strategic_value', 'risk_level',
-                    'opportunity_potential', 'sentiment', 'influence', 'interest', 'tags',
-                    'created_at', 'updated_at', 'last_contact'
-                ]
-                missing_columns = [col for col in required_stakeholder_columns if col not in columns]
-                
-                if missing_columns:
-                    logger.info(f"Adding missing stakeholder columns: {missing_columns}")
-                    with db.engine.connect() as conn:
-                        # Add each missing column with appropriate type
-                        if 'family_info' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN family_info TEXT'))
-                        if 'hobbies' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN hobbies TEXT'))
-                        if 'education' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN education TEXT'))
-                        if 'career_history' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN career_history TEXT'))
-                        if 'job_title' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN job_title VARCHAR(100)'))
-                        if 'seniority_level' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN seniority_level VARCHAR(50)'))
-                        if 'years_experience' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN years_experience INTEGER'))
-                        if 'specializations' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN specializations TEXT'))
-                        if 'decision_making_authority' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN decision_making_authority VARCHAR(50) DEFAULT 'low'"))
-                        if 'budget_authority' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN budget_authority VARCHAR(50) DEFAULT 'none'"))
-                        if 'location' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN location VARCHAR(100)'))
-                        if 'timezone' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN timezone VARCHAR(50)'))
-                        if 'preferred_language' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN preferred_language VARCHAR(50) DEFAULT 'English'"))
-                        if 'cultural_background' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN cultural_background VARCHAR(100)'))
-                        if 'preferred_communication_method' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN preferred_communication_method VARCHAR(50) DEFAULT 'email'"))
-                        if 'communication_frequency' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN communication_frequency VARCHAR(50) DEFAULT 'weekly'"))
-                        if 'best_contact_time' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN best_contact_time VARCHAR(100)'))
-                        if 'communication_style' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN communication_style VARCHAR(50)'))
-                        if 'linkedin_url' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN linkedin_url VARCHAR(200)'))
-                        if 'twitter_handle' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN twitter_handle VARCHAR(50)'))
-                        if 'other_social_links' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN other_social_links TEXT'))
-                        if 'current_projects' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN current_projects TEXT'))
-                        if 'availability_status' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN availability_status VARCHAR(50) DEFAULT 'available'"))
-                        if 'trust_level' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN trust_level INTEGER DEFAULT 5'))
-                        if 'collaboration_history' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN collaboration_history TEXT'))
-                        if 'conflict_resolution_style' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN conflict_resolution_style VARCHAR(50)'))
-                        if 'strategic_value' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN strategic_value VARCHAR(50) DEFAULT 'medium'"))
-                        if 'risk_level' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN risk_level VARCHAR(50) DEFAULT 'low'"))
-                        if 'opportunity_potential' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN opportunity_potential VARCHAR(50) DEFAULT 'medium'"))
-                        if 'sentiment' not in columns:
-                            conn.execute(text("ALTER TABLE stakeholder ADD COLUMN sentiment VARCHAR(20) DEFAULT 'neutral'"))
-                        if 'influence' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN influence INTEGER DEFAULT 5'))
-                        if 'interest' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN interest INTEGER DEFAULT 5'))
-                        if 'tags' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN tags TEXT'))
-                        if 'created_at' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'))
-                        if 'updated_at' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP'))
-                        if 'last_contact' not in columns:
-                            conn.execute(text('ALTER TABLE stakeholder ADD COLUMN last_contact TIMESTAMP'))
-                        conn.commit()
-                    logger.info(f"Stakeholder columns added successfully: {len(missing_columns)} columns")
-        except Exception as migration_error:
-            logger.warning(f"Could not add stakeholder columns automatically: {str(migration_error)[:200]}")
-        
+        ensure_schema(db.engine)
         logger.info("Database initialized successfully on startup")
 except Exception as e:
     logger.warning("Database not immediately available, will retry in background: %s", str(e)[:200])
@@ -502,6 +340,9 @@ def set_security_headers(response):
     return response
 
 # Request logging middleware
+# Uploads to these paths are read incrementally by the view, so their bodies are never buffered for logging
+STREAMED_UPLOAD_PATHS = {'/api/import'}
+
 @app.before_request
 def log_request_info():
     """Log all incoming requests for debugging"""
@@ -516,7 +357,7 @@ def log_request_info():
     
     logger.info(f"[{request.method}] {request.path} - Origin: {request.headers.get('Origin', 'N/A')} - IP: {request.remote_addr} - Auth: {has_auth} ({auth_preview})")
     
-    if request.method in ['POST', 'PUT', 'PATCH']:
+    if request.method in ['POST', 'PUT', 'PATCH'] and request.path not in STREAMED_UPLOAD_PATHS:
         try:
             # Sanitize request body to remove sensitive data before logging
             body = request.get_data(as_text=True)
@@ -0,0 +1,13 @@
+"""
+Versioned schema migrations for MindFlow/Rovot.
+
+``db.create_all()`` only creates missing tables; it never alters or indexes
+existing ones.  Every schema change after the initial tables is expressed as
+a numbered ``Migration`` in ``versions.py`` and applied once per database by
+``run_migrations``.  At startup ``ensure_schema`` skips all of this when
+the stored schema fingerprint already matches the models.
+"""
+from src.migrations.runner import ensure_schema, run_migrations, schema_fingerprint_for
+from src.migrations.versions import MIGRATIONS, Migration
+
+__all__ = ["MIGRATIONS", "Migration", "ensure_schema", "run_migrations", "schema_fingerprint_for"]
@@ -0,0 +1,190 @@
+"""
+Applies pending migrations from ``versions.py``.
+
+Applied versions are recorded in the ``schema_migrations`` table, so each
+migration runs exactly once per database.
+
+``ensure_schema`` is the startup entry point.  It compares a fingerprint of
+the declared models and migrations with the one stored in
+``schema_fingerprint``; when they match, startup costs a single ``SELECT``
+and no introspection at all.  Otherwise the schema is brought up to date
+under a database-wide lock, so gunicorn workers booting together never
+race each other on DDL.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.migrations.versions import MIGRATIONS, Migration
+from src.models.db import db
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Kept out of ``db.metadata`` so ``db.drop_all()`` / ``create_all()`` never touch it
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+schema_fingerprint = Table(
+    "schema_fingerprint",
+    _metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+# Arbitrary constant shared by every process that migrates this database
+_ADVISORY_LOCK_KEY = 0x6D696E64666C6F77  # "mindflow"
+
+
+def run_migrations(engine: Engine, migrations: Optional[List[Migration]] = None) -> List[int]:
+    """
+    Apply every migration that has not been recorded yet.
+
+    Each migration runs in its own transaction together with the insert
+    into ``schema_migrations``.  Returns the versions that were applied.
+    """
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+    _metadata.create_all(engine, checkfirst=True)
+
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied: List[int] = []
+    for migration in migrations:
+        if migration.version in applied:
+            continue
+        logger.info("Applying migration %04d_%s", migration.version, migration.name)
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow(),
+            ))
+        newly_applied.append(migration.version)
+
+    if newly_applied:
+        logger.info("Applied %d migration(s): %s", len(newly_applied), newly_applied)
+    return newly_applied
+
+
+# ------------------------------------------------------------------
+# Fingerprinted startup path
+# ------------------------------------------------------------------
+
+def schema_fingerprint_for(metadata: MetaData, migrations: Optional[List[Migration]] = None) -> str:
+    """
+    Hash the declared tables, columns, indexes and migration versions.
+
+    Computed from the models alone, so it costs no database round trip.
+    Any model or migration change yields a new fingerprint.
+    """
+    parts: List[str] = []
+    for table in metadata.sorted_tables:
+        parts.append(f"table:{table.name}")
+        for column in table.columns:
+            parts.append(f"column:{table.name}.{column.name}:{column.type!r}:{column.nullable}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"index:{index.name}")
+    for migration in sorted(migrations or MIGRATIONS, key=lambda m: m.version):
+        parts.append(f"migration:{migration.version}:{migration.name}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _stored_fingerprint(engine: Engine) -> Optional[str]:
+    """Return the recorded fingerprint, or ``None`` if there is none yet."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                select(schema_fingerprint.c.fingerprint).where(schema_fingerprint.c.id == 1)
+            ).scalar()
+    except SQLAlchemyError:
+        # Table does not exist yet: fresh database or first run of this code
+        return None
+
+
+def _store_fingerprint(engine: Engine, fingerprint: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(schema_fingerprint.delete())
+        conn.execute(schema_fingerprint.insert().values(
+            id=1,
+            fingerprint=fingerprint,
+            updated_at=datetime.utcnow(),
+        ))
+
+
+@contextlib.contextmanager
+def _migration_lock(engine: Engine) -> Iterator[None]:
+    """
+    Hold a database-wide lock while the schema is being changed.
+
+    PostgreSQL uses a session-level advisory lock.  File-backed SQLite uses
+    an exclusive ``flock`` on a sibling ``.migrate.lock`` file; in-memory
+    databases are private to the process and need no lock.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+        return
+
+    database = engine.url.database if engine.dialect.name == "sqlite" else None
+    if not database or database == ":memory:" or fcntl is None:
+        yield
+        return
+
+    with open(f"{os.path.abspath(database)}.migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_schema(engine: Engine, migrations: Optional[List[Migration]] = None) -> List[int]:
+    """
+    Bring the database schema up to date, once.
+
+    Fast path: the stored fingerprint matches the models, nothing to do.
+    Slow path: take the migration lock, re-check (another worker may have
+    finished meanwhile), create missing tables, apply pending migrations
+    and record the new fingerprint.  Returns the versions that were applied.
+    """
+    expected = schema_fingerprint_for(db.metadata, migrations)
+    if _stored_fingerprint(engine) == expected:
+        logger.info("Schema fingerprint matches, skipping migrations")
+        return []
+
+    with _migration_lock(engine):
+        if _stored_fingerprint(engine) == expected:
+            logger.info("Schema migrated by another worker")
+            return []
+        db.metadata.create_all(engine, checkfirst=True)
+        applied = run_migrations(engine, migrations)
+        _store_fingerprint(engine, expected)
+        logger.info("Schema up to date (fingerprint %s)", expected[:12])
+        return applied
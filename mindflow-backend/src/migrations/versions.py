@@ -0,0 +1,236 @@
+"""
+Ordered list of schema migrations.
+
+Each migration has a unique, monotonically increasing ``version`` and an
+``upgrade`` callable that receives an open SQLAlchemy ``Connection`` inside
+a transaction.  Migrations must be idempotent: they may run against
+databases that were created by a newer ``db.create_all()`` and therefore
+already contain the objects being added.
+
+Versions are recorded per database, so a committed version is never
+renumbered or reused; new migrations are appended with the next number.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Callable, List, Tuple
+
+from sqlalchemy import bindparam, inspect, select, text
+from sqlalchemy.engine import Connection
+
+from src.models.db import db
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A single schema change."""
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def _add_missing_columns(conn: Connection, table: str, columns: List[Tuple[str, str]]) -> None:
+    """
+    Add each ``(name, ddl)`` column that *table* does not have yet.
+
+    PostgreSQL has no ``ADD COLUMN IF NOT EXISTS`` before 9.6 and SQLite has
+    none at all, so the table is inspected once and only missing columns are
+    altered.  Tables that do not exist are left to ``create_all``.
+    """
+    inspector = inspect(conn)
+    if table not in inspector.get_table_names():
+        return
+    existing = {col["name"] for col in inspector.get_columns(table)}
+    quoted = conn.dialect.identifier_preparer.quote(table)
+    for name, ddl in columns:
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE {quoted} ADD COLUMN {name} {ddl}"))
+
+
+def _create_indexes(conn: Connection, names: List[str]) -> None:
+    """Create the named model indexes if they do not exist yet."""
+    by_name = {
+        index.name: index
+        for table in db.metadata.sorted_tables
+        for index in table.indexes
+    }
+    for name in names:
+        index = by_name.get(name)
+        if index is None:
+            raise LookupError(f"Index {name!r} is not declared on any model")
+        index.create(bind=conn, checkfirst=True)
+
+
+# ------------------------------------------------------------------
+# Migrations
+# ------------------------------------------------------------------
+
+# Columns added to the original tables after they were first deployed.  These
+# used to be applied by inspect/ALTER blocks at import time in ``main.py``.
+
+def _add_user_oauth_columns(conn: Connection) -> None:
+    _add_missing_columns(conn, "user", [
+        ("oauth_provider", "VARCHAR(20)"),
+        ("oauth_provider_id", "VARCHAR(255)"),
+        ("avatar_url", "VARCHAR(500)"),
+    ])
+    if conn.dialect.name == "postgresql":
+        # OAuth users have no password
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'user'
+                    AND column_name = 'password_hash'
+                    AND is_nullable = 'NO'
+                ) THEN
+                    ALTER TABLE "user" ALTER COLUMN password_hash DROP NOT NULL;
+                END IF;
+            END $$;
+        """))
+
+
+def _add_user_telegram_chat_id(conn: Connection) -> None:
+    _add_missing_columns(conn, "user", [
+        ("telegram_chat_id", "VARCHAR(50)"),
+    ])
+
+
+def _add_task_board_columns(conn: Connection) -> None:
+    _add_missing_columns(conn, "task", [
+        ("board_column", "VARCHAR(50) DEFAULT 'todo'"),
+        ("board_position", "INTEGER DEFAULT 0"),
+        ("status", "VARCHAR(50) DEFAULT 'todo'"),
+    ])
+
+
+def _add_stakeholder_profile_columns(conn: Connection) -> None:
+    _add_missing_columns(conn, "stakeholder", [
+        ("family_info", "TEXT"),
+        ("hobbies", "TEXT"),
+        ("education", "TEXT"),
+        ("career_history", "TEXT"),
+        ("job_title", "VARCHAR(100)"),
+        ("seniority_level", "VARCHAR(50)"),
+        ("years_experience", "INTEGER"),
+        ("specializations", "TEXT"),
+        ("decision_making_authority", "VARCHAR(50) DEFAULT 'low'"),
+        ("budget_authority", "VARCHAR(50) DEFAULT 'none'"),
+        ("location", "VARCHAR(100)"),
+        ("timezone", "VARCHAR(50)"),
+        ("preferred_language", "VARCHAR(50) DEFAULT 'English'"),
+        ("cultural_background", "VARCHAR(100)"),
+        ("preferred_communication_method", "VARCHAR(50) DEFAULT 'email'"),
+        ("communication_frequency", "VARCHAR(50) DEFAULT 'weekly'"),
+        ("best_contact_time", "VARCHAR(100)"),
+        ("communication_style", "VARCHAR(50)"),
+        ("linkedin_url", "VARCHAR(200)"),
+        ("twitter_handle", "VARCHAR(50)"),
+        ("other_social_links", "TEXT"),
+        ("current_projects", "TEXT"),
+        ("availability_status", "VARCHAR(50) DEFAULT 'available'"),
+        ("trust_level", "INTEGER DEFAULT 5"),
+        ("collaboration_history", "TEXT"),
+        ("conflict_resolution_style", "VARCHAR(50)"),
+        ("strategic_value", "VARCHAR(50) DEFAULT 'medium'"),
+        ("risk_level", "VARCHAR(50) DEFAULT 'low'"),
+        ("opportunity_potential", "VARCHAR(50) DEFAULT 'medium'"),
+        ("sentiment", "VARCHAR(20) DEFAULT 'neutral'"),
+        ("influence", "INTEGER DEFAULT 5"),
+        ("interest", "INTEGER DEFAULT 5"),
+        ("tags", "TEXT"),
+        ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+        ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+        ("last_contact", "TIMESTAMP"),
+    ])
+
+
+# Composite per-user indexes backing the list, Kanban and analytics queries
+HOT_PATH_INDEXES = [
+    "ix_task_user_board",
+    "ix_task_user_status_due",
+    "ix_task_user_priority_created",
+    "ix_task_user_created",
+    "ix_note_user_created",
+    "ix_note_user_category_created",
+    "ix_note_stakeholder",
+    "ix_stakeholder_user_name",
+    "ix_stakeholder_user_sentiment",
+    "ix_task_categories_user_active",
+    "ix_enhanced_tasks_user_board",
+    "ix_enhanced_tasks_user_status_due",
+    "ix_enhanced_tasks_user_priority",
+    "ix_enhanced_tasks_user_created",
+    "ix_enhanced_tasks_parent",
+    "ix_stakeholder_relationships_user_active",
+    "ix_stakeholder_interactions_user_date",
+    "ix_stakeholder_interactions_user_stakeholder_date",
+]
+
+
+def _add_hot_path_indexes(conn: Connection) -> None:
+    # Predates the column migrations below but indexes some of their columns,
+    # which databases from before those columns existed do not have yet
+    _add_task_board_columns(conn)
+    _add_stakeholder_profile_columns(conn)
+    _create_indexes(conn, HOT_PATH_INDEXES)
+
+
+def _add_board_ranks(conn: Connection) -> None:
+    """Add ``board_rank`` and convert each column's ``board_position`` order into keys."""
+    from src.ranking import spread_ranks
+
+    rank_type = 'VARCHAR(64) COLLATE "C"' if conn.dialect.name == "postgresql" else "VARCHAR(64)"
+    for name in ("task", "enhanced_tasks"):
+        _add_missing_columns(conn, name, [("board_rank", rank_type)])
+        table = db.metadata.tables[name]
+        rows = conn.execute(
+            select(table.c.id, table.c.user_id, table.c.board_column)
+            .where(table.c.board_rank.is_(None))
+            .order_by(table.c.user_id, table.c.board_column, table.c.board_position, table.c.id)
+        ).all()
+        updates = []
+        for _, group in groupby(rows, key=lambda row: (row.user_id, row.board_column)):
+            group = list(group)
+            updates.extend(
+                {"row_id": row.id, "rank": rank}
+                for row, rank in zip(group, spread_ranks(len(group)))
+            )
+        if updates:
+            conn.execute(
+                table.update().where(table.c.id == bindparam("row_id")).values(board_rank=bindparam("rank")),
+                updates,
+            )
+    _create_indexes(conn, ["ix_task_user_board_rank", "ix_enhanced_tasks_user_board_rank"])
+
+
+def _add_search_indexes(conn: Connection) -> None:
+    """tsvector columns + GIN indexes on PostgreSQL, an FTS5 table + triggers on SQLite."""
+    from src.search import install_search_index
+
+    install_search_index(conn)
+
+
+def _add_trigram_indexes(conn: Connection) -> None:
+    """pg_trgm GIN indexes for fuzzy stakeholder matching (PostgreSQL only)."""
+    from src.stakeholder_match import install_trigram_indexes
+
+    install_trigram_indexes(conn)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "add_hot_path_indexes", _add_hot_path_indexes),
+    Migration(2, "add_user_oauth_columns", _add_user_oauth_columns),
+    Migration(3, "add_user_telegram_chat_id", _add_user_telegram_chat_id),
+    Migration(4, "add_task_board_columns", _add_task_board_columns),
+    Migration(5, "add_stakeholder_profile_columns", _add_stakeholder_profile_columns),
+    Migration(6, "add_board_ranks", _add_board_ranks),
+    Migration(7, "add_search_indexes", _add_search_indexes),
+    Migration(8, "add_trigram_indexes", _add_trigram_indexes),
+]
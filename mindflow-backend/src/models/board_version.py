@@ -0,0 +1,87 @@
+"""
+Per-user version counter for the task boards.
+
+Every flush that inserts, changes or deletes a tracked task bumps the
+owner's counter in ``task_board_versions``, in the same transaction.  The
+Kanban endpoint folds the counter into its ETag, so a poll can answer
+``304 Not Modified`` without loading or serializing a single task.
+
+Bulk statements (``update(Model)``, ``delete(Model)``) bypass the ORM
+events; code that uses them calls ``bump_board_versions`` itself.
+"""
+from __future__ import annotations
+
+from itertools import chain
+from typing import Iterable
+
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.models.db import db
+from src.response_cache import mark_stale
+
+# Models whose rows belong to a user's board (registered by the model modules)
+_TRACKED_MODELS = set()
+
+
+class TaskBoardVersion(db.Model):
+    __tablename__ = 'task_board_versions'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TaskBoardVersion user={self.user_id} v{self.version}>'
+
+
+def track_board_version(model) -> None:
+    """Bump the owner's board version whenever ``model`` rows are flushed."""
+    _TRACKED_MODELS.add(model)
+
+
+def bump_board_versions(connection, user_ids: Iterable[int]) -> None:
+    """Increment the board version of every user in ``user_ids`` (upsert)."""
+    user_ids = sorted({user_id for user_id in user_ids if user_id is not None})
+    if not user_ids:
+        return
+    # Bulk task writes come through here too; their cached lists go on commit
+    mark_stale(user_ids, 'tasks')
+    table = TaskBoardVersion.__table__
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        statement = insert(table).values([{'user_id': user_id, 'version': 1} for user_id in user_ids])
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={'version': table.c.version + 1},
+        ))
+        return
+
+    connection.execute(
+        update(table).where(table.c.user_id.in_(user_ids)).values(version=table.c.version + 1)
+    )
+    existing = set(connection.execute(select(table.c.user_id).where(table.c.user_id.in_(user_ids))).scalars())
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        connection.execute(table.insert(), [{'user_id': user_id, 'version': 1} for user_id in missing])
+
+
+def board_version_for(user_id: int):
+    """Scalar subquery with the user's board version (0 if never bumped)."""
+    table = TaskBoardVersion.__table__
+    return db.func.coalesce(
+        select(table.c.version).where(table.c.user_id == user_id).scalar_subquery(), 0
+    )
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_after_flush(session, flush_context):
+    # new/dirty/deleted still describe what this flush wrote
+    user_ids = {
+        obj.user_id
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if type(obj) in _TRACKED_MODELS and (obj not in session.dirty or session.is_modified(obj))
+    }
+    if user_ids:
+        bump_board_versions(session.connection(), user_ids)
@@ -1,5 +1,8 @@
 from src.models.user import db
 from datetime import datetime
+from src.models.board_version import track_board_version
+from src.models.task_stats import track_task_stats
+from src.ranking import assign_rank_on_insert
 
 class TaskCategory(db.Model):
     """Model for task categories and projects"""
@@ -47,8 +50,8 @@ class TaskCategory(db.Model):
             'sort_order': self.sort_order,
             'is_active': self.is_active,
             'is_archived': self.is_archived,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'task_count': len(self.tasks) if self.tasks else 0
         }
 
@@ -102,7 +105,9 @@ class EnhancedTask(db.Model):
     
     # Kanban board positioning
     board_column = db.Column(db.String(50), default='todo')  # todo, in_progress, review, done
-    board_position = db.Column(db.Integer, default=0)  # Position within column
+    board_position = db.Column(db.Integer, default=0)  # Legacy position, superseded by board_rank
+    # Fractional order key within the column (see src/ranking.py); C collation keeps Postgres byte order
+    board_rank = db.Column(db.String(64).with_variant(db.String(64, collation='C'), 'postgresql'), nullable=True)
     
     # Time tracking
     time_spent = db.Column(db.Integer, default=0)  # Total minutes spent
@@ -196,7 +201,12 @@ class EnhancedTask(db.Model):
         
         return all(task.status == 'done' for task in dependent_tasks)
     
-    def to_dict(self):
+    def to_dict(self, can_start=None, subtask_count=None):
+        """Serialize the task. Pass prefetched can_start/subtask_count to avoid per-row queries"""
+        if can_start is None:
+            can_start = self.can_start()
+        if subtask_count is None:
+            subtask_count = len(self.subtasks) if self.subtasks else 0
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -205,8 +215,8 @@ class EnhancedTask(db.Model):
             'description': self.description,
             'status': self.status,
             'priority': self.priority,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'due_date': self.due_date,
+            'start_date': self.start_date,
             'estimated_duration': self.estimated_duration,
             'actual_duration': self.actual_duration,
             'energy_level_required': self.energy_level_required,
@@ -220,18 +230,81 @@ class EnhancedTask(db.Model):
             'completion_notes': self.completion_notes,
             'is_recurring': self.is_recurring,
             'recurrence_pattern': self.recurrence_pattern,
-            'recurrence_end_date': self.recurrence_end_date.isoformat() if self.recurrence_end_date else None,
+            'recurrence_end_date': self.recurrence_end_date,
             'tags': self.get_tags_list(),
             'board_column': self.board_column,
             'board_position': self.board_position,
+            'board_rank': self.board_rank,
             'time_spent': self.time_spent,
-            'last_worked_on': self.last_worked_on.isoformat() if self.last_worked_on else None,
+            'last_worked_on': self.last_worked_on,
             'source': self.source,
             'external_id': self.external_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'completed_at': self.completed_at,
             'is_overdue': self.is_overdue(),
-            'can_start': self.can_start(),
-            'subtask_count': len(self.subtasks) if self.subtasks else 0
+            'can_start': can_start,
+            'subtask_count': subtask_count
         }
+    
+    @classmethod
+    def to_dict_many(cls, tasks):
+        """Serialize a list of tasks with at most two grouped queries.
+        
+        to_dict() on its own runs one query for can_start() and lazy-loads
+        subtasks for every task.  Here subtask counts and dependency statuses
+        are prefetched for the whole list and looked up in memory.
+        """
+        if not tasks:
+            return []
+        
+        from sqlalchemy import func
+        task_ids = [task.id for task in tasks]
+        subtask_counts = dict(
+            db.session.query(cls.parent_task_id, func.count(cls.id))
+            .filter(cls.parent_task_id.in_(task_ids))
+            .group_by(cls.parent_task_id)
+            .all()
+        )
+        
+        # Dependencies that are part of the list need no query at all
+        depends_on = {task.id: task.get_depends_on_list() for task in tasks}
+        statuses = {task.id: (task.user_id, task.status) for task in tasks}
+        missing_ids = {dep_id for deps in depends_on.values() for dep_id in deps} - statuses.keys()
+        if missing_ids:
+            for dep_id, user_id, status in db.session.query(cls.id, cls.user_id, cls.status).filter(
+                cls.id.in_(missing_ids)
+            ):
+                statuses[dep_id] = (user_id, status)
+        
+        def can_start(task):
+            # Same semantics as can_start(): unknown or foreign task IDs are ignored
+            return all(
+                statuses[dep_id][1] == 'done'
+                for dep_id in depends_on[task.id]
+                if dep_id in statuses and statuses[dep_id][0] == task.user_id
+            )
+        
+        return [
+            task.to_dict(can_start=can_start(task), subtask_count=subtask_counts.get(task.id, 0))
+            for task in tasks
+        ]
+
+
+# Composite indexes for the per-user list, Kanban and analytics queries
+db.Index('ix_task_categories_user_active', TaskCategory.user_id, TaskCategory.is_active, TaskCategory.sort_order, TaskCategory.name)
+db.Index('ix_enhanced_tasks_user_board', EnhancedTask.user_id, EnhancedTask.board_column, EnhancedTask.board_position)
+db.Index('ix_enhanced_tasks_user_board_rank', EnhancedTask.user_id, EnhancedTask.board_column, EnhancedTask.board_rank)
+db.Index('ix_enhanced_tasks_user_status_due', EnhancedTask.user_id, EnhancedTask.status, EnhancedTask.due_date)
+db.Index('ix_enhanced_tasks_user_priority', EnhancedTask.user_id, EnhancedTask.priority)
+db.Index('ix_enhanced_tasks_user_created', EnhancedTask.user_id, EnhancedTask.created_at.desc())
+db.Index('ix_enhanced_tasks_parent', EnhancedTask.parent_task_id)
+
+# New cards are appended to their Kanban column
+db.event.listen(EnhancedTask, 'before_insert', assign_rank_on_insert)
+
+# Every write bumps the owner's board version (Kanban ETag)
+track_board_version(EnhancedTask)
+
+# Writes keep the analytics rollup (user_task_stats) current
+track_task_stats(EnhancedTask)
@@ -1,5 +1,6 @@
 from src.models.user import db
 from datetime import datetime
+from src.response_cache import cache_resources
 
 class Note(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -23,7 +24,16 @@ class Note(db.Model):
             'title': self.title,
             'content': self.content,
             'category': self.category,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'stakeholder_id': self.stakeholder_id
         }
+
+
+# Composite indexes for the per-user note listings (newest first)
+db.Index('ix_note_user_created', Note.user_id, Note.created_at.desc())
+db.Index('ix_note_user_category_created', Note.user_id, Note.category, Note.created_at.desc())
+db.Index('ix_note_stakeholder', Note.stakeholder_id)
+
+# Writes retire the owner's cached /api/notes pages and insight snapshot
+cache_resources(Note, 'notes', 'insights')
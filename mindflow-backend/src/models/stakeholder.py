@@ -1,5 +1,6 @@
 from src.models.user import db
 from datetime import datetime
+from src.response_cache import cache_resources
 
 class Stakeholder(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -123,53 +124,116 @@ class Stakeholder(db.Model):
         else:
             self.current_projects = None
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'name': self.name,
-            'role': self.role,
-            'company': self.company,
-            'department': self.department,
-            'work_style': self.work_style,
-            'email': self.email,
-            'phone': self.phone,
-            'birthday': self.birthday,
-            'personal_notes': self.personal_notes,
-            'family_info': self.family_info,
-            'hobbies': self.hobbies,
-            'education': self.education,
-            'career_history': self.career_history,
-            'job_title': self.job_title,
-            'seniority_level': self.seniority_level,
-            'years_experience': self.years_experience,
-            'specializations': self.get_specializations_list(),
-            'decision_making_authority': self.decision_making_authority,
-            'budget_authority': self.budget_authority,
-            'location': self.location,
-            'timezone': self.timezone,
-            'preferred_language': self.preferred_language,
-            'cultural_background': self.cultural_background,
-            'preferred_communication_method': self.preferred_communication_method,
-            'communication_frequency': self.communication_frequency,
-            'best_contact_time': self.best_contact_time,
-            'communication_style': self.communication_style,
-            'linkedin_url': self.linkedin_url,
-            'twitter_handle': self.twitter_handle,
-            'other_social_links': self.other_social_links,
-            'current_projects': self.get_current_projects_list(),
-            'availability_status': self.availability_status,
-            'trust_level': self.trust_level,
-            'collaboration_history': self.collaboration_history,
-            'conflict_resolution_style': self.conflict_resolution_style,
-            'strategic_value': self.strategic_value,
-            'risk_level': self.risk_level,
-            'opportunity_potential': self.opportunity_potential,
-            'sentiment': self.sentiment,
-            'influence': self.influence,
-            'interest': self.interest,
-            'tags': self.get_tags_list(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'last_contact': self.last_contact.isoformat() if self.last_contact else None
-        }
+    # Fields a merge never touches
+    _MERGE_SKIP = {'id', 'user_id', 'created_at', 'updated_at', 'last_contact'}
+    # Free-text fields a merge appends to instead of leaving alone
+    _MERGE_APPEND = {'personal_notes'}
+    
+    def merge_missing(self, values):
+        """Fill empty fields from values, e.g. when a duplicate is merged in.
+        
+        Existing data is never overwritten; only personal_notes gets new text
+        appended. Returns the names of the fields that changed.
+        """
+        changed = []
+        for name, value in values.items():
+            if name in self._MERGE_SKIP or name not in self.FIELDS:
+                continue
+            if isinstance(value, list):
+                value = ', '.join(str(item).strip() for item in value if str(item).strip())
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == '':
+                continue
+            current = getattr(self, name)
+            if current is None or current == '':
+                setattr(self, name, value)
+                changed.append(name)
+            elif name in self._MERGE_APPEND and str(value) not in current:
+                setattr(self, name, f"{current}\n\n{value}")
+                changed.append(name)
+        return changed
+    
+    # Serialized field names, in response order
+    FIELDS = [
+        'id', 'user_id', 'name', 'role', 'company', 'department', 'work_style',
+        'email', 'phone', 'birthday', 'personal_notes', 'family_info', 'hobbies',
+        'education', 'career_history', 'job_title', 'seniority_level',
+        'years_experience', 'specializations', 'decision_making_authority',
+        'budget_authority', 'location', 'timezone', 'preferred_language',
+        'cultural_background', 'preferred_communication_method',
+        'communication_frequency', 'best_contact_time', 'communication_style',
+        'linkedin_url', 'twitter_handle', 'other_social_links', 'current_projects',
+        'availability_status', 'trust_level', 'collaboration_history',
+        'conflict_resolution_style', 'strategic_value', 'risk_level',
+        'opportunity_potential', 'sentiment', 'influence', 'interest', 'tags',
+        'created_at', 'updated_at', 'last_contact'
+    ]
+    
+    # Named sparse fieldsets; None means every field
+    VIEWS = {
+        'summary': [
+            'id', 'name', 'role', 'company', 'job_title', 'email',
+            'sentiment', 'influence', 'interest', 'last_contact'
+        ],
+        'card': [
+            'id', 'name', 'role', 'company', 'department', 'job_title', 'seniority_level',
+            'email', 'phone', 'location', 'timezone', 'linkedin_url',
+            'preferred_communication_method', 'availability_status', 'trust_level',
+            'strategic_value', 'sentiment', 'influence', 'interest', 'tags',
+            'updated_at', 'last_contact'
+        ],
+        'full': None,
+    }
+    
+    _LIST_FIELDS = {
+        'specializations': 'get_specializations_list',
+        'current_projects': 'get_current_projects_list',
+        'tags': 'get_tags_list',
+    }
+    
+    @classmethod
+    def resolve_fields(cls, view=None, fields=None):
+        """Turn a view name and/or comma-separated field list into field names.
+        
+        Explicit fields win over the view. Returns None for every field and
+        raises ValueError for unknown views or fields.
+        """
+        if fields:
+            names = [name.strip() for name in fields.split(',') if name.strip()]
+            unknown = [name for name in names if name not in cls.FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown stakeholder field(s): {', '.join(unknown)}")
+            if 'id' not in names:
+                names.insert(0, 'id')
+            return names
+        if view:
+            if view not in cls.VIEWS:
+                raise ValueError(f"Unknown view '{view}'. Use one of: {', '.join(cls.VIEWS)}")
+            return cls.VIEWS[view]
+        return None
+    
+    @classmethod
+    def load_options(cls, field_names):
+        """Query options that load only the columns needed for field_names"""
+        from sqlalchemy.orm import load_only
+        if field_names is None:
+            return []
+        return [load_only(*(getattr(cls, name) for name in field_names))]
+    
+    def _field_value(self, name):
+        if name in self._LIST_FIELDS:
+            return getattr(self, self._LIST_FIELDS[name])()
+        return getattr(self, name)
+    
+    def to_dict(self, fields=None):
+        """Serialize the stakeholder; only the given fields are read when fields is set"""
+        return {name: self._field_value(name) for name in (fields or self.FIELDS)}
+
+
+# Composite indexes for the per-user stakeholder listings
+db.Index('ix_stakeholder_user_name', Stakeholder.user_id, Stakeholder.name)
+db.Index('ix_stakeholder_user_sentiment', Stakeholder.user_id, Stakeholder.sentiment)
+
+# Writes retire the owner's cached stakeholder lists, network graph and insight snapshot
+cache_resources(Stakeholder, 'stakeholders', 'network', 'insights')
@@ -1,5 +1,6 @@
 from src.models.user import db
 from datetime import datetime
+from src.response_cache import cache_resources
 
 class StakeholderRelationship(db.Model):
     """Model for relationships between stakeholders"""
@@ -45,8 +46,8 @@ class StakeholderRelationship(db.Model):
             'context': self.context,
             'description': self.description,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class StakeholderInteraction(db.Model):
@@ -110,7 +111,7 @@ class StakeholderInteraction(db.Model):
             'user_id': self.user_id,
             'stakeholder_id': self.stakeholder_id,
             'interaction_type': self.interaction_type,
-            'interaction_date': self.interaction_date.isoformat() if self.interaction_date else None,
+            'interaction_date': self.interaction_date,
             'duration_minutes': self.duration_minutes,
             'title': self.title,
             'description': self.description,
@@ -118,11 +119,25 @@ class StakeholderInteraction(db.Model):
             'sentiment': self.sentiment,
             'quality_rating': self.quality_rating,
             'follow_up_required': self.follow_up_required,
-            'follow_up_date': self.follow_up_date.isoformat() if self.follow_up_date else None,
+            'follow_up_date': self.follow_up_date,
             'follow_up_completed': self.follow_up_completed,
             'location': self.location,
             'attendees': self.attendees,
             'tags': self.get_tags_list(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
+
+
+# Composite indexes for the per-user relationship and interaction listings
+db.Index('ix_stakeholder_relationships_user_active', StakeholderRelationship.user_id, StakeholderRelationship.is_active)
+db.Index('ix_stakeholder_interactions_user_date', StakeholderInteraction.user_id, StakeholderInteraction.interaction_date.desc())
+db.Index(
+    'ix_stakeholder_interactions_user_stakeholder_date',
+    StakeholderInteraction.user_id,
+    StakeholderInteraction.stakeholder_id,
+    StakeholderInteraction.interaction_date.desc(),
+)
+
+# Writes retire the owner's cached network graph
+cache_resources(StakeholderRelationship, 'network')
@@ -1,5 +1,8 @@
 from src.models.user import db
 from datetime import datetime
+from src.models.board_version import track_board_version
+from src.ranking import assign_rank_on_insert
+from src.response_cache import cache_resources
 
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -17,7 +20,9 @@ class Task(db.Model):
     
     # Kanban board positioning (for drag-and-drop)
     board_column = db.Column(db.String(50), default='todo')  # todo, in_progress, review, done
-    board_position = db.Column(db.Integer, default=0)  # Position within column
+    board_position = db.Column(db.Integer, default=0)  # Legacy position, superseded by board_rank
+    # Fractional order key within the column (see src/ranking.py); C collation keeps Postgres byte order
+    board_rank = db.Column(db.String(64).with_variant(db.String(64, collation='C'), 'postgresql'), nullable=True)
     status = db.Column(db.String(50), default='todo')  # todo, in_progress, waiting, done
 
     def __repr__(self):
@@ -32,10 +37,28 @@ class Task(db.Model):
             'due_date': self.due_date,
             'priority': self.priority,
             'completed': self.completed,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'stakeholder_id': self.stakeholder_id,
             'board_column': getattr(self, 'board_column', 'todo'),
             'board_position': getattr(self, 'board_position', 0),
+            'board_rank': self.board_rank,
             'status': getattr(self, 'status', 'todo')
         }
+
+
+# Composite indexes for the per-user list, Kanban and status queries
+db.Index('ix_task_user_board', Task.user_id, Task.board_column, Task.board_position)
+db.Index('ix_task_user_board_rank', Task.user_id, Task.board_column, Task.board_rank)
+db.Index('ix_task_user_status_due', Task.user_id, Task.status, Task.due_date)
+db.Index('ix_task_user_priority_created', Task.user_id, Task.priority, Task.created_at)
+db.Index('ix_task_user_created', Task.user_id, Task.created_at.desc())
+
+# New cards are appended to their Kanban column
+db.event.listen(Task, 'before_insert', assign_rank_on_insert)
+
+# Every write bumps the owner's board version (Kanban ETag)
+track_board_version(Task)
+
+# ...and retires the owner's cached /api/tasks pages and insight snapshot
+cache_resources(Task, 'tasks', 'insights')
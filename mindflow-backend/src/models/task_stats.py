@@ -0,0 +1,384 @@
+"""
+Per-user task analytics rollup (``user_task_stats``).
+
+One row per user holds everything ``/api/tasks/analytics`` reports:
+
+- total count, counts by status and by priority
+- ``actual_duration`` sum and count over done tasks
+- ``overdue_tasks`` and ``due_this_week`` as counters of open tasks, each
+  valid for a stretch of time:
+
+  - ``overdue_count`` counts open tasks due before ``overdue_until``;
+    ``next_due_at`` is a lower bound of the first due date after it, so
+    until then no task can have become overdue;
+  - ``due_week_count`` counts open tasks due in the seven days from
+    ``week_start`` (a UTC midnight), so it is valid for that day.
+
+  Once ``next_due_at`` has passed or the day has changed, the read path
+  recomputes the counters with one aggregate (``refresh_due_counters``).
+
+ORM flushes keep the row current incrementally: before a flush the
+committed "footprint" (status, priority, duration, open due date) of every
+changed or deleted task is recorded, after the flush the new footprints
+are added and the old ones subtracted, in the same transaction.  Each
+write updates a fixed set of counters, however many due dates a user has.
+When an old value cannot be known (an attribute that was never loaded)
+the row is recomputed from scratch instead.  ``reconcile_task_stats``
+recomputes every row and is run periodically by the maintenance
+scheduler to catch writes that bypass the ORM.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+
+from src.models.db import db
+
+logger = logging.getLogger(__name__)
+
+# Tasks in these states are neither overdue nor due
+CLOSED_STATUSES = ('done', 'cancelled')
+_FOOTPRINT_ATTRS = ('user_id', 'status', 'priority', 'actual_duration', 'due_date')
+_PENDING_KEY = 'task_stats_old_footprints'
+# Columns that do not depend on the time they were computed at
+_ROLLUP_KEYS = ('total_tasks', 'status_counts', 'priority_counts', 'duration_sum', 'duration_count')
+WEEK = timedelta(days=7)
+
+# The tracked model (registered by src.models.enhanced_task)
+_tracked_model = None
+
+
+class UserTaskStats(db.Model):
+    __tablename__ = 'user_task_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_tasks = db.Column(db.Integer, nullable=False, default=0)
+    status_counts = db.Column(db.Text, nullable=False, default='{}')  # JSON {status: count}
+    priority_counts = db.Column(db.Text, nullable=False, default='{}')  # JSON {priority: count}
+    duration_sum = db.Column(db.Integer, nullable=False, default=0)  # Minutes, done tasks only
+    duration_count = db.Column(db.Integer, nullable=False, default=0)
+    overdue_count = db.Column(db.Integer, nullable=False, default=0)  # Open tasks due before overdue_until
+    overdue_until = db.Column(db.DateTime, nullable=True)  # None: due counters must be recomputed
+    next_due_at = db.Column(db.DateTime, nullable=True)  # Lower bound of the next due date >= overdue_until
+    week_start = db.Column(db.DateTime, nullable=True)  # UTC midnight of the day due_week_count is for
+    due_week_count = db.Column(db.Integer, nullable=False, default=0)  # Open tasks due in [week_start, +7 days]
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reconciled_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<UserTaskStats user={self.user_id} total={self.total_tasks}>'
+
+    def due_counters_stale(self, now: datetime) -> bool:
+        """Whether ``overdue_count`` / ``due_week_count`` no longer hold at ``now``"""
+        return (
+            self.overdue_until is None
+            or (self.next_due_at is not None and self.next_due_at < now)
+            or self.week_start != _day_start(now)
+        )
+
+    def to_analytics(self) -> dict:
+        """The ``/api/tasks/analytics`` payload; callers refresh stale due counters first (``due_counters_stale``)"""
+        status_counts = json.loads(self.status_counts or '{}')
+
+        completed_tasks = status_counts.get('done', 0)
+        completion_rate = (completed_tasks / self.total_tasks * 100) if self.total_tasks > 0 else 0
+        avg_completion_time = self.duration_sum / self.duration_count if self.duration_count else 0
+        return {
+            'total_tasks': self.total_tasks,
+            'completed_tasks': completed_tasks,
+            'overdue_tasks': self.overdue_count,
+            'due_this_week': self.due_week_count,
+            'completion_rate': round(completion_rate, 2),
+            'avg_completion_time_minutes': round(avg_completion_time, 2),
+            'priority_distribution': json.loads(self.priority_counts or '{}'),
+            'status_distribution': status_counts,
+        }
+
+
+# ------------------------------------------------------------------
+# Footprints and deltas
+# ------------------------------------------------------------------
+
+class _Delta:
+    """Accumulated change to one user's rollup."""
+
+    def __init__(self):
+        self.total = 0
+        self.status = Counter()
+        self.priority = Counter()
+        self.duration_sum = 0
+        self.duration_count = 0
+        self.due = Counter()
+
+    def add(self, footprint, sign: int) -> None:
+        status, priority, duration, due = footprint
+        self.total += sign
+        self.status[_key(status)] += sign
+        self.priority[_key(priority)] += sign
+        if duration is not None:
+            self.duration_sum += sign * duration
+            self.duration_count += sign
+        if due is not None:
+            self.due[due] += sign
+
+
+def _day_start(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _key(value) -> str:
+    # JSON object keys are strings; None becomes "null" just like json.dumps does
+    return 'null' if value is None else str(value)
+
+
+def _footprint(status, priority, actual_duration, due_date):
+    """What one task contributes to its owner's rollup."""
+    duration = actual_duration if status == 'done' and actual_duration is not None else None
+    due = due_date if due_date is not None and status is not None and status not in CLOSED_STATUSES else None
+    return status, priority, duration, due
+
+
+def _committed_values(obj) -> Optional[dict]:
+    """Attribute values as of the last flush, or None if one of them is unknown."""
+    state = inspect(obj)
+    values = {}
+    for attr in _FOOTPRINT_ATTRS:
+        if attr in state.committed_state:
+            # Modified: the old value, or NO_VALUE if it was never loaded
+            value = state.committed_state[attr]
+            if value is NO_VALUE:
+                return None
+        else:
+            value = getattr(obj, attr)
+        values[attr] = value
+    return values
+
+
+def _apply(counts: Dict[str, int], delta: Counter) -> Dict[str, int]:
+    merged = Counter(counts)
+    merged.update(delta)
+    return {key: count for key, count in sorted(merged.items()) if count > 0}
+
+
+# ------------------------------------------------------------------
+# Full computation
+# ------------------------------------------------------------------
+
+def compute_task_stats(connection, user_id: int, now: Optional[datetime] = None) -> dict:
+    """Column values of ``user_id``'s rollup, recomputed with two grouped queries."""
+    table = _tracked_model.__table__
+    rows = connection.execute(
+        select(
+            table.c.status,
+            table.c.priority,
+            func.count(),
+            func.coalesce(func.sum(table.c.actual_duration), 0),
+            func.count(table.c.actual_duration),
+        ).where(table.c.user_id == user_id).group_by(table.c.status, table.c.priority)
+    ).all()
+
+    total, status, priority = 0, Counter(), Counter()
+    duration_sum = duration_count = 0
+    for row_status, row_priority, count, row_duration_sum, row_duration_count in rows:
+        total += count
+        status[_key(row_status)] += count
+        priority[_key(row_priority)] += count
+        if row_status == 'done':
+            duration_sum += int(row_duration_sum)
+            duration_count += row_duration_count
+    return {
+        'user_id': user_id,
+        'total_tasks': total,
+        'status_counts': json.dumps(_apply({}, status)),
+        'priority_counts': json.dumps(_apply({}, priority)),
+        'duration_sum': duration_sum,
+        'duration_count': duration_count,
+        **compute_due_counters(connection, user_id, now or datetime.utcnow()),
+    }
+
+
+def compute_due_counters(connection, user_id: int, now: datetime) -> dict:
+    """``overdue_count`` / ``due_week_count`` and their validity, as of ``now``."""
+    table = _tracked_model.__table__
+    week_start = _day_start(now)
+    due = table.c.due_date
+    overdue, due_week, next_due = connection.execute(
+        select(
+            func.coalesce(func.sum(case((due < now, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((due.between(week_start, week_start + WEEK), 1), else_=0)), 0),
+            func.min(case((due >= now, due))),
+        ).where(
+            table.c.user_id == user_id,
+            due.isnot(None),
+            # Like the analytics queries this replaced: tasks without a status are not counted
+            table.c.status.notin_(CLOSED_STATUSES),
+        )
+    ).one()
+    return {
+        'overdue_count': int(overdue),
+        'overdue_until': now,
+        'next_due_at': next_due,
+        'week_start': week_start,
+        'due_week_count': int(due_week),
+    }
+
+
+def refresh_due_counters(connection, user_id: int, now: Optional[datetime] = None) -> dict:
+    """Recompute and store the due counters of an existing rollup row. Returns them."""
+    table = UserTaskStats.__table__
+    # Lock the row so a concurrent flush cannot apply a delta to counters being replaced
+    connection.execute(select(table.c.user_id).where(table.c.user_id == user_id).with_for_update())
+    values = compute_due_counters(connection, user_id, now or datetime.utcnow())
+    connection.execute(table.update().where(table.c.user_id == user_id).values(**values))
+    return values
+
+
+def refresh_task_stats(connection, user_id: int) -> dict:
+    """Recompute and store ``user_id``'s rollup (upsert). Returns the stored values."""
+    now = datetime.utcnow()
+    values = dict(compute_task_stats(connection, user_id), updated_at=now, reconciled_at=now)
+    table = UserTaskStats.__table__
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        statement = insert(table).values(**values)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={key: value for key, value in values.items() if key != 'user_id'},
+        ))
+    elif connection.execute(table.update().where(table.c.user_id == user_id).values(**values)).rowcount == 0:
+        connection.execute(table.insert().values(**values))
+    return values
+
+
+def reconcile_task_stats(user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute rollups from the task table, committing per user.
+
+    Defaults to every user that has tasks or a rollup row.  Returns the
+    number of rows that had drifted.
+    """
+    table = UserTaskStats.__table__
+    if user_ids is None:
+        user_ids = sorted(set(db.session.execute(select(_tracked_model.user_id).distinct()).scalars())
+                          | set(db.session.execute(select(table.c.user_id)).scalars()))
+    drifted = 0
+    for user_id in user_ids:
+        try:
+            connection = db.session.connection()
+            before = connection.execute(select(table).where(table.c.user_id == user_id)).mappings().first()
+            after = refresh_task_stats(connection, user_id)
+            db.session.commit()
+            if before is None or any(before[key] != after[key] for key in _ROLLUP_KEYS):
+                drifted += 1
+        except Exception:
+            db.session.rollback()
+            logger.exception("Failed to reconcile task stats for user %s", user_id)
+    if drifted:
+        logger.info("Reconciled %d drifted task stats row(s)", drifted)
+    return drifted
+
+
+# ------------------------------------------------------------------
+# ORM hooks
+# ------------------------------------------------------------------
+
+def track_task_stats(model) -> None:
+    """Keep ``user_task_stats`` in step with flushes of ``model``."""
+    global _tracked_model
+    _tracked_model = model
+
+
+@event.listens_for(Session, 'before_flush')
+def _record_old_footprints(session, flush_context, instances):
+    if _tracked_model is None:
+        return
+    pending = session.info[_PENDING_KEY] = {}
+    for obj in chain(session.dirty, session.deleted):
+        if type(obj) is not _tracked_model or obj in session.new or id(obj) in pending:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        # The row still exists here, so unloaded attributes can be loaded; only
+        # modified-but-never-loaded ones are lost, and those force a recompute
+        old = _committed_values(obj)
+        pending[id(obj)] = old if old is not None else {'user_id': obj.user_id, 'unknown': True}
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_footprints(session, flush_context):
+    if _tracked_model is None:
+        return
+    pending = session.info.pop(_PENDING_KEY, {})
+    deltas = defaultdict(_Delta)
+    refresh = set()
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if type(obj) is not _tracked_model:
+            continue
+        if obj not in session.new:
+            if id(obj) not in pending:
+                continue
+            old = pending[id(obj)]
+            if old.get('unknown'):
+                refresh.add(old['user_id'])
+                if obj not in session.deleted:
+                    refresh.add(obj.user_id)
+                continue
+            deltas[old['user_id']].add(_footprint(old['status'], old['priority'], old['actual_duration'], old['due_date']), -1)
+        if obj not in session.deleted:
+            deltas[obj.user_id].add(_footprint(obj.status, obj.priority, obj.actual_duration, obj.due_date), +1)
+
+    if not deltas and not refresh:
+        return
+    connection = session.connection()
+    table = UserTaskStats.__table__
+    for user_id in sorted(set(deltas) | refresh):
+        row = None
+        if user_id not in refresh:
+            row = connection.execute(
+                select(table).where(table.c.user_id == user_id).with_for_update()
+            ).mappings().first()
+        if row is None:
+            # No rollup yet or an unknown old value: recompute, this flush included
+            refresh_task_stats(connection, user_id)
+            continue
+        delta = deltas[user_id]
+        connection.execute(table.update().where(table.c.user_id == user_id).values(
+            total_tasks=row['total_tasks'] + delta.total,
+            status_counts=json.dumps(_apply(json.loads(row['status_counts']), delta.status)),
+            priority_counts=json.dumps(_apply(json.loads(row['priority_counts']), delta.priority)),
+            duration_sum=row['duration_sum'] + delta.duration_sum,
+            duration_count=row['duration_count'] + delta.duration_count,
+            **_apply_due(row, delta.due),
+            updated_at=datetime.utcnow(),
+        ))
+
+
+def _apply_due(row, due: Counter) -> dict:
+    """Due counter columns after adding ``due`` (``{due date: +/-count}``) to ``row``."""
+    if row['overdue_until'] is None or not due:
+        # Stale counters are recomputed on the next read anyway
+        return {}
+    overdue, due_week, next_due = row['overdue_count'], row['due_week_count'], row['next_due_at']
+    week_start = row['week_start']
+    for due_date, count in due.items():
+        if not count:
+            continue
+        if due_date < row['overdue_until']:
+            overdue += count
+        elif count > 0 and (next_due is None or due_date < next_due):
+            # Removals keep next_due_at: a lower bound only triggers an early recompute
+            next_due = due_date
+        if week_start is not None and week_start <= due_date <= week_start + WEEK:
+            due_week += count
+    return {'overdue_count': overdue, 'due_week_count': due_week, 'next_due_at': next_due}
@@ -0,0 +1,162 @@
+"""
+Keyset (cursor) pagination for MindFlow/Rovot list endpoints.
+
+Instead of ``OFFSET``, each page continues strictly after the sort key of
+the last row of the previous page, so every page costs the same index range
+scan no matter how deep the client paginates, and rows inserted meanwhile
+never shift or duplicate results.
+
+The cursor handed to clients is opaque: the last row's sort key values,
+JSON encoded and base64url wrapped.  Sort keys must be non-null and end
+with a unique column (normally the primary key) so the order is total.
+
+Usage::
+
+    from src.pagination import SortKey, paginate, page_args
+
+    limit, cursor = page_args()
+    notes, next_cursor = paginate(
+        query,
+        [SortKey(Note.created_at, descending=True), SortKey(Note.id, descending=True)],
+        limit, cursor,
+    )
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from flask import request
+from sqlalchemy import and_, case, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when a ``cursor`` or ``limit`` query parameter cannot be used."""
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column (or SQL expression) of a keyset ordering."""
+    expression: Any
+    descending: bool = False
+
+    def ordering(self):
+        return self.expression.desc() if self.descending else self.expression.asc()
+
+
+def priority_rank(column, ranks: Optional[dict] = None):
+    """
+    CASE expression ranking priorities for ``ORDER BY`` (lower sorts first).
+
+    Unknown values sort last, matching the old in-Python sort in
+    ``tasks.get_tasks``.
+    """
+    ranks = ranks or {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+    return case(ranks, value=column, else_=len(ranks) + 1)
+
+
+# ------------------------------------------------------------------
+# Cursor encoding
+# ------------------------------------------------------------------
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, expected_length: int) -> List[Any]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise InvalidCursor('Malformed cursor') from exc
+    if not isinstance(values, list) or len(values) != expected_length:
+        raise InvalidCursor('Cursor does not match this listing')
+    try:
+        return [_decode_value(v) for v in values]
+    except (TypeError, ValueError) as exc:
+        raise InvalidCursor('Malformed cursor') from exc
+
+
+# ------------------------------------------------------------------
+# Query helpers
+# ------------------------------------------------------------------
+
+def page_args(default_limit: int = DEFAULT_PAGE_SIZE) -> Tuple[int, Optional[str]]:
+    """Read and validate ``limit`` and ``cursor`` from the request query string."""
+    raw_limit = request.args.get('limit')
+    if raw_limit is None or raw_limit == '':
+        limit = default_limit
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError as exc:
+            raise InvalidCursor('limit must be an integer') from exc
+        if limit < 1:
+            raise InvalidCursor('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE), request.args.get('cursor') or None
+
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]):
+    """
+    Predicate selecting rows strictly after *values* in *keys* order.
+
+    Expands to ``(k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...`` so it works
+    for mixed ascending/descending keys on every backend.
+    """
+    clauses = []
+    for i, key in enumerate(keys):
+        equal_prefix = [keys[j].expression == values[j] for j in range(i)]
+        step = key.expression < values[i] if key.descending else key.expression > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def paginate(query, keys: Sequence[SortKey], limit: int, cursor: Optional[str] = None):
+    """
+    Apply keyset ordering and paging to an ORM *query*.
+
+    Returns ``(items, next_cursor)``; ``next_cursor`` is ``None`` on the last
+    page.  Fetches ``limit + 1`` rows to know whether another page exists.
+    """
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, len(keys))))
+
+    labelled = [key.expression.label(f'_page_key_{i}') for i, key in enumerate(keys)]
+    rows = (
+        query.add_columns(*labelled)
+        .order_by(None)
+        .order_by(*(key.ordering() for key in keys))
+        .limit(limit + 1)
+        .all()
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [row[0] for row in rows]
+    next_cursor = encode_cursor(list(rows[-1][1:])) if has_more and rows else None
+    return items, next_cursor
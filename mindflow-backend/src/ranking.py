@@ -0,0 +1,340 @@
+"""
+Fractional (LexoRank-style) ordering keys for Kanban columns.
+
+Each card stores a ``board_rank`` string; a column is ordered by
+``(board_rank, id)``.  Moving a card computes a new key strictly between
+its new neighbours, so a move writes exactly one row instead of shifting
+every ``board_position`` below it.
+
+Keys are base-36 strings (``0-9a-z``) that never end in ``0``, which keeps
+a key available between any two distinct keys.  Appending (or prepending)
+steps the first digit that can still move, so the ends of a column grow
+by one character every 35 cards.  Inserts between two cards bisect and
+grow by roughly one character every few inserts at the same spot;
+``rebalance_column`` rewrites a column with short, evenly spaced keys,
+and the maintenance scheduler does that in the background for columns
+whose keys got too long.
+
+Usage::
+
+    from src.ranking import rank_between, rank_for_position
+
+    rank_between(None, None)        # 'i'  (first card)
+    rank_between('i', None)         # 'j'  (append)
+    rank_between(None, 'i')         # 'h'  (prepend)
+    rank_between('i', 'r')          # 'n'  (insert between)
+    task.board_rank = rank_for_position(Task, user_id, 'todo', 3, exclude_id=task.id)
+"""
+from __future__ import annotations
+
+import logging
+from typing import List, Optional
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import object_session
+
+from src.models.board_version import bump_board_versions
+from src.models.db import db
+
+logger = logging.getLogger(__name__)
+
+RANK_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# Columns whose keys exceed this length are rewritten by the rebalancer
+REBALANCE_RANK_LENGTH = 24
+# Hard limit, matches the ``board_rank`` column width
+MAX_RANK_LENGTH = 64
+
+
+# ------------------------------------------------------------------
+# Key arithmetic
+# ------------------------------------------------------------------
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """Key strictly between ``low`` ('' = start) and ``high`` (None = end)."""
+    if high is not None:
+        # Copy the common prefix, then find a key between the remainders
+        n = 0
+        while n < len(high) and (low[n] if n < len(low) else "0") == high[n]:
+            n += 1
+        if n > 0:
+            return high[:n] + _midpoint(low[n:], high[n:])
+
+    digit_low = RANK_DIGITS.index(low[0]) if low else 0
+    digit_high = RANK_DIGITS.index(high[0]) if high is not None else len(RANK_DIGITS)
+    if digit_high - digit_low > 1:
+        return RANK_DIGITS[(digit_low + digit_high + 1) // 2]
+    # Adjacent first digits
+    if high is not None and len(high) > 1:
+        return high[:1]
+    return RANK_DIGITS[digit_low] + _midpoint(low[1:], None)
+
+
+def _increment(key: str) -> str:
+    """Shortest key after ``key``: bump the first digit below ``z``."""
+    for n, char in enumerate(key):
+        digit = RANK_DIGITS.index(char)
+        if digit < len(RANK_DIGITS) - 1:
+            return key[:n] + RANK_DIGITS[digit + 1]
+    return key + RANK_DIGITS[1]
+
+
+def _decrement(key: str) -> str:
+    """Shortest key before ``key``: lower the first digit above ``1``."""
+    for n, char in enumerate(key):
+        digit = RANK_DIGITS.index(char)
+        if digit > 1:
+            return key[:n] + RANK_DIGITS[digit - 1]
+    # Only 0s and 1s: the first 1 becomes 0 and a top digit keeps it non-empty
+    n = key.index(RANK_DIGITS[1])
+    return key[:n] + RANK_DIGITS[0] + RANK_DIGITS[-1]
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Return a key that sorts strictly between ``before`` and ``after``.
+
+    ``None`` means "start of column" / "end of column".  Raises ValueError
+    if ``before >= after``, e.g. when two cards ended up with the same key.
+    """
+    for key in (before, after):
+        if key is not None and (not key or key.endswith("0") or key.strip(RANK_DIGITS)):
+            raise ValueError(f"Invalid rank key: {key!r}")
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Rank keys out of order: {before!r} >= {after!r}")
+    # Bisecting towards an open end would add a character every few cards
+    if before is not None and after is None:
+        return _increment(before)
+    if before is None and after is not None:
+        return _decrement(after)
+    return _midpoint(before or "", after)
+
+
+def spread_ranks(count: int) -> List[str]:
+    """``count`` short, evenly spaced keys in ascending order."""
+    if count <= 0:
+        return []
+    width = 1
+    while len(RANK_DIGITS) ** width <= count:
+        width += 1
+    step = len(RANK_DIGITS) ** width // (count + 1)
+    keys = []
+    for i in range(1, count + 1):
+        value, digits = i * step, []
+        for _ in range(width):
+            value, digit = divmod(value, len(RANK_DIGITS))
+            digits.append(RANK_DIGITS[digit])
+        # Trailing zeros can be dropped without changing the order
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+
+def apply_moves(columns, moves):
+    """
+    Apply an ordered list of moves to in-memory columns.
+
+    ``columns`` maps column name to ``[(id, rank), ...]`` in board order and
+    must contain every column a moved card leaves or enters.  ``moves`` is
+    an iterable of ``(id, column, position)``; ``position=None`` appends.
+    Columns with missing, duplicate or over-long keys are re-spread.
+
+    Returns ``{id: (column, rank)}`` for every card whose key or column
+    changed, including cards re-spread along the way.
+    """
+    changed = {}
+
+    def respread(column):
+        cards = columns[column]
+        for index, ((card_id, _), rank) in enumerate(zip(cards, spread_ranks(len(cards)))):
+            cards[index] = (card_id, rank)
+            changed[card_id] = (column, rank)
+
+    for column, cards in columns.items():
+        keys = [rank for _, rank in cards]
+        if None in keys or len(set(keys)) != len(keys) or keys != sorted(keys):
+            respread(column)
+
+    location = {card_id: column for column, cards in columns.items() for card_id, _ in cards}
+    for card_id, column, position in moves:
+        source = location[card_id]
+        columns[source] = [card for card in columns[source] if card[0] != card_id]
+        cards = columns.setdefault(column, [])
+        index = len(cards) if position is None else max(0, min(int(position), len(cards)))
+        before = cards[index - 1][1] if index > 0 else None
+        after = cards[index][1] if index < len(cards) else None
+        rank = rank_between(before, after)
+        cards.insert(index, (card_id, rank))
+        location[card_id] = column
+        changed[card_id] = (column, rank)
+        if len(rank) > REBALANCE_RANK_LENGTH:
+            respread(column)
+    return changed
+
+
+# ------------------------------------------------------------------
+# Column helpers (Task and EnhancedTask both have board_column/board_rank)
+# ------------------------------------------------------------------
+
+def _column_query(model, user_id, column, exclude_id=None):
+    query = db.session.query(model.board_rank).filter(
+        model.user_id == user_id,
+        model.board_column == column,
+    )
+    if exclude_id is not None:
+        query = query.filter(model.id != exclude_id)
+    return query
+
+
+def _neighbours(model, user_id, column, position, exclude_id):
+    """
+    Keys of the cards just before and after ``position`` (one SELECT).
+
+    Returns ``(before, after, missing)``; ``missing`` is True when one of
+    the neighbouring cards has no key yet.
+    """
+    query = _column_query(model, user_id, column, exclude_id)
+    if position is None:
+        rows = query.order_by(model.board_rank.desc(), model.id.desc()).limit(1).all()
+        before = rows[0][0] if rows else None
+        return before, None, bool(rows) and before is None
+
+    position = max(int(position), 0)
+    ordered = query.order_by(model.board_rank, model.id)
+    if position == 0:
+        rows = ordered.limit(1).all()
+        after = rows[0][0] if rows else None
+        return None, after, bool(rows) and after is None
+    rows = ordered.offset(position - 1).limit(2).all()
+    if not rows:
+        # Past the end of the column: append
+        return _neighbours(model, user_id, column, None, exclude_id)
+    keys = [row[0] for row in rows]
+    return keys[0], (keys[1] if len(keys) > 1 else None), None in keys
+
+
+def rank_for_position(model, user_id, column, position=None, exclude_id=None) -> str:
+    """
+    Key that places a card at index ``position`` of ``column``.
+
+    ``position=None`` appends.  ``exclude_id`` is the card being moved, so
+    it is not counted as its own neighbour.  Only reads, unless the column
+    has missing or colliding keys, in which case it is rebalanced first.
+    """
+    for attempt in range(2):
+        before, after, missing = _neighbours(model, user_id, column, position, exclude_id)
+        try:
+            if missing:
+                raise ValueError("Column has cards without a rank")
+            rank = rank_between(before, after)
+            if len(rank) <= MAX_RANK_LENGTH:
+                return rank
+        except ValueError as exc:
+            if attempt:
+                raise
+            logger.info("Rebalancing %s column %r for user %s: %s", model.__tablename__, column, user_id, exc)
+        rebalance_column(model, user_id, column)
+    raise ValueError("Could not compute a rank")  # pragma: no cover
+
+
+def assign_rank_on_insert(mapper, connection, target) -> None:
+    """
+    ``before_insert`` hook: append new cards without a key to their column.
+
+    Keys handed out earlier in the same session are remembered, so several
+    cards created in one flush do not all get the same key.
+    """
+    if target.board_rank is not None:
+        return
+    table = mapper.local_table
+    column = target.board_column or "todo"
+    tail = connection.execute(
+        select(func.max(table.c.board_rank)).where(
+            table.c.user_id == target.user_id,
+            table.c.board_column == column,
+        )
+    ).scalar()
+    session = object_session(target)
+    issued = session.info.setdefault("board_rank_tail", {}) if session is not None else {}
+    key = (table.name, target.user_id, column)
+    if issued.get(key) and (tail is None or issued[key] > tail):
+        tail = issued[key]
+    try:
+        rank = rank_between(tail, None)
+    except ValueError:
+        # Legacy or corrupt keys: leave it to the rebalancer
+        return
+    if len(rank) > MAX_RANK_LENGTH:
+        logger.info("Rebalancing %s column %r for user %s on insert", table.name, column, target.user_id)
+        rank = _respread_for_append(connection, table, target.user_id, column)
+    target.board_rank = rank
+    issued[key] = rank
+
+
+def _respread_for_append(connection, table, user_id, column) -> str:
+    """
+    ``rebalance_column`` for flush hooks, which must not use the session.
+
+    Rewrites the column's keys through ``connection`` and returns the key
+    for one more card at its end.  Objects already loaded in the session
+    keep their old ``board_rank`` until they are expired or reloaded.
+    """
+    rows = connection.execute(
+        select(table.c.id).where(
+            table.c.user_id == user_id,
+            table.c.board_column == column,
+        ).order_by(
+            table.c.board_rank.is_(None),
+            table.c.board_rank,
+            table.c.board_position,
+            table.c.id,
+        )
+    ).all()
+    ranks = spread_ranks(len(rows) + 1)
+    if rows:
+        connection.execute(
+            table.update().where(table.c.id == bindparam("row_id")).values(board_rank=bindparam("rank")),
+            [{"row_id": row.id, "rank": rank} for row, rank in zip(rows, ranks)],
+        )
+        bump_board_versions(connection, [user_id])
+    return ranks[-1]
+
+
+def rebalance_column(model, user_id, column) -> int:
+    """
+    Rewrite every key in one column with evenly spaced short keys.
+
+    Keeps the current order; cards without a key go last, ordered by their
+    legacy ``board_position``.  Does not commit.  Returns the card count.
+    """
+    rows = db.session.query(model.id).filter(
+        model.user_id == user_id,
+        model.board_column == column,
+    ).order_by(
+        model.board_rank.is_(None),
+        model.board_rank,
+        model.board_position,
+        model.id,
+    ).all()
+    ranks = spread_ranks(len(rows))
+    if rows:
+        db.session.execute(
+            update(model),
+            [{"id": row.id, "board_rank": rank} for row, rank in zip(rows, ranks)],
+        )
+        bump_board_versions(db.session.connection(), [user_id])
+    return len(rows)
+
+
+def rebalance_long_ranks(model, max_length: int = REBALANCE_RANK_LENGTH) -> int:
+    """Rebalance every column that has a missing or over-long key. Returns columns fixed."""
+    columns = db.session.query(model.user_id, model.board_column).filter(
+        db.or_(model.board_rank.is_(None), func.length(model.board_rank) > max_length)
+    ).distinct().all()
+    for user_id, column in columns:
+        try:
+            rebalance_column(model, user_id, column)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Failed to rebalance %s column %r for user %s", model.__tablename__, column, user_id)
+    return len(columns)
@@ -0,0 +1,405 @@
+"""
+Per-user read-through cache for the dashboard's list endpoints.
+
+``@cached_response('tasks')`` on a GET view stores its serialized JSON body
+under a key made of the resource, the user, the user's *generation* for
+that resource and the query string.  Committed writes bump the generation,
+so entries written before the change are never read again and simply age
+out; nothing has to find and delete them.
+
+Resources and the models that feed them are registered by the model
+modules (``cache_resources(Task, 'tasks')``).  ORM writes are picked up by
+the session hooks below: owners are collected on flush and their
+generations bumped on commit, so a reader cannot re-cache pre-commit data
+under the new generation.  Bulk statements bypass the ORM; code that uses
+them calls ``mark_stale`` (``bump_board_versions`` does for tasks).
+
+Backends:
+
+- ``memory``: in-process LRU.  The default for SQLite (the single-process
+  desktop build).
+- ``redis``: shared by all workers, generations in one hash per user.  The
+  default when ``REDIS_URL`` is set.
+
+PostgreSQL without Redis runs several workers that could not see each
+other's invalidations, so the cache stays off there unless
+``READ_CACHE_BACKEND`` asks for it.  ``READ_CACHE_TTL_SECONDS`` (default
+300) bounds the life of every entry.
+
+Values that are not responses, such as the insight snapshot, use the
+same keys and backend through ``cached_value``.
+
+Usage::
+
+    from src.response_cache import cached_response, cached_value
+
+    @tasks_bp.route('/tasks', methods=['GET'])
+    @jwt_required()
+    @cached_response('tasks')
+    def get_tasks():
+        ...
+
+    snapshot = cached_value('insights', user_id, lambda: build_insight_snapshot(user_id))
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.db import db
+from src.jsonutil import json_dumps
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+MEMORY_CACHE_SIZE = 2048
+# Generations outlive every entry keyed by them
+GENERATION_TTL = 30 * 24 * 3600
+KEY_PREFIX = 'mindflow:cache'
+
+_PENDING_KEY = 'response_cache_stale'
+
+# model -> resources it feeds (registered by the model modules)
+_MODEL_RESOURCES: Dict[type, tuple] = {}
+
+
+def cache_resources(model, *resources: str) -> None:
+    """Mark ``resources`` stale for the owner whenever ``model`` rows are written."""
+    _MODEL_RESOURCES[model] = resources
+
+
+def resources_for(model) -> tuple:
+    """Resources fed by ``model`` (for ``mark_stale`` after bulk statements)."""
+    return _MODEL_RESOURCES.get(model, ())
+
+
+# ------------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------------
+
+class MemoryBackend:
+    """
+    In-process LRU of response bodies plus generation counters.
+
+    Parameters
+    ----------
+    max_entries : int
+        Least recently used bodies are evicted beyond this size.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = MEMORY_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generations: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, user_id: int, resource: str) -> int:
+        with self._lock:
+            return self._generations.get((user_id, resource), 0)
+
+    def bump(self, user_id: int, resources: Iterable[str]) -> None:
+        with self._lock:
+            for resource in resources:
+                key = (user_id, resource)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, body: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Redis-backed bodies (``SETEX``) and generations (one hash per user).
+
+    Parameters
+    ----------
+    url : str
+        Redis URL, e.g. ``REDIS_URL``.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("The redis package is required for READ_CACHE_BACKEND=redis")
+        self._client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+
+    @staticmethod
+    def _generation_key(user_id: int) -> str:
+        return f'{KEY_PREFIX}:gen:{user_id}'
+
+    def generation(self, user_id: int, resource: str) -> int:
+        return int(self._client.hget(self._generation_key(user_id), resource) or 0)
+
+    def bump(self, user_id: int, resources: Iterable[str]) -> None:
+        key = self._generation_key(user_id)
+        pipe = self._client.pipeline(transaction=False)
+        for resource in resources:
+            pipe.hincrby(key, resource, 1)
+        pipe.expire(key, GENERATION_TTL)
+        pipe.execute()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, body: bytes, ttl: int) -> None:
+        self._client.setex(key, ttl, body)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+# ------------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------------
+
+class ResponseCache:
+    """
+    Generation-keyed response cache with per-resource hit/miss counters.
+
+    Parameters
+    ----------
+    backend : MemoryBackend or RedisBackend
+    ttl : int
+        Seconds an entry may be served.
+    """
+
+    def __init__(self, backend, ttl: int = DEFAULT_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0, 'errors': 0}
+        )
+        self._lock = threading.Lock()
+
+    def _count(self, resource: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[resource][counter] += amount
+
+    def key(self, user_id: int, resource: str, query_string: str) -> str:
+        generation = self.backend.generation(user_id, resource)
+        digest = hashlib.sha1(query_string.encode('utf-8')).hexdigest()[:16]
+        return f'{KEY_PREFIX}:{resource}:{user_id}:{generation}:{digest}'
+
+    def get(self, resource: str, key: str) -> Optional[bytes]:
+        body = self.backend.get(key)
+        self._count(resource, 'hits' if body is not None else 'misses')
+        return body
+
+    def set(self, resource: str, key: str, body: bytes) -> None:
+        self.backend.set(key, body, self.ttl)
+        self._count(resource, 'stores')
+
+    def invalidate(self, user_id: int, resources: Iterable[str]) -> None:
+        resources = list(resources)
+        self.backend.bump(user_id, resources)
+        for resource in resources:
+            self._count(resource, 'invalidations')
+
+    def error(self, resource: str) -> None:
+        self._count(resource, 'errors')
+
+    def get_status(self) -> dict:
+        with self._lock:
+            resources = {}
+            for resource, stats in self._stats.items():
+                lookups = stats['hits'] + stats['misses']
+                resources[resource] = dict(stats, hit_rate=round(stats['hits'] / lookups, 4) if lookups else None)
+        hits = sum(stats['hits'] for stats in resources.values())
+        lookups = hits + sum(stats['misses'] for stats in resources.values())
+        return {
+            'backend': self.backend.name,
+            'ttl': self.ttl,
+            'entries': self.backend.size(),
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+            'resources': resources,
+        }
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def init_response_cache(app) -> Optional[ResponseCache]:
+    """Pick the backend from the environment (see module docstring) and install the cache."""
+    global _cache
+    choice = os.environ.get('READ_CACHE_BACKEND', '').strip().lower()
+    if not choice:
+        if os.environ.get('REDIS_URL'):
+            choice = 'redis'
+        elif app.config.get('SQLALCHEMY_DATABASE_URI', '').startswith('sqlite'):
+            choice = 'memory'
+        else:
+            choice = 'off'
+
+    ttl = int(os.environ.get('READ_CACHE_TTL_SECONDS', DEFAULT_TTL))
+    if choice == 'redis':
+        try:
+            _cache = ResponseCache(RedisBackend(os.environ['REDIS_URL']), ttl)
+        except Exception as exc:
+            logger.warning("Read cache disabled, Redis is not available: %s", exc)
+            _cache = None
+    elif choice == 'memory':
+        _cache = ResponseCache(MemoryBackend(), ttl)
+    else:
+        _cache = None
+    logger.info("Read cache: %s", _cache.backend.name if _cache else 'off')
+    return _cache
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    return _cache
+
+
+def cache_status() -> dict:
+    return _cache.get_status() if _cache else {'backend': 'off'}
+
+
+def cached_response(resource: str):
+    """Serve a JWT-protected GET view from the cache, keyed by user, generation and query string."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = _cache
+            if cache is None or request.method != 'GET':
+                return view(*args, **kwargs)
+            # get_jwt_identity() returns a string, convert to int for cache keys
+            user_id = int(get_jwt_identity())
+            # The generation is read before the view queries, so data read
+            # while a write commits lands under the old, unreachable key
+            try:
+                key = cache.key(user_id, resource, request.query_string.decode('latin-1'))
+                body = cache.get(resource, key)
+            except Exception as exc:
+                logger.warning("Read cache lookup failed for %s: %s", resource, exc)
+                cache.error(resource)
+                return view(*args, **kwargs)
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json' and not response.is_streamed:
+                try:
+                    cache.set(resource, key, response.get_data())
+                except Exception as exc:
+                    logger.warning("Read cache store failed for %s: %s", resource, exc)
+                    cache.error(resource)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_value(resource: str, user_id: int, build: Callable[[], Any], variant: str = '') -> Any:
+    """
+    JSON-serializable value of ``build()`` for ``user_id``, cached like a response.
+
+    Keyed by the user's generation for ``resource`` (and ``variant``), so
+    committed writes to the models feeding ``resource`` retire it in every
+    worker.  Without a cache backend ``build`` runs on every call.
+    """
+    cache = _cache
+    if cache is None:
+        return build()
+    try:
+        key = cache.key(int(user_id), resource, variant)
+        body = cache.get(resource, key)
+    except Exception as exc:
+        logger.warning("Read cache lookup failed for %s: %s", resource, exc)
+        cache.error(resource)
+        return build()
+    if body is not None:
+        return json.loads(body)
+
+    value = build()
+    try:
+        cache.set(resource, key, json_dumps(value).encode('utf-8'))
+    except Exception as exc:
+        logger.warning("Read cache store failed for %s: %s", resource, exc)
+        cache.error(resource)
+    return value
+
+
+# ------------------------------------------------------------------
+# Invalidation: collect owners on flush, bump their generations on commit
+# ------------------------------------------------------------------
+
+def mark_stale(user_ids: Iterable[int], *resources: str, session=None) -> None:
+    """Bump ``resources`` for ``user_ids`` when the session commits (for writes that bypass the ORM)."""
+    session = session or db.session
+    pending: Set[tuple] = session.info.setdefault(_PENDING_KEY, set())
+    pending.update((user_id, resource) for user_id in user_ids if user_id is not None for resource in resources)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_stale(session, flush_context):
+    stale = {
+        (obj.user_id, resource)
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if type(obj) in _MODEL_RESOURCES and obj.user_id is not None
+        and (obj not in session.dirty or session.is_modified(obj))
+        for resource in _MODEL_RESOURCES[type(obj)]
+    }
+    if stale:
+        session.info.setdefault(_PENDING_KEY, set()).update(stale)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_on_commit(session):
+    stale = session.info.pop(_PENDING_KEY, None)
+    cache = _cache
+    if not stale or cache is None:
+        return
+    by_user: Dict[int, Set[str]] = defaultdict(set)
+    for user_id, resource in stale:
+        by_user[int(user_id)].add(resource)
+    for user_id, resources in by_user.items():
+        try:
+            cache.invalidate(user_id, sorted(resources))
+        except Exception as exc:
+            logger.warning("Read cache invalidation failed for user %s: %s", user_id, exc)
+            for resource in resources:
+                cache.error(resource)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
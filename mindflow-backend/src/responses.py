@@ -0,0 +1,126 @@
+"""
+JSON responses and response compression.
+
+``OrjsonProvider`` replaces Flask's JSON provider, so every ``jsonify``
+serializes with ``src.jsonutil``: orjson when it is installed (the
+standard library otherwise), datetimes and dates as ISO 8601.
+
+``init_compression`` registers an ``after_request`` hook that gzips or
+brotli-compresses text responses above ``RESPONSE_COMPRESSION_MIN_BYTES``
+(default 1024) for clients that accept it; brotli needs the ``brotli``
+package.  Streamed and file responses are left alone, as are responses
+that already carry a ``Content-Encoding``.
+
+Usage::
+
+    from src.responses import OrjsonProvider, init_compression
+
+    app.json = OrjsonProvider(app)
+    init_compression(app)
+"""
+from __future__ import annotations
+
+import os
+import zlib
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from src.jsonutil import json_dumps, json_dumps_bytes, orjson
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Smallest body worth compressing; below this the headers dominate
+COMPRESSION_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+# Brotli quality 5 compresses better than gzip -6 at a similar speed
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'image/svg+xml',
+}
+
+
+# ------------------------------------------------------------------
+# Serialization
+# ------------------------------------------------------------------
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (keeps Flask's ``sort_keys`` and debug indenting)"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return json_dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys), indent='indent' in kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = json_dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent)
+        return self._app.response_class(body + b'\n' if indent else body, mimetype=self.mimetype)
+
+
+# ------------------------------------------------------------------
+# Compression
+# ------------------------------------------------------------------
+
+def _gzip(data: bytes) -> bytes:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def available_encodings():
+    """Encodings this process can produce, preferred first"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+_COMPRESSORS = {'br': _brotli, 'gzip': _gzip}
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    return _COMPRESSORS[encoding](data)
+
+
+def _compressible(response) -> bool:
+    return response.mimetype.startswith('text/') or response.mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def init_compression(app, min_bytes=None):
+    """Compress eligible responses of ``app`` (see module docstring)"""
+    if min_bytes is None:
+        min_bytes = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', COMPRESSION_MIN_BYTES))
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or not _compressible(response)):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < min_bytes:
+            return response
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes are a different representation of the same resource
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compress_response
@@ -4,12 +4,14 @@ Uses LLM provider abstraction to support OpenAI, LM Studio, Ollama, etc.
 Implements function calling to create/edit/query tasks, stakeholders, notes,
 and generate insights.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import os
-import json
 import logging
 from datetime import datetime, timedelta
+from src.llm.context import fit_history, message_tokens, route_tools, tool_result_content, tools_tokens
+from src.llm.failover import ProviderUnavailableError
+from src.jsonutil import json_dumps
+from src.services.tool_runner import ToolRunner, save
 
 ai_assistant_bp = Blueprint('ai_assistant', __name__)
 logger = logging.getLogger(__name__)
@@ -28,30 +30,6 @@ def _get_provider(user_id=None):
     return get_llm_provider()
 
 
-# Legacy compatibility: keep get_client() for telegram_bot.py etc.
-_client = None
-
-def get_client():
-    """Legacy OpenAI client getter for backward compatibility."""
-    global _client
-    if _client is not None:
-        return _client
-    api_key = os.environ.get('OPENAI_API_KEY', '').strip()
-    api_base = os.environ.get('OPENAI_API_BASE', '').strip() or None
-    if not api_key:
-        return None
-    try:
-        from openai import OpenAI
-        kwargs = {'api_key': api_key}
-        if api_base:
-            kwargs['base_url'] = api_base
-        _client = OpenAI(**kwargs)
-        return _client
-    except Exception as e:
-        logger.error(f"Failed to init OpenAI client: {e}")
-        return None
-
-
 # ── Tool definitions for function calling ──────────────────────────────
 
 TOOLS = [
@@ -106,7 +84,9 @@ TOOLS = [
                     "status": {"type": "string", "enum": ["todo", "in_progress", "waiting", "done", "all"], "description": "Filter by status"},
                     "priority": {"type": "string", "enum": ["low", "medium", "high", "urgent", "all"], "description": "Filter by priority"},
                     "search": {"type": "string", "description": "Search term to filter tasks by title or description"},
-                    "overdue_only": {"type": "boolean", "description": "Only show overdue tasks"}
+                    "overdue_only": {"type": "boolean", "description": "Only show overdue tasks"},
+                    "limit": {"type": "integer", "description": "Maximum number of tasks to return (default 20, at most 50)"},
+                    "cursor": {"type": "string", "description": "next_cursor from a previous call, to fetch the next page"}
                 },
                 "required": []
             }
@@ -146,7 +126,8 @@ TOOLS = [
                     "sentiment": {"type": "string", "enum": ["positive", "neutral", "negative"]},
                     "influence": {"type": "integer", "description": "Influence level 1-10"},
                     "interest": {"type": "integer", "description": "Interest level 1-10"},
-                    "tags": {"type": "string", "description": "Comma-separated tags"}
+                    "tags": {"type": "string", "description": "Comma-separated tags"},
+                    "allow_duplicate": {"type": "boolean", "description": "Create even though a similar contact exists. Only after the user confirmed it is a different person"}
                 },
                 "required": ["name"]
             }
@@ -187,8 +168,11 @@ TOOLS = [
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "search": {"type": "string", "description": "Search by name, company, or role"},
-                    "sentiment": {"type": "string", "enum": ["positive", "neutral", "negative", "all"]}
+                    "search": {"type": "string", "description": "Search by name, company, role or other profile text"},
+                    "sentiment": {"type": "string", "enum": ["positive", "neutral", "negative", "all"]},
+                    "view": {"type": "string", "enum": ["summary", "card", "full"], "description": "Level of detail (default card). Use full only when personal notes, history or background are needed"},
+                    "limit": {"type": "integer", "description": "Maximum number of stakeholders to return (default 20, at most 50)"},
+                    "cursor": {"type": "string", "description": "next_cursor from a previous call, to fetch the next page"}
                 },
                 "required": []
             }
@@ -236,7 +220,9 @@ TOOLS = [
                 "type": "object",
                 "properties": {
                     "search": {"type": "string", "description": "Search term"},
-                    "category": {"type": "string", "description": "Filter by category"}
+                    "category": {"type": "string", "description": "Filter by category"},
+                    "limit": {"type": "integer", "description": "Maximum number of notes to return (default 20, at most 50)"},
+                    "cursor": {"type": "string", "description": "next_cursor from a previous call, to fetch the next page"}
                 },
                 "required": []
             }
@@ -265,6 +251,39 @@ TOOLS = [
 
 # ── Function execution helpers ─────────────────────────────────────────
 
+# Page size for the list tools; the model can ask for more with limit/cursor.
+# Every row goes back into the prompt, so pages stay small.
+AI_LIST_LIMIT = 20
+AI_LIST_MAX = 50
+
+
+def _page_from_args(query, keys, args):
+    """Run a keyset page for a list tool. Returns (items, next_cursor, total).
+
+    ``total`` counts all matches when there are more pages, otherwise None.
+    """
+    from src.pagination import paginate
+
+    try:
+        limit = int(args.get('limit') or AI_LIST_LIMIT)
+    except (TypeError, ValueError):
+        limit = AI_LIST_LIMIT
+    limit = max(1, min(limit, AI_LIST_MAX))
+    items, next_cursor = paginate(query, keys, limit, args.get('cursor'))
+    total = query.order_by(None).count() if next_cursor else None
+    return items, next_cursor, total
+
+
+def _found_message(count, noun, next_cursor, total=None):
+    if next_cursor and total:
+        message = f"Showing {count} of {total} {noun}(s)."
+    else:
+        message = f"Found {count} {noun}(s)."
+    if next_cursor:
+        message += " More are available: call again with the returned next_cursor."
+    return message
+
+
 def _exec_create_task(user_id, args):
     from src.models.task import Task
     from src.models.user import db
@@ -285,13 +304,12 @@ def _exec_create_task(user_id, args):
         board_position=0
     )
     db.session.add(task)
-    db.session.commit()
+    save()
     return {"success": True, "task": task.to_dict(), "message": f"Task '{task.title}' created successfully."}
 
 
 def _exec_update_task(user_id, args):
     from src.models.task import Task
-    from src.models.user import db
 
     task = Task.query.filter_by(id=args['task_id'], user_id=user_id).first()
     if not task:
@@ -309,7 +327,7 @@ def _exec_update_task(user_id, args):
     if 'status' in args:
         task.board_column = status_to_column.get(args['status'], task.board_column)
 
-    db.session.commit()
+    save()
     return {"success": True, "task": task.to_dict(), "message": f"Task '{task.title}' updated successfully."}
 
 
@@ -323,7 +341,7 @@ def _exec_delete_task(user_id, args):
 
     title = task.title
     db.session.delete(task)
-    db.session.commit()
+    save()
     return {"success": True, "message": f"Task '{title}' deleted successfully."}
 
 
@@ -342,27 +360,49 @@ def _exec_list_tasks(user_id, args):
 
     search = args.get('search')
     if search:
-        query = query.filter(
-            (Task.title.ilike(f'%{search}%')) | (Task.description.ilike(f'%{search}%'))
-        )
-
-    tasks = query.order_by(Task.created_at.desc()).all()
+        from src.search import search_filter
+        query = query.filter(search_filter('task', user_id, search))
 
     if args.get('overdue_only'):
         today = datetime.utcnow().strftime('%Y-%m-%d')
-        tasks = [t for t in tasks if t.due_date and t.due_date < today and t.status != 'done']
+        query = query.filter(Task.due_date.isnot(None), Task.due_date < today, Task.status != 'done')
+
+    from src.pagination import SortKey
+    tasks, next_cursor, total = _page_from_args(query, [
+        SortKey(Task.created_at, descending=True),
+        SortKey(Task.id, descending=True),
+    ], args)
 
     return {
         "success": True,
         "tasks": [t.to_dict() for t in tasks],
         "count": len(tasks),
-        "message": f"Found {len(tasks)} task(s)."
+        "total": total,
+        "next_cursor": next_cursor,
+        "message": _found_message(len(tasks), "task", next_cursor, total)
     }
 
 
 def _exec_create_stakeholder(user_id, args):
     from src.models.stakeholder import Stakeholder
     from src.models.user import db
+    from src.stakeholder_match import find_duplicates
+
+    # Transcribed names are often misspelled; offer the existing contact first
+    if not args.get('allow_duplicate'):
+        duplicates = find_duplicates(user_id, name=args.get('name'), email=args.get('email'),
+                                     company=args.get('company'))
+        if duplicates:
+            names = ", ".join(
+                f"{d['name']} (ID {d['id']}{', ' + d['company'] if d.get('company') else ''})" for d in duplicates
+            )
+            return {
+                "success": False,
+                "duplicate": True,
+                "duplicates": duplicates,
+                "message": f"A similar contact already exists: {names}. Ask the user whether to update that contact "
+                           f"(update_stakeholder) or create a new one (create_stakeholder with allow_duplicate=true)."
+            }
 
     def safe_int(val, default=None):
         if val is None:
@@ -412,13 +452,12 @@ def _exec_create_stakeholder(user_id, args):
         availability_status=args.get('availability_status'),
     )
     db.session.add(s)
-    db.session.commit()
+    save()
     return {"success": True, "stakeholder": s.to_dict(), "message": f"Stakeholder '{s.name}' created successfully."}
 
 
 def _exec_update_stakeholder(user_id, args):
     from src.models.stakeholder import Stakeholder
-    from src.models.user import db
 
     s = Stakeholder.query.filter_by(id=args['stakeholder_id'], user_id=user_id).first()
     if not s:
@@ -430,33 +469,38 @@ def _exec_update_stakeholder(user_id, args):
             setattr(s, field, args[field])
 
     s.last_contact = datetime.utcnow()
-    db.session.commit()
+    save()
     return {"success": True, "stakeholder": s.to_dict(), "message": f"Stakeholder '{s.name}' updated successfully."}
 
 
 def _exec_list_stakeholders(user_id, args):
     from src.models.stakeholder import Stakeholder
 
-    query = Stakeholder.query.filter_by(user_id=user_id)
+    view = args.get('view') if args.get('view') in Stakeholder.VIEWS else 'card'
+    fields = Stakeholder.VIEWS[view]
+    query = Stakeholder.query.filter_by(user_id=user_id).options(*Stakeholder.load_options(fields))
 
     search = args.get('search')
     if search:
-        query = query.filter(
-            (Stakeholder.name.ilike(f'%{search}%')) |
-            (Stakeholder.company.ilike(f'%{search}%')) |
-            (Stakeholder.role.ilike(f'%{search}%'))
-        )
+        from src.search import search_filter
+        query = query.filter(search_filter('stakeholder', user_id, search))
 
     sentiment = args.get('sentiment', 'all')
     if sentiment and sentiment != 'all':
         query = query.filter_by(sentiment=sentiment)
 
-    stakeholders = query.order_by(Stakeholder.name).all()
+    from src.pagination import SortKey
+    stakeholders, next_cursor, total = _page_from_args(query, [
+        SortKey(Stakeholder.name),
+        SortKey(Stakeholder.id),
+    ], args)
     return {
         "success": True,
-        "stakeholders": [s.to_dict() for s in stakeholders],
+        "stakeholders": [s.to_dict(fields) for s in stakeholders],
         "count": len(stakeholders),
-        "message": f"Found {len(stakeholders)} stakeholder(s)."
+        "total": total,
+        "next_cursor": next_cursor,
+        "message": _found_message(len(stakeholders), "stakeholder", next_cursor, total)
     }
 
 
@@ -471,13 +515,12 @@ def _exec_create_note(user_id, args):
         category=args.get('category', 'general')
     )
     db.session.add(note)
-    db.session.commit()
+    save()
     return {"success": True, "note": note.to_dict(), "message": "Note created successfully."}
 
 
 def _exec_update_note(user_id, args):
     from src.models.note import Note
-    from src.models.user import db
 
     note = Note.query.filter_by(id=args['note_id'], user_id=user_id).first()
     if not note:
@@ -487,7 +530,7 @@ def _exec_update_note(user_id, args):
         if field in args and args[field] is not None:
             setattr(note, field, args[field])
 
-    db.session.commit()
+    save()
     return {"success": True, "note": note.to_dict(), "message": "Note updated successfully."}
 
 
@@ -498,78 +541,34 @@ def _exec_list_notes(user_id, args):
 
     search = args.get('search')
     if search:
-        query = query.filter(
-            (Note.content.ilike(f'%{search}%')) | (Note.title.ilike(f'%{search}%'))
-        )
+        from src.search import search_filter
+        query = query.filter(search_filter('note', user_id, search))
 
     category = args.get('category')
     if category:
         query = query.filter_by(category=category)
 
-    notes = query.order_by(Note.created_at.desc()).all()
+    from src.pagination import SortKey
+    notes, next_cursor, total = _page_from_args(query, [
+        SortKey(Note.created_at, descending=True),
+        SortKey(Note.id, descending=True),
+    ], args)
     return {
         "success": True,
         "notes": [n.to_dict() for n in notes],
         "count": len(notes),
-        "message": f"Found {len(notes)} note(s)."
+        "total": total,
+        "next_cursor": next_cursor,
+        "message": _found_message(len(notes), "note", next_cursor, total)
     }
 
 
 def _exec_generate_insights(user_id, args):
-    from src.models.task import Task
-    from src.models.stakeholder import Stakeholder
-    from src.models.note import Note
+    # Aggregated in SQL and cached per user (see src/services/insights.py)
+    from src.services.insights import get_insight_snapshot
 
     focus = args.get('focus', 'general')
-
-    tasks = Task.query.filter_by(user_id=user_id).all()
-    stakeholders = Stakeholder.query.filter_by(user_id=user_id).all()
-    notes = Note.query.filter_by(user_id=user_id).all()
-
-    today = datetime.utcnow().strftime('%Y-%m-%d')
-
-    total_tasks = len(tasks)
-    done_tasks = len([t for t in tasks if t.status == 'done'])
-    overdue = [t for t in tasks if t.due_date and t.due_date < today and t.status != 'done']
-    high_priority = [t for t in tasks if t.priority in ('high', 'urgent') and t.status != 'done']
-
-    data = {
-        "tasks_summary": {
-            "total": total_tasks,
-            "completed": done_tasks,
-            "completion_rate": round(done_tasks / total_tasks * 100, 1) if total_tasks > 0 else 0,
-            "overdue_count": len(overdue),
-            "overdue_tasks": [{"title": t.title, "due_date": t.due_date, "priority": t.priority} for t in overdue[:5]],
-            "high_priority_pending": [{"title": t.title, "due_date": t.due_date} for t in high_priority[:5]],
-            "by_status": {},
-            "by_priority": {}
-        },
-        "stakeholders_summary": {
-            "total": len(stakeholders),
-            "by_sentiment": {},
-            "high_influence": [{"name": s.name, "company": s.company, "influence": s.influence} for s in stakeholders if s.influence and s.influence >= 8],
-            "recent_contacts": []
-        },
-        "notes_summary": {
-            "total": len(notes),
-            "by_category": {},
-            "recent": [{"content": n.content[:100], "category": n.category} for n in notes[:5]]
-        }
-    }
-
-    for t in tasks:
-        s = t.status or 'todo'
-        data["tasks_summary"]["by_status"][s] = data["tasks_summary"]["by_status"].get(s, 0) + 1
-        p = t.priority or 'medium'
-        data["tasks_summary"]["by_priority"][p] = data["tasks_summary"]["by_priority"].get(p, 0) + 1
-
-    for s in stakeholders:
-        sent = s.sentiment or 'neutral'
-        data["stakeholders_summary"]["by_sentiment"][sent] = data["stakeholders_summary"]["by_sentiment"].get(sent, 0) + 1
-
-    for n in notes:
-        cat = n.category or 'general'
-        data["notes_summary"]["by_category"][cat] = data["notes_summary"]["by_category"].get(cat, 0) + 1
+    data = get_insight_snapshot(user_id)["data"]
 
     return {
         "success": True,
@@ -595,6 +594,19 @@ FUNCTION_MAP = {
     "generate_insights": _exec_generate_insights,
 }
 
+# Tools that never write; leading runs of them execute concurrently
+READ_ONLY_TOOLS = frozenset({"list_tasks", "list_stakeholders", "list_notes", "generate_insights"})
+
+tool_runner = ToolRunner(FUNCTION_MAP, read_only=READ_ONLY_TOOLS)
+
+# Tool schemas sent together when a message is about their subject (see route_tools)
+TOOL_GROUPS = {
+    "tasks": ["create_task", "update_task", "delete_task", "list_tasks"],
+    "stakeholders": ["create_stakeholder", "update_stakeholder", "list_stakeholders"],
+    "notes": ["create_note", "update_note", "list_notes"],
+    "insights": ["generate_insights", "list_tasks", "list_stakeholders", "list_notes"],
+}
+
 # ── System prompt ──────────────────────────────────────────────────────
 
 SYSTEM_PROMPT = """You are Rovot (formerly OpenClaw), the AI assistant for MindFlow — a personal productivity and stakeholder management app.
@@ -625,12 +637,132 @@ You help users manage their tasks, stakeholders/contacts, and notes through natu
 - For insights, analyze the data and provide actionable recommendations
 """
 
+# ── Chat turn (shared by the JSON and event-stream responses) ──────────
+
+def build_chat_context(user_message, history=()):
+    """System prompt, budgeted history and the user message, plus the tool schemas routed to it."""
+    today = datetime.utcnow().strftime('%Y-%m-%d')
+    messages = [{"role": "system", "content": SYSTEM_PROMPT.replace('{today}', today)}]
+    messages.extend(fit_history(history))
+    messages.append({"role": "user", "content": user_message})
+    tools = route_tools(TOOLS, TOOL_GROUPS, user_message)
+    logger.info(
+        "Chat context: %d history message(s), %d of %d tools, ~%d prompt tokens",
+        len(messages) - 2, len(tools), len(TOOLS),
+        sum(message_tokens(m) for m in messages) + tools_tokens(tools),
+    )
+    return messages, tools
+
+
+def _complete(provider, messages, stream, **kwargs):
+    """One completion; while streaming, yields ``token`` events and returns the full response."""
+    if not stream:
+        return provider.chat_completion(messages, **kwargs)
+    response = None
+    for chunk in provider.chat_completion(messages, stream=True, **kwargs):
+        if chunk.content:
+            yield 'token', {"text": chunk.content}
+        if chunk.response is not None:
+            response = chunk.response
+    return response
+
+
+def _chat_turn(provider, user_id, messages, tools=TOOLS, stream=False):
+    """
+    Run one chat turn as a series of ``(event, data)`` pairs.
+
+    Events are ``token`` (streamed text, only when *stream* is set),
+    ``tool_call`` and ``tool_result`` around each function execution, and a
+    final ``done`` carrying the same payload the JSON endpoint returns.
+    """
+    # First API call - may include tool calls
+    response = yield from _complete(
+        provider, messages, stream,
+        tools=tools,
+        tool_choice="auto",
+        temperature=0.7,
+        max_tokens=2000,
+    )
+
+    actions_taken = []
+
+    # Process tool calls if any
+    if response.tool_calls:
+        # Add assistant message with tool calls to messages (for the raw API)
+        messages.append(response.raw.choices[0].message if response.raw else response.to_message())
+
+        for tc in response.tool_calls:
+            yield 'tool_call', {"id": tc.id, "function": tc.function_name, "args": tc.arguments}
+
+        # Reads run concurrently; writes share one transaction and commit
+        for outcome in tool_runner.run(user_id, response.tool_calls):
+            if outcome.executed:
+                actions_taken.append(outcome.action())
+            yield 'tool_result', {
+                "id": outcome.call.id,
+                "function": outcome.call.function_name,
+                "result": outcome.result,
+                "duration_ms": outcome.duration_ms,
+            }
+            messages.append({
+                "role": "tool",
+                "tool_call_id": outcome.call.id,
+                "content": tool_result_content(outcome.result)
+            })
+
+        # Second API call to get final response
+        final_response = yield from _complete(
+            provider, messages, stream,
+            temperature=0.7,
+            max_tokens=2000,
+        )
+        final_text = final_response.content
+    else:
+        final_text = response.content
+
+    yield 'done', {
+        "success": True,
+        "message": final_text,
+        "actions": actions_taken,
+        "has_actions": len(actions_taken) > 0
+    }
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json_dumps(data)}\n\n"
+
+
+def _stream_chat(provider, user_id, messages, tools):
+    """Server-sent events for one chat turn; failures end the stream with an ``error`` event."""
+    def generate():
+        # Opens the stream before the first model token arrives
+        yield ": connected\n\n"
+        try:
+            for event, data in _chat_turn(provider, user_id, messages, tools, stream=True):
+                yield _sse(event, data)
+        except Exception as e:
+            logger.error(f"AI chat stream error: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            yield _sse('error', {"success": False, "error": f"AI chat failed: {str(e)}"})
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
 # ── API Routes ─────────────────────────────────────────────────────────
 
 @ai_assistant_bp.route('/ai/chat', methods=['POST'])
 @jwt_required()
 def ai_chat():
-    """Main AI chat endpoint - processes user messages and executes functions"""
+    """Main AI chat endpoint - processes user messages and executes functions
+
+    With ``Accept: text/event-stream`` the reply is streamed as server-sent
+    events (see ``_chat_turn``) instead of one JSON body.
+    """
     try:
         user_id = get_jwt_identity()
         data = request.get_json()
@@ -647,80 +779,19 @@ def ai_chat():
             logger.error(f"LLM provider error: {e}")
             return jsonify({"success": False, "error": "AI service not available. Please configure your LLM provider in Settings."}), 503
 
-        today = datetime.utcnow().strftime('%Y-%m-%d')
-        system_msg = SYSTEM_PROMPT.replace('{today}', today)
-
-        # Build messages array
-        messages = [{"role": "system", "content": system_msg}]
+        # History and tool schemas are trimmed to the prompt budget
+        messages, tools = build_chat_context(user_message, conversation_history)
 
-        # Add conversation history (last 20 messages)
-        for msg in conversation_history[-20:]:
-            if msg.get('role') in ('user', 'assistant'):
-                messages.append({"role": msg['role'], "content": msg['content']})
+        if request.accept_mimetypes.best == 'text/event-stream':
+            return _stream_chat(provider, user_id, messages, tools)
 
-        messages.append({"role": "user", "content": user_message})
-
-        # First API call - may include tool calls
-        response = provider.chat_completion(
-            messages,
-            tools=TOOLS,
-            tool_choice="auto",
-            temperature=0.7,
-            max_tokens=2000,
-        )
-
-        actions_taken = []
-
-        # Process tool calls if any
-        if response.tool_calls:
-            # Add assistant message with tool calls to messages (for the raw API)
-            if response.raw:
-                messages.append(response.raw.choices[0].message)
-
-            for tc in response.tool_calls:
-                fn_name = tc.function_name
-                fn_args = tc.arguments
-
-                logger.info(f"Executing function: {fn_name} with args: {json.dumps(fn_args)}")
-
-                executor = FUNCTION_MAP.get(fn_name)
-                if executor:
-                    try:
-                        result = executor(user_id, fn_args)
-                        actions_taken.append({
-                            "function": fn_name,
-                            "args": fn_args,
-                            "result": result
-                        })
-                    except Exception as e:
-                        logger.error(f"Function execution error: {e}")
-                        result = {"success": False, "error": str(e)}
-                else:
-                    result = {"success": False, "error": f"Unknown function: {fn_name}"}
-
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tc.id,
-                    "content": json.dumps(result, default=str)
-                })
-
-            # Second API call to get final response
-            final_response = provider.chat_completion(
-                messages,
-                temperature=0.7,
-                max_tokens=2000,
-            )
-            final_text = final_response.content
-        else:
-            final_text = response.content
-
-        return jsonify({
-            "success": True,
-            "message": final_text,
-            "actions": actions_taken,
-            "has_actions": len(actions_taken) > 0
-        }), 200
+        for event, payload in _chat_turn(provider, user_id, messages, tools):
+            if event == 'done':
+                return jsonify(payload), 200
 
+    except ProviderUnavailableError as e:
+        logger.error(f"AI chat error: {e}")
+        return jsonify({"success": False, "error": "AI service not available. Please check your LLM provider in Settings."}), 503
     except Exception as e:
         logger.error(f"AI chat error: {e}")
         import traceback
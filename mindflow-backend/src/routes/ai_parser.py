@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
 import os
 import json
 import logging
@@ -7,76 +7,33 @@ import logging
 ai_parser_bp = Blueprint('ai_parser', __name__)
 logger = logging.getLogger(__name__)
 
-# Lazy initialization of OpenAI client
-OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
-client = None
-
-def get_openai_client():
-    """Lazy initialization of OpenAI client to avoid import-time errors"""
-    global client
-    if client is not None:
-        return client
-    
-    if not OPENAI_API_KEY:
-        logger.warning("OPENAI_API_KEY not set - AI parsing will not be available")
-        return None
-    
-    try:
-        from openai import OpenAI
-        # Only pass api_key explicitly to avoid any proxy/environment variable conflicts
-        # Strip any whitespace from the API key
-        api_key = OPENAI_API_KEY.strip() if OPENAI_API_KEY else None
-        if not api_key:
-            logger.warning("OPENAI_API_KEY is empty after stripping")
-            return None
-        
-        # Initialize client with only the api_key parameter
-        # This avoids issues with proxies or other environment variables
-        client = OpenAI(api_key=api_key)
-        logger.info("✅ OpenAI client initialized successfully")
-        return client
-    except TypeError as e:
-        # Handle specific TypeError about unexpected arguments
-        logger.error(f"Failed to initialize OpenAI client (TypeError): {str(e)}")
-        logger.error("This might be due to an incompatible OpenAI library version or environment variable conflicts")
-        # Try to re-import and check version
-        try:
-            import openai
-            logger.error(f"OpenAI library version: {openai.__version__}")
-        except:
-            pass
-        return None
-    except Exception as e:
-        logger.error(f"Failed to initialize OpenAI client: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return None
-
 @ai_parser_bp.route('/ai/check-config', methods=['GET'])
 @jwt_required()
 def check_ai_config():
-    """Diagnostic endpoint to check OpenAI configuration"""
+    """Diagnostic endpoint to check the LLM provider configuration"""
     try:
-        api_key_set = bool(OPENAI_API_KEY)
-        api_key_length = len(OPENAI_API_KEY) if OPENAI_API_KEY else 0
-        api_key_prefix = OPENAI_API_KEY[:10] + "..." if OPENAI_API_KEY and len(OPENAI_API_KEY) > 10 else "N/A"
-        
-        client = get_openai_client()
-        client_available = client is not None
+        from src.llm.http import http_client_status
+        from src.routes.ai_assistant import _get_provider
+
+        api_key = os.environ.get('OPENAI_API_KEY', '').strip()
+        provider = _get_provider(get_jwt_identity())
         
         # Try to get OpenAI library version
         try:
             import openai
             openai_version = openai.__version__
-        except:
+        except Exception:
             openai_version = "Unknown"
         
         return jsonify({
-            'openai_api_key_set': api_key_set,
-            'openai_api_key_length': api_key_length,
-            'openai_api_key_prefix': api_key_prefix,
-            'openai_client_available': client_available,
-            'openai_library_version': openai_version
+            'openai_api_key_set': bool(api_key),
+            'openai_api_key_length': len(api_key),
+            'openai_api_key_prefix': api_key[:10] + "..." if len(api_key) > 10 else "N/A",
+            'openai_client_available': provider.is_available(),
+            'openai_library_version': openai_version,
+            'provider': provider.provider_name,
+            'model': provider.default_model,
+            'http': http_client_status(),
         }), 200
     except Exception as e:
         return jsonify({
@@ -99,15 +56,18 @@ def parse_content():
         
         logger.info(f"📝 AI parsing request for text: {text[:100]}...")
         
-        client = get_openai_client()
-        if not client:
-            logger.warning("❌ OpenAI client not available - returning error")
+        # Classification and extraction run at low temperature, so repeated
+        # texts are answered from the LLM response cache
+        from src.routes.ai_assistant import _get_provider
+        provider = _get_provider(get_jwt_identity())
+        if not provider.is_available():
+            logger.warning("❌ LLM provider not available - returning error")
             return jsonify({
                 'success': False,
-                'error': 'AI parsing not available. OPENAI_API_KEY not configured or client initialization failed.'
+                'error': 'AI parsing not available. Please configure your LLM provider in Settings.'
             }), 503
         
-        logger.info("✅ OpenAI client available, proceeding with AI parsing")
+        logger.info("✅ LLM provider available, proceeding with AI parsing")
         
         # Determine content type first
         type_prompt = f"""Analyze the following text and determine if it's about:
@@ -123,21 +83,21 @@ Respond with ONLY one word: "task", "stakeholder", or "note"
 """
         
         logger.info("🔍 Step 1: Classifying content type...")
-        type_response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        type_response = provider.chat_completion(
+            [
                 {"role": "system", "content": "You are a content classifier. Respond with only one word."},
                 {"role": "user", "content": type_prompt}
             ],
             temperature=0.3,
-            max_tokens=10
+            max_tokens=10,
+            cache_site="classify",
         )
         
-        # Log OpenAI API usage
-        if hasattr(type_response, 'usage'):
-            logger.info(f"📊 OpenAI API usage (classification) - Tokens: {type_response.usage.total_tokens} (prompt: {type_response.usage.prompt_tokens}, completion: {type_response.usage.completion_tokens})")
+        # Log LLM usage (absent when served from the cache)
+        if type_response.usage:
+            logger.info(f"📊 LLM usage (classification) - Tokens: {type_response.usage['total_tokens']} (prompt: {type_response.usage['prompt_tokens']}, completion: {type_response.usage['completion_tokens']})")
         
-        content_type = type_response.choices[0].message.content.strip().lower()
+        content_type = (type_response.content or '').strip().lower()
         logger.info(f"✅ Content classified as: {content_type}")
         
         # If it's a stakeholder, extract detailed information
@@ -178,21 +138,21 @@ Text: "{text}"
 Return ONLY valid JSON with all keys listed above. Use null for missing/unknown fields."""
             
             logger.info("🔍 Step 2: Extracting comprehensive stakeholder information...")
-            extraction_response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            extraction_response = provider.chat_completion(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": extraction_prompt}
                 ],
                 temperature=0.2,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                cache_site="extract",
             )
             
-            if hasattr(extraction_response, 'usage'):
-                logger.info(f"📊 OpenAI API usage (extraction) - Tokens: {extraction_response.usage.total_tokens}")
+            if extraction_response.usage:
+                logger.info(f"📊 LLM usage (extraction) - Tokens: {extraction_response.usage['total_tokens']}")
             
             try:
-                d = json.loads(extraction_response.choices[0].message.content)
+                d = json.loads(extraction_response.content or '')
                 logger.info(f"📊 Extracted data: {json.dumps(d, indent=2)}")
                 
                 # Helper to safely get int values
@@ -251,10 +211,20 @@ Return ONLY valid JSON with all keys listed above. Use null for missing/unknown
                 
                 logger.info(f"✅ Comprehensive stakeholder_info extracted")
                 
+                # Existing contacts this one probably duplicates, so the UI can offer a merge
+                from src.stakeholder_match import find_duplicates
+                duplicate_candidates = find_duplicates(
+                    int(get_jwt_identity()),
+                    name=stakeholder_info['name'],
+                    email=stakeholder_info['email'],
+                    company=stakeholder_info['company'],
+                )
+                
                 return jsonify({
                     'success': True,
                     'type': 'stakeholder',
                     'stakeholder_info': stakeholder_info,
+                    'duplicate_candidates': duplicate_candidates,
                     'confidence': 0.95,
                     'open_modal': True  # Signal frontend to open edit modal for review
                 }), 200
@@ -303,18 +273,18 @@ Text: "{text}"
 Return ONLY valid JSON."""
             
             logger.info("\ud83d\udd0d Extracting task information...")
-            task_response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            task_response = provider.chat_completion(
+                [
                     {"role": "system", "content": "You are a task extraction assistant for a productivity app. Extract structured task data from natural language or voice input. Handle speech-to-text errors gracefully. Return ONLY valid JSON."},
                     {"role": "user", "content": task_prompt}
                 ],
                 temperature=0.2,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                cache_site="extract",
             )
             
             try:
-                td = json.loads(task_response.choices[0].message.content)
+                td = json.loads(task_response.content or '')
                 
                 status = td.get('status') or 'todo'
                 status_to_col = {'todo': 'todo', 'in_progress': 'in_progress', 'waiting': 'review', 'done': 'done'}
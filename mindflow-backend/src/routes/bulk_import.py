@@ -0,0 +1,544 @@
+"""
+Streaming bulk import of tasks, notes and stakeholders.
+
+``POST /api/import`` reads an NDJSON or CSV upload straight from the
+request stream, validates one record at a time and inserts them in chunks
+of ``IMPORT_CHUNK_SIZE`` rows: one multi-row INSERT per model and one
+commit per chunk, so memory and transaction size stay bounded however
+large the file is.  A chunk that fails as a whole is retried row by row,
+so one bad record only costs its own row.
+
+Tasks, notes and stakeholders are validated with the same mappings as
+the create endpoints (``stakeholder_values`` from
+``routes/stakeholders.py``).  Enhanced tasks, relationships and
+interactions only exist in exports and are restored column by column.
+Files written by ``GET /api/export`` import as they are: the header line
+is skipped, and stakeholder rows carrying their original ``id`` are
+remembered so that rows referring to that id are linked to the new
+stakeholder.  Enhanced tasks are linked to their parents, dependencies
+and related stakeholders once the whole file is in, since those may
+point forwards.  Task categories are not exported, so restored enhanced
+tasks have none.
+
+Core INSERTs bypass the ORM events, so the caches those events maintain
+(board versions, read caches, the task stats rollup, the stakeholder
+match index) are refreshed per chunk, and imported cards get Kanban
+ranks at the end.
+
+With ``Accept: application/x-ndjson`` the response is a stream of
+``progress`` events (one per chunk), ``error`` events and a final
+``done`` event; otherwise the ``done`` summary is returned as JSON.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, select, update
+
+from src.models.board_version import bump_board_versions
+from src.models.enhanced_task import EnhancedTask
+from src.models.note import Note
+from src.models.stakeholder import Stakeholder
+from src.models.stakeholder_relationship import StakeholderInteraction, StakeholderRelationship
+from src.models.task import Task
+from src.models.task_stats import refresh_task_stats
+from src.models.user import db
+from src.ranking import rebalance_column
+from src.response_cache import mark_stale, resources_for
+from src.routes.export import HEADER_TYPE
+from src.routes.stakeholders import clean_optional, safe_int, stakeholder_values
+from src.routes.tasks import COLUMN_STATUS_MAPPING, VALID_PRIORITIES
+from src.stakeholder_match import invalidate_match_index
+
+bulk_import_bp = Blueprint('bulk_import', __name__)
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement and per transaction
+IMPORT_CHUNK_SIZE = 500
+# Per-row errors kept for the final summary (all are streamed in NDJSON mode)
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FORMATS = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'application/json': 'ndjson',
+}
+
+
+class RowError(ValueError):
+    """A record that cannot be imported; the message is reported to the client."""
+
+
+class _SourceRef(int):
+    """A stakeholder id from the file whose row is queued but not inserted yet"""
+
+
+# Columns restored after the whole file is in: {column: is a JSON list}
+ENHANCED_TASK_LINKS = {
+    'parent_task_id': False,
+    'depends_on_tasks': True,
+    'blocks_tasks': True,
+    'related_stakeholders': True,
+}
+
+
+def _truthy(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def _task_values(data, resolve_stakeholder):
+    """Mirror create_task: title required, known priority, owned stakeholder"""
+    title = clean_optional(data.get('title'))
+    if not title:
+        raise RowError('Title is required')
+    priority = data.get('priority') or 'medium'
+    if priority not in VALID_PRIORITIES:
+        raise RowError('Priority must be low, medium, or high')
+    board_column = clean_optional(data.get('board_column')) or 'todo'
+    status = clean_optional(data.get('status')) or COLUMN_STATUS_MAPPING.get(board_column, 'todo')
+    completed = data.get('completed')
+    return {
+        'title': title,
+        'description': clean_optional(data.get('description')),
+        'due_date': clean_optional(data.get('due_date')),
+        'priority': priority,
+        'stakeholder_id': resolve_stakeholder(data.get('stakeholder_id')),
+        'board_column': board_column,
+        'board_position': safe_int(data.get('board_position'), 0),
+        'status': status,
+        'completed': _truthy(completed) if completed not in (None, '') else status == 'done',
+    }
+
+
+def _note_values(data, resolve_stakeholder):
+    """Mirror create_note: content required, owned stakeholder"""
+    content = clean_optional(data.get('content'))
+    if not content:
+        raise RowError('Content is required')
+    return {
+        'title': clean_optional(data.get('title')),
+        'content': content,
+        'category': clean_optional(data.get('category')),
+        'stakeholder_id': resolve_stakeholder(data.get('stakeholder_id')),
+    }
+
+
+def _stakeholder_values(data, resolve_stakeholder):
+    try:
+        return stakeholder_values(data)
+    except ValueError as e:
+        raise RowError(str(e))
+
+
+def _column_value(column, value):
+    """An exported value converted back to ``column``'s type"""
+    python_type = column.type.python_type
+    if python_type is datetime:
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            raise RowError(f'{column.name} must be an ISO date')
+    if python_type is bool:
+        return _truthy(value)
+    if python_type is int:
+        number = safe_int(value)
+        if number is None:
+            raise RowError(f'{column.name} must be a number')
+        return number
+    return str(value)
+
+
+def _restored_values(model, data, skip=()):
+    """
+    The exported columns of ``model`` in ``data``, typed; ids, owner,
+    Kanban rank and ``skip`` are left out.  Missing values take the column
+    default, and required columns without one raise ``RowError``.
+    """
+    values = {}
+    for column in model.__table__.columns:
+        if column.name in ('id', 'user_id', 'board_rank') or column.name in skip:
+            continue
+        value = data.get(column.name)
+        if value is None or value == '':
+            if not column.nullable and column.default is None:
+                raise RowError(f'{column.name} is required')
+            continue
+        values[column.name] = _column_value(column, value)
+    return values
+
+
+def _id_list(value):
+    """Ids from an exported JSON list column"""
+    if value in (None, ''):
+        return []
+    try:
+        ids = json.loads(value) if isinstance(value, str) else value
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(ids, list):
+        return []
+    return [number for number in map(safe_int, ids) if number is not None]
+
+
+def _enhanced_task_values(data, resolve_stakeholder):
+    """Restore an exported enhanced task; its links are kept aside under ``links``"""
+    values = _restored_values(EnhancedTask, data, skip=('category_id', 'assigned_stakeholder_id', *ENHANCED_TASK_LINKS))
+    values['assigned_stakeholder_id'] = resolve_stakeholder(data.get('assigned_stakeholder_id'))
+    links = {
+        name: _id_list(data.get(name)) if is_list else safe_int(data.get(name))
+        for name, is_list in ENHANCED_TASK_LINKS.items()
+    }
+    if any(links.values()):
+        values['links'] = links
+    return values
+
+
+def _relationship_values(data, resolve_stakeholder):
+    values = _restored_values(StakeholderRelationship, data, skip=('source_stakeholder_id', 'target_stakeholder_id'))
+    for name in ('source_stakeholder_id', 'target_stakeholder_id'):
+        values[name] = resolve_stakeholder(data.get(name))
+        if values[name] is None:
+            raise RowError(f'{name} is required')
+    return values
+
+
+def _interaction_values(data, resolve_stakeholder):
+    values = _restored_values(StakeholderInteraction, data, skip=('stakeholder_id',))
+    values['stakeholder_id'] = resolve_stakeholder(data.get('stakeholder_id'))
+    if values['stakeholder_id'] is None:
+        raise RowError('stakeholder_id is required')
+    return values
+
+
+# Insert order within a chunk: stakeholders first, so the rows referring to
+# them in the same chunk can be linked to the ids they were just given
+IMPORT_TYPES = {
+    'stakeholder': (Stakeholder, _stakeholder_values),
+    'task': (Task, _task_values),
+    'enhanced_task': (EnhancedTask, _enhanced_task_values),
+    'relationship': (StakeholderRelationship, _relationship_values),
+    'interaction': (StakeholderInteraction, _interaction_values),
+    'note': (Note, _note_values),
+}
+# Types whose file ids are remembered, and Kanban boards ranked at the end
+SOURCE_ID_TYPES = ('stakeholder', 'enhanced_task')
+BOARD_TYPES = ('task', 'enhanced_task')
+
+
+# ------------------------------------------------------------------
+# Reading
+# ------------------------------------------------------------------
+
+def _records(stream, fmt):
+    """Yield ``(row_number, dict)`` or ``(row_number, RowError)`` without reading ahead."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='' if fmt == 'csv' else None)
+    if fmt == 'csv':
+        for number, record in enumerate(csv.DictReader(text), start=1):
+            if None in record:
+                yield number, RowError('Row has more fields than the header')
+            else:
+                yield number, record
+        return
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, RowError(f'Invalid JSON: {e.msg}')
+            continue
+        yield number, record if isinstance(record, dict) else RowError('Each line must be a JSON object')
+
+
+# ------------------------------------------------------------------
+# Writing
+# ------------------------------------------------------------------
+
+class _ImportRun:
+    """Chunked inserts for one user's upload; ``events()`` drives it."""
+
+    def __init__(self, user_id, default_type):
+        self.user_id = user_id
+        self.default_type = default_type
+        self.processed = 0
+        self.imported = {name: 0 for name in IMPORT_TYPES}
+        self.failed = 0
+        self.errors = []
+        self.board_columns = {name: set() for name in BOARD_TYPES}
+        # Stakeholder ids from the file: inserted ({file id: new id}) and still queued
+        self.source_ids = {}
+        self._queued_sources = set()
+        # Enhanced tasks: {file id: new id}, and (new id, links) to restore at the end
+        self.task_ids = {}
+        self._task_links = []
+        self._pending = {name: [] for name in IMPORT_TYPES}
+        self._pending_count = 0
+        self._stakeholder_ids = None
+
+    def stakeholder_ids(self):
+        if self._stakeholder_ids is None:
+            self._stakeholder_ids = set(db.session.execute(
+                select(Stakeholder.id).where(Stakeholder.user_id == self.user_id)
+            ).scalars())
+        return self._stakeholder_ids
+
+    def resolve_stakeholder(self, value):
+        """The stakeholder a row links to: one from the file if it has that id, else one of the user's"""
+        if value in (None, ''):
+            return None
+        stakeholder_id = safe_int(value)
+        if stakeholder_id in self.source_ids:
+            return self.source_ids[stakeholder_id]
+        if stakeholder_id in self._queued_sources:
+            return _SourceRef(stakeholder_id)
+        if stakeholder_id is None or stakeholder_id not in self.stakeholder_ids():
+            raise RowError('Stakeholder not found')
+        return stakeholder_id
+
+    def _error(self, row, message):
+        self.failed += 1
+        error = {'row': row, 'error': message}
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+        return dict(error, event='error')
+
+    def add(self, row, record):
+        """Validate and queue one record; returns an error event or None"""
+        if not isinstance(record, RowError) and record.get('type') == HEADER_TYPE:
+            return None
+        self.processed += 1
+        if isinstance(record, RowError):
+            return self._error(row, str(record))
+        type_name = record.get('type') or self.default_type
+        if type_name not in IMPORT_TYPES:
+            return self._error(row, f"Unknown type '{type_name}'. Use one of: {', '.join(IMPORT_TYPES)}")
+        try:
+            values = IMPORT_TYPES[type_name][1](record, self.resolve_stakeholder)
+        except RowError as e:
+            return self._error(row, str(e))
+        values['user_id'] = self.user_id
+        source_id = safe_int(record.get('id')) if type_name in SOURCE_ID_TYPES else None
+        if source_id is not None and type_name == 'stakeholder':
+            self._queued_sources.add(source_id)
+        self._pending[type_name].append((row, values, source_id))
+        self._pending_count += 1
+        return None
+
+    @property
+    def chunk_full(self):
+        return self._pending_count >= IMPORT_CHUNK_SIZE
+
+    def flush(self):
+        """Insert and commit the queued rows; returns error events for rows that failed"""
+        if not self._pending_count:
+            return []
+        pending, self._pending = self._pending, {name: [] for name in IMPORT_TYPES}
+        self._pending_count = 0
+        try:
+            inserted, failures, new_ids = self._insert(pending, row_by_row=False)
+            self._after_insert(inserted)
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.warning("Import chunk failed, retrying row by row: %s", exc.__class__.__name__)
+            inserted, failures, new_ids = self._insert(pending, row_by_row=True)
+            self._after_insert(inserted)
+            db.session.commit()
+        for type_name, ids in (('stakeholder', self.source_ids), ('enhanced_task', self.task_ids)):
+            ids.update((source_id, new_ids[type_name][row])
+                       for row, _, source_id in inserted[type_name] if source_id is not None)
+        self._task_links.extend((new_ids['enhanced_task'][row], values['links'])
+                                for row, values, _ in inserted['enhanced_task'] if 'links' in values)
+        self._queued_sources.clear()
+        for type_name, items in inserted.items():
+            self.imported[type_name] += len(items)
+        self._invalidate_caches(inserted)
+        return [self._error(row, message) for row, message in sorted(failures)]
+
+    def _insert(self, pending, row_by_row):
+        """
+        Insert ``pending`` in the current transaction, one statement per model
+        or one savepoint per row.  Returns the inserted items, ``(row, message)``
+        failures and ``{type: {row: new id}}`` for stakeholders and enhanced tasks.
+        """
+        inserted = {name: [] for name in IMPORT_TYPES}
+        failures = []
+        new_ids = {name: {} for name in SOURCE_ID_TYPES}
+        chunk_sources = {}
+        for type_name, (model, _) in IMPORT_TYPES.items():
+            items = []
+            for row, values, source_id in pending[type_name]:
+                references = {name: value for name, value in values.items() if isinstance(value, _SourceRef)}
+                if any(int(reference) not in chunk_sources for reference in references.values()):
+                    failures.append((row, 'Stakeholder not found'))
+                    continue
+                if references:
+                    values = dict(values, **{name: chunk_sources[int(ref)] for name, ref in references.items()})
+                items.append((row, values, source_id))
+            if not items:
+                continue
+            if row_by_row:
+                for item in items:
+                    try:
+                        with db.session.begin_nested():
+                            ids = self._execute(model, [item])
+                    except Exception as e:
+                        failures.append((item[0], f'Could not be saved: {e.__class__.__name__}'))
+                        continue
+                    inserted[type_name].append(item)
+                    if ids:
+                        new_ids[type_name][item[0]] = ids[0]
+            else:
+                ids = self._execute(model, items)
+                inserted[type_name] = items
+                if ids:
+                    new_ids[type_name].update((row, new_id) for (row, _, _), new_id in zip(items, ids))
+            if type_name == 'stakeholder':
+                chunk_sources = {source_id: new_ids['stakeholder'][row]
+                                 for row, _, source_id in inserted['stakeholder'] if source_id is not None}
+        return inserted, failures, new_ids
+
+    @staticmethod
+    def _execute(model, items):
+        """Multi-row INSERT of ``items``; returns the new ids for stakeholders and enhanced tasks (in row order)"""
+        params = [{name: value for name, value in values.items() if name != 'links'} for _, values, _ in items]
+        if model in (Stakeholder, EnhancedTask):
+            statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+            return db.session.execute(statement, params).scalars().all()
+        db.session.execute(insert(model), params)
+        return None
+
+    def _after_insert(self, inserted):
+        for type_name, items in inserted.items():
+            if items:
+                mark_stale([self.user_id], *resources_for(IMPORT_TYPES[type_name][0]))
+        if any(inserted[name] for name in BOARD_TYPES):
+            for name in BOARD_TYPES:
+                self.board_columns[name].update(values.get('board_column') or 'todo' for _, values, _ in inserted[name])
+            bump_board_versions(db.session.connection(), [self.user_id])
+        if inserted['enhanced_task']:
+            refresh_task_stats(db.session.connection(), self.user_id)
+
+    def _invalidate_caches(self, inserted):
+        # Read cache generations (lists, insight snapshots) are bumped by mark_stale in _after_insert
+        if inserted['stakeholder']:
+            invalidate_match_index(self.user_id)
+            self._stakeholder_ids = None
+
+    def _link_tasks(self):
+        """Point imported enhanced tasks at the parents, dependencies and stakeholders they had in the file"""
+        if not self._task_links:
+            return
+        self._stakeholder_ids = None
+        known_stakeholders = self.stakeholder_ids()
+
+        def stakeholder(source_id):
+            new_id = self.source_ids.get(source_id, source_id)
+            return new_id if new_id in known_stakeholders else None
+
+        def id_list(ids, resolve):
+            resolved = [new_id for new_id in map(resolve, ids) if new_id is not None]
+            return json.dumps(resolved) if resolved else None
+
+        updates = [{
+            'id': task_id,
+            'parent_task_id': self.task_ids.get(links['parent_task_id']),
+            'depends_on_tasks': id_list(links['depends_on_tasks'], self.task_ids.get),
+            'blocks_tasks': id_list(links['blocks_tasks'], self.task_ids.get),
+            'related_stakeholders': id_list(links['related_stakeholders'], stakeholder),
+        } for task_id, links in self._task_links]
+        try:
+            db.session.execute(update(EnhancedTask), updates)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Failed to link %d imported enhanced task(s)", len(updates))
+
+    def finish(self):
+        """Link imported enhanced tasks, and give imported cards ranks at the end of their columns"""
+        self._link_tasks()
+        for type_name in BOARD_TYPES:
+            model = IMPORT_TYPES[type_name][0]
+            for column in sorted(self.board_columns[type_name]):
+                try:
+                    rebalance_column(model, self.user_id, column)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Failed to rank imported %s cards in column %r", type_name, column)
+
+    def progress(self, event):
+        return {
+            'event': event,
+            'processed': self.processed,
+            'imported': self.imported,
+            'failed': self.failed,
+        }
+
+    def events(self, records):
+        for row, record in records:
+            error = self.add(row, record)
+            if error:
+                yield error
+            if self.chunk_full:
+                yield from self.flush()
+                yield self.progress('progress')
+        yield from self.flush()
+        self.finish()
+        yield dict(self.progress('done'), errors=self.errors)
+
+
+# ------------------------------------------------------------------
+# Endpoint
+# ------------------------------------------------------------------
+
+@bulk_import_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_records():
+    """Stream-import NDJSON or CSV records (?type=<record type>, ?format=ndjson|csv)"""
+    try:
+        # get_jwt_identity() returns a string, convert to int for database queries
+        current_user_id = int(get_jwt_identity())
+
+        fmt = request.args.get('format') or IMPORT_FORMATS.get(request.mimetype)
+        if fmt not in ('ndjson', 'csv'):
+            return jsonify({'error': 'Send NDJSON or CSV (Content-Type or ?format=ndjson|csv)'}), 400
+
+        default_type = request.args.get('type')
+        if default_type is not None and default_type not in IMPORT_TYPES:
+            return jsonify({'error': f"Unknown type '{default_type}'. Use one of: {', '.join(IMPORT_TYPES)}"}), 400
+        if fmt == 'csv' and default_type is None:
+            return jsonify({'error': 'CSV imports need ?type=' + '|'.join(IMPORT_TYPES)}), 400
+
+        run = _ImportRun(current_user_id, default_type)
+        records = _records(io.BufferedReader(request.stream), fmt)
+
+        if request.accept_mimetypes.best == 'application/x-ndjson':
+            def generate():
+                for event in run.events(records):
+                    yield json.dumps(event) + '\n'
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        summary = None
+        for event in run.events(records):
+            summary = event
+        if not summary['processed']:
+            return jsonify({'error': 'No records provided'}), 400
+        return jsonify(summary), 200
+
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'Upload must be UTF-8 encoded'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Import failed', 'details': str(e)}), 500
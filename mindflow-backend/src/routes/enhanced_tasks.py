@@ -1,9 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db
+from src.models.board_version import board_version_for
 from src.models.enhanced_task import EnhancedTask, TaskCategory
 from src.models.stakeholder import Stakeholder
+from src.models.task_stats import UserTaskStats, compute_task_stats, refresh_due_counters
+from src.ranking import rank_for_position
 from datetime import datetime, timedelta
+import hashlib
 import json
 
 enhanced_tasks_bp = Blueprint('enhanced_tasks', __name__)
@@ -69,6 +73,28 @@ def create_category():
 
 # Enhanced Tasks Routes
 
+KANBAN_COLUMNS = ['todo', 'in_progress', 'review', 'done']
+
+def _kanban_etag(user_id):
+    """Strong ETag for a user's board: version counter, row count, latest update, overdue count.
+    
+    The overdue count is part of the tag because is_overdue flips with the
+    clock, without any write to the task.
+    """
+    now = datetime.utcnow()
+    version, count, last_updated, overdue = db.session.query(
+        board_version_for(user_id),
+        db.func.count(EnhancedTask.id),
+        db.func.max(EnhancedTask.updated_at),
+        db.func.count(EnhancedTask.id).filter(
+            EnhancedTask.due_date < now,
+            EnhancedTask.status.notin_(['done', 'cancelled'])
+        )
+    ).filter(EnhancedTask.user_id == user_id).one()
+    raw = f'{user_id}:{version}:{count}:{last_updated.isoformat() if last_updated else ""}:{overdue}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
 @enhanced_tasks_bp.route('/tasks', methods=['GET'])
 @jwt_required()
 def get_tasks():
@@ -77,27 +103,6 @@ def get_tasks():
         # get_jwt_identity() returns a string, convert to int for database queries
         current_user_id = int(get_jwt_identity())
         
-        # Auto-cleanup: delete tasks in "done" column for more than 1 day
-        import logging
-        try:
-            cutoff = datetime.utcnow() - timedelta(days=1)
-            stale_done_tasks = EnhancedTask.query.filter(
-                EnhancedTask.user_id == current_user_id,
-                EnhancedTask.board_column == 'done',
-                db.or_(
-                    db.and_(EnhancedTask.completed_at != None, EnhancedTask.completed_at < cutoff),
-                    db.and_(EnhancedTask.completed_at == None, EnhancedTask.updated_at < cutoff)
-                )
-            ).all()
-            if stale_done_tasks:
-                for t in stale_done_tasks:
-                    db.session.delete(t)
-                db.session.commit()
-                logging.info(f"Auto-cleaned {len(stale_done_tasks)} done enhanced task(s) for user {current_user_id}")
-        except Exception as cleanup_err:
-            logging.warning(f"Done enhanced task cleanup failed: {cleanup_err}")
-            db.session.rollback()
-        
         # Get query parameters
         status = request.args.get('status')
         priority = request.args.get('priority')
@@ -144,35 +149,14 @@ def get_tasks():
         # Sort by board position, then by priority and due date
         tasks = query.order_by(
             EnhancedTask.board_column,
-            EnhancedTask.board_position,
+            EnhancedTask.board_rank,
             EnhancedTask.priority.desc(),
             EnhancedTask.due_date.asc().nullslast()
         ).all()
         
-        # Ensure all tasks have board_column and board_position set (for tasks created before these fields existed)
-        needs_commit = False
-        for task in tasks:
-            if not task.board_column or task.board_column is None:
-                task.board_column = 'todo'
-                needs_commit = True
-            if task.board_position is None:
-                # Set position to end of column
-                max_pos = db.session.query(db.func.max(EnhancedTask.board_position)).filter_by(
-                    user_id=current_user_id,
-                    board_column=task.board_column
-                ).scalar() or 0
-                task.board_position = max_pos + 1
-                needs_commit = True
-        
-        if needs_commit:
-            try:
-                db.session.commit()
-            except Exception:
-                db.session.rollback()
-        
         return jsonify({
             'success': True,
-            'tasks': [task.to_dict() for task in tasks]
+            'tasks': EnhancedTask.to_dict_many(tasks)
         }), 200
         
     except Exception as e:
@@ -258,13 +242,7 @@ def create_task():
         if 'depends_on_tasks' in data:
             task.set_depends_on_list(data['depends_on_tasks'])
         
-        # Set board position (add to end of column)
-        max_position = db.session.query(db.func.max(EnhancedTask.board_position)).filter_by(
-            user_id=current_user_id,
-            board_column=task.board_column
-        ).scalar() or 0
-        task.board_position = max_position + 1
-        
+        # board_rank is assigned on insert, appending the task to its column
         db.session.add(task)
         db.session.commit()
         
@@ -393,32 +371,18 @@ def move_task(task_id):
         # Ensure task has board_column set (for tasks created before board_column was added)
         if not task.board_column:
             task.board_column = 'todo'
-        if task.board_position is None:
-            task.board_position = 0
         
         old_column = task.board_column
-        old_position = task.board_position
+        
+        # Place the card between its new neighbours: only this row is written
+        if new_column != old_column or new_position is not None:
+            task.board_rank = rank_for_position(
+                EnhancedTask, current_user_id, new_column, new_position, exclude_id=task.id
+            )
         
         # If moving to a different column
         if new_column != old_column:
-            # Update positions in old column (shift up)
-            EnhancedTask.query.filter(
-                EnhancedTask.user_id == current_user_id,
-                EnhancedTask.board_column == old_column,
-                EnhancedTask.board_position > old_position
-            ).update({
-                EnhancedTask.board_position: EnhancedTask.board_position - 1
-            }, synchronize_session=False)
-            
-            # Get max position in new column
-            max_position = db.session.query(db.func.max(EnhancedTask.board_position)).filter_by(
-                user_id=current_user_id,
-                board_column=new_column
-            ).scalar() or 0
-            
-            # Set new position
             task.board_column = new_column
-            task.board_position = new_position if new_position is not None else max_position + 1
             
             # Update status based on column
             column_status_mapping = {
@@ -433,31 +397,6 @@ def move_task(task_id):
                     task.completed_at = datetime.utcnow()
                     task.progress_percentage = 100
         
-        # If moving within the same column
-        elif new_position is not None and new_position != old_position:
-            if new_position > old_position:
-                # Moving down: shift tasks up
-                EnhancedTask.query.filter(
-                    EnhancedTask.user_id == current_user_id,
-                    EnhancedTask.board_column == old_column,
-                    EnhancedTask.board_position > old_position,
-                    EnhancedTask.board_position <= new_position
-                ).update({
-                    EnhancedTask.board_position: EnhancedTask.board_position - 1
-                }, synchronize_session=False)
-            else:
-                # Moving up: shift tasks down
-                EnhancedTask.query.filter(
-                    EnhancedTask.user_id == current_user_id,
-                    EnhancedTask.board_column == old_column,
-                    EnhancedTask.board_position >= new_position,
-                    EnhancedTask.board_position < old_position
-                ).update({
-                    EnhancedTask.board_position: EnhancedTask.board_position + 1
-                }, synchronize_session=False)
-            
-            task.board_position = new_position
-        
         task.updated_at = datetime.utcnow()
         db.session.commit()
         
@@ -478,23 +417,32 @@ def get_kanban_board():
         # get_jwt_identity() returns a string, convert to int for database queries
         current_user_id = int(get_jwt_identity())
         
-        # Define columns
-        columns = ['todo', 'in_progress', 'review', 'done']
+        # Cheap aggregate first: unchanged boards are answered without loading any task
+        etag = _kanban_etag(current_user_id)
+        # Weak comparison, as If-None-Match requires: compressed responses carry W/"<etag>"
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        
+        # Whole board in one ordered query, grouped in Python
+        tasks = EnhancedTask.query.filter(
+            EnhancedTask.user_id == current_user_id,
+            EnhancedTask.board_column.in_(KANBAN_COLUMNS)
+        ).order_by(EnhancedTask.board_column, EnhancedTask.board_rank, EnhancedTask.id).all()
         
-        # Get tasks for each column
-        kanban_data = {}
-        for column in columns:
-            tasks = EnhancedTask.query.filter_by(
-                user_id=current_user_id,
-                board_column=column
-            ).order_by(EnhancedTask.board_position).all()
-            
-            kanban_data[column] = [task.to_dict() for task in tasks]
+        kanban_data = {column: [] for column in KANBAN_COLUMNS}
+        for task, task_dict in zip(tasks, EnhancedTask.to_dict_many(tasks)):
+            kanban_data[task.board_column].append(task_dict)
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'kanban': kanban_data
-        }), 200
+        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response, 200
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -507,72 +455,21 @@ def get_task_analytics():
         # get_jwt_identity() returns a string, convert to int for database queries
         current_user_id = int(get_jwt_identity())
         
-        # Basic counts
-        total_tasks = EnhancedTask.query.filter_by(user_id=current_user_id).count()
-        completed_tasks = EnhancedTask.query.filter_by(
-            user_id=current_user_id,
-            status='done'
-        ).count()
-        overdue_tasks = EnhancedTask.query.filter(
-            EnhancedTask.user_id == current_user_id,
-            EnhancedTask.due_date < datetime.utcnow(),
-            EnhancedTask.status.notin_(['done', 'cancelled'])
-        ).count()
-        
-        # Priority distribution
-        priority_counts = db.session.query(
-            EnhancedTask.priority,
-            db.func.count(EnhancedTask.id)
-        ).filter_by(user_id=current_user_id).group_by(EnhancedTask.priority).all()
-        
-        priority_distribution = {priority: count for priority, count in priority_counts}
-        
-        # Status distribution
-        status_counts = db.session.query(
-            EnhancedTask.status,
-            db.func.count(EnhancedTask.id)
-        ).filter_by(user_id=current_user_id).group_by(EnhancedTask.status).all()
-        
-        status_distribution = {status: count for status, count in status_counts}
-        
-        # Completion rate
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        
-        # Average completion time
-        completed_with_duration = EnhancedTask.query.filter(
-            EnhancedTask.user_id == current_user_id,
-            EnhancedTask.status == 'done',
-            EnhancedTask.actual_duration.isnot(None)
-        ).all()
-        
-        avg_completion_time = 0
-        if completed_with_duration:
-            total_duration = sum(task.actual_duration for task in completed_with_duration)
-            avg_completion_time = total_duration / len(completed_with_duration)
-        
-        # Tasks due this week
-        week_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        week_end = week_start + timedelta(days=7)
-        
-        due_this_week = EnhancedTask.query.filter(
-            EnhancedTask.user_id == current_user_id,
-            EnhancedTask.due_date >= week_start,
-            EnhancedTask.due_date <= week_end,
-            EnhancedTask.status.notin_(['done', 'cancelled'])
-        ).count()
+        # Rollup maintained on every write (see src/models/task_stats.py)
+        now = datetime.utcnow()
+        stats = db.session.get(UserTaskStats, current_user_id)
+        if stats is None:
+            # Not built yet (the next write or reconciliation stores it); compute without writing
+            stats = UserTaskStats(**compute_task_stats(db.session.connection(), current_user_id, now))
+        elif stats.due_counters_stale(now):
+            # A due date has passed or the day changed since the counters were computed
+            refresh_due_counters(db.session.connection(), current_user_id, now)
+            db.session.commit()
+            db.session.refresh(stats)
         
         return jsonify({
             'success': True,
-            'analytics': {
-                'total_tasks': total_tasks,
-                'completed_tasks': completed_tasks,
-                'overdue_tasks': overdue_tasks,
-                'due_this_week': due_this_week,
-                'completion_rate': round(completion_rate, 2),
-                'avg_completion_time_minutes': round(avg_completion_time, 2),
-                'priority_distribution': priority_distribution,
-                'status_distribution': status_distribution
-            }
+            'analytics': stats.to_analytics()
         }), 200
         
     except Exception as e:
@@ -593,15 +490,7 @@ def delete_task(task_id):
         if not task:
             return jsonify({'success': False, 'error': 'Task not found'}), 404
         
-        # Update positions in the same column
-        EnhancedTask.query.filter(
-            EnhancedTask.user_id == current_user_id,
-            EnhancedTask.board_column == task.board_column,
-            EnhancedTask.board_position > task.board_position
-        ).update({
-            EnhancedTask.board_position: EnhancedTask.board_position - 1
-        })
-        
+        # Rank keys leave no gaps to close, so no other row is touched
         db.session.delete(task)
         db.session.commit()
         
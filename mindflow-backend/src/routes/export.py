@@ -0,0 +1,168 @@
+"""
+Streaming export of a user's data (``GET /api/export``).
+
+Rows are read with server-side cursors (``yield_per``) straight from the
+tables, serialized one at a time and sent as a generator response, gzipped
+on the fly when the client accepts it, so memory stays flat however large
+the account is.
+
+NDJSON exports everything in one stream: a ``{"type": "export", ...}``
+header line, then one object per row tagged with its ``type``, stakeholders
+first so references point backwards.  Rows keep their original ``id``;
+``POST /api/import`` reads the same file back, mapping stakeholder and
+parent task references onto the rows it creates, which makes the export
+the backup format for moving between installations (task categories are
+not exported).  CSV has one table per file, so ``?type=`` is required.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
+
+from src.models.enhanced_task import EnhancedTask
+from src.models.note import Note
+from src.models.stakeholder import Stakeholder
+from src.models.stakeholder_relationship import StakeholderInteraction, StakeholderRelationship
+from src.models.task import Task
+from src.models.user import db
+
+export_bp = Blueprint('export', __name__)
+
+EXPORT_VERSION = 1
+# Type of the NDJSON header line (skipped by the import)
+HEADER_TYPE = 'export'
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# Serialized bytes collected before a chunk is handed to the server
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Export order: referenced tables before the tables referencing them
+EXPORT_TYPES = {
+    'stakeholder': Stakeholder,
+    'task': Task,
+    'enhanced_task': EnhancedTask,
+    'relationship': StakeholderRelationship,
+    'interaction': StakeholderInteraction,
+    'note': Note,
+}
+
+
+def _columns(model):
+    """Exported columns: everything but the owner"""
+    return [column for column in model.__table__.columns if column.name != 'user_id']
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _rows(model, user_id):
+    """Yield one user's rows of ``model`` as column tuples, streamed from the database"""
+    columns = _columns(model)
+    statement = select(*columns).where(model.__table__.c.user_id == user_id).order_by(model.__table__.c.id)
+    result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    try:
+        for row in result:
+            yield row
+    finally:
+        result.close()
+
+
+def _ndjson_lines(user_id, type_names):
+    yield json.dumps({
+        'type': HEADER_TYPE,
+        'version': EXPORT_VERSION,
+        'exported_at': datetime.utcnow().isoformat(),
+        'types': type_names,
+    }) + '\n'
+    for type_name in type_names:
+        model = EXPORT_TYPES[type_name]
+        names = [column.name for column in _columns(model)]
+        for row in _rows(model, user_id):
+            record = {'type': type_name}
+            record.update(zip(names, map(_json_value, row)))
+            yield json.dumps(record) + '\n'
+
+
+def _csv_lines(user_id, type_name):
+    model = EXPORT_TYPES[type_name]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in _columns(model)])
+    for row in _rows(model, user_id):
+        writer.writerow(['' if value is None else _json_value(value) for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _chunks(lines, compress):
+    """Batch text lines into byte chunks of about ``EXPORT_CHUNK_BYTES``, gzipped if ``compress``"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending, size = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        pending.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_BYTES:
+            chunk = b''.join(pending)
+            pending, size = [], 0
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+    chunk = b''.join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+@export_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_data():
+    """Stream the current user's data (?format=ndjson|csv, ?type= or ?types=)"""
+    try:
+        # get_jwt_identity() returns a string, convert to int for database queries
+        current_user_id = int(get_jwt_identity())
+
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in ('ndjson', 'csv'):
+            return jsonify({'error': 'Format must be ndjson or csv'}), 400
+
+        requested = request.args.get('types') or request.args.get('type')
+        type_names = [name.strip() for name in requested.split(',') if name.strip()] if requested else list(EXPORT_TYPES)
+        unknown = [name for name in type_names if name not in EXPORT_TYPES]
+        if unknown:
+            return jsonify({'error': f"Unknown type '{unknown[0]}'. Use any of: {', '.join(EXPORT_TYPES)}"}), 400
+        # Keep the dependency order whatever order the types were asked in
+        type_names = [name for name in EXPORT_TYPES if name in type_names]
+
+        if fmt == 'csv':
+            if len(type_names) != 1:
+                return jsonify({'error': 'CSV exports one type at a time: pass ?type=' + '|'.join(EXPORT_TYPES)}), 400
+            lines = _csv_lines(current_user_id, type_names[0])
+            mimetype, suffix = 'text/csv', f'{type_names[0]}.csv'
+        else:
+            lines = _ndjson_lines(current_user_id, type_names)
+            mimetype, suffix = 'application/x-ndjson', 'ndjson'
+
+        compress = request.accept_encodings['gzip'] > 0
+        response = Response(stream_with_context(_chunks(lines, compress)), mimetype=mimetype)
+        filename = f"mindflow-export-{datetime.utcnow().strftime('%Y%m%d')}.{suffix}"
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if compress:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+    except Exception as e:
+        return jsonify({'error': 'Failed to export data', 'details': str(e)}), 500
@@ -1,33 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-import os
 import logging
 import requests
 import json
 import re
 from urllib.parse import quote
 
+from src.llm.factory import get_llm_provider
+
 linkedin_bp = Blueprint('linkedin', __name__)
 logger = logging.getLogger(__name__)
 
-def get_openai_client():
-    """Get OpenAI client for processing LinkedIn data"""
-    try:
-        OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
-        if not OPENAI_API_KEY:
-            logger.warning("OPENAI_API_KEY not set - LinkedIn data will not be processed with AI")
-            return None
-        
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        logger.info("✅ OpenAI client initialized for LinkedIn processing")
-        return client
-    except Exception as e:
-        logger.error(f"Failed to initialize OpenAI client: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return None
-
 def search_linkedin_profile(name, company=None):
     """Search for LinkedIn profile using DuckDuckGo search"""
     try:
@@ -68,9 +51,9 @@ def search_linkedin_profile(name, company=None):
 
 def extract_linkedin_info_with_openai(name, company=None, linkedin_url=None):
     """Use OpenAI to extract and structure LinkedIn information"""
-    client = get_openai_client()
-    if not client:
-        logger.warning("OpenAI client not available for LinkedIn extraction")
+    provider = get_llm_provider()
+    if not provider.is_available():
+        logger.warning("LLM provider not available for LinkedIn extraction")
         return None
     
     try:
@@ -109,24 +92,24 @@ IMPORTANT:
 Return ONLY valid JSON, no additional text."""
         
         logger.info("📤 Sending structure request to OpenAI API...")
-        structure_response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        structure_response = provider.chat_completion(
+            [
                 {"role": "system", "content": "You are a data extraction specialist. Extract and structure LinkedIn profile information into JSON format. Use your knowledge base to provide accurate professional information."},
                 {"role": "user", "content": structure_prompt}
             ],
             temperature=0.3,
             max_tokens=2000,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            cache_site="linkedin",
         )
         
-        logger.info("✅ Received structured data from OpenAI API")
+        logger.info("✅ Received structured data from the LLM")
         
-        # Log token usage
-        if hasattr(structure_response, 'usage'):
-            logger.info(f"📊 OpenAI API usage (LinkedIn extraction) - Tokens: {structure_response.usage.total_tokens} (prompt: {structure_response.usage.prompt_tokens}, completion: {structure_response.usage.completion_tokens})")
+        # Log token usage (absent when served from the cache)
+        if structure_response.usage:
+            logger.info(f"📊 LLM usage (LinkedIn extraction) - Tokens: {structure_response.usage['total_tokens']} (prompt: {structure_response.usage['prompt_tokens']}, completion: {structure_response.usage['completion_tokens']})")
         
-        structure_text = structure_response.choices[0].message.content.strip()
+        structure_text = (structure_response.content or '').strip()
         
         # Parse JSON (should be clean since we used response_format)
         structured_data = json.loads(structure_text)
@@ -154,8 +137,8 @@ Return ONLY valid JSON, no additional text."""
 
 def process_linkedin_data_with_ai(raw_data, name=None, company=None):
     """Use OpenAI to structure and extract all relevant information from LinkedIn data"""
-    client = get_openai_client()
-    if not client:
+    provider = get_llm_provider()
+    if not provider.is_available():
         return None
     
     try:
@@ -200,17 +183,17 @@ IMPORTANT:
 Return ONLY valid JSON, no additional text or explanation.
 """
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        response = provider.chat_completion(
+            [
                 {"role": "system", "content": "You are a data extraction specialist. Extract and structure information from LinkedIn profiles into JSON format."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
-            max_tokens=2000
+            max_tokens=2000,
+            cache_site="linkedin",
         )
         
-        result_text = response.choices[0].message.content.strip()
+        result_text = (response.content or '').strip()
         
         # Try to parse JSON from the response
         # Sometimes the response might have markdown code blocks
@@ -263,26 +246,16 @@ def fetch_linkedin_profile():
                 'error': 'Either linkedin_url or name is required'
             }), 400
         
-        # Check if OpenAI is available
-        OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
-        if not OPENAI_API_KEY:
-            logger.error("❌ OPENAI_API_KEY environment variable not set")
+        # Check if an LLM provider is available
+        if not get_llm_provider().is_available():
+            logger.error("❌ LLM provider not configured")
             return jsonify({
                 'success': False,
                 'error': 'OpenAI API not configured',
-                'message': 'To enable LinkedIn profile fetching, please set the OPENAI_API_KEY environment variable in your Render dashboard.'
-            }), 503
-        
-        client = get_openai_client()
-        if not client:
-            logger.error("❌ OpenAI client initialization failed")
-            return jsonify({
-                'success': False,
-                'error': 'OpenAI API client initialization failed',
-                'message': 'OPENAI_API_KEY is set but client initialization failed. Please check your API key and try again.'
+                'message': 'To enable LinkedIn profile fetching, please set the OPENAI_API_KEY environment variable in your Render dashboard, or configure a local LLM provider.'
             }), 503
         
-        logger.info("✅ OpenAI client available, proceeding with LinkedIn search")
+        logger.info("✅ LLM provider available, proceeding with LinkedIn search")
         
         # If we have a LinkedIn URL, extract username and use it
         if linkedin_url:
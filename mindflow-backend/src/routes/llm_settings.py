@@ -10,6 +10,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 import logging
 import os
 
+from src.llm.cache import llm_cache_status
+from src.llm.failover import llm_health_status
 from src.llm.factory import get_llm_provider, clear_provider_cache
 
 llm_settings_bp = Blueprint("llm_settings", __name__)
@@ -116,11 +118,11 @@ def test_connection():
             base_url=settings.get("base_url"),
             model=settings.get("model"),
         )
-        available = provider.is_available()
-        if available:
-            return jsonify({"success": True, "message": "LLM provider is reachable and working."}), 200
-        else:
+        if not provider.is_available():
             return jsonify({"success": False, "error": "LLM provider did not respond correctly."}), 503
+        # A real round trip; the result also updates the circuit breakers
+        provider.health_check()
+        return jsonify({"success": True, "message": "LLM provider is reachable and working."}), 200
     except Exception as exc:
         logger.error("LLM test connection failed: %s", exc)
         return jsonify({"success": False, "error": str(exc)}), 503
@@ -135,3 +137,17 @@ def get_provider_for_user(user_id: str):
         base_url=settings.get("base_url"),
         model=settings.get("model"),
     )
+
+
+@llm_settings_bp.route("/llm/cache/status", methods=["GET"])
+@jwt_required()
+def cache_status():
+    """Hit rates of the LLM response cache per call site (counters are per worker process)."""
+    return jsonify({"success": True, "status": llm_cache_status()}), 200
+
+
+@llm_settings_bp.route("/llm/health", methods=["GET"])
+@jwt_required()
+def health_status():
+    """Circuit state, error rate and latency of each LLM backend (per worker process)."""
+    return jsonify({"success": True, "status": llm_health_status()}), 200
@@ -100,21 +100,15 @@ def _process_message(channel_name: str, msg: IncomingMessage):
     try:
         from flask import current_app
         from src.llm.factory import get_llm_provider
-        from src.routes.ai_assistant import SYSTEM_PROMPT, TOOLS, FUNCTION_MAP
-        from datetime import datetime
+        from src.llm.context import tool_result_content
+        from src.routes.ai_assistant import build_chat_context, tool_runner
 
         provider = get_llm_provider()
-        today = datetime.utcnow().strftime('%Y-%m-%d')
-        system_msg = SYSTEM_PROMPT.replace('{today}', today)
-
-        messages = [
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": msg.text},
-        ]
+        messages, tools = build_chat_context(msg.text)
 
         response = provider.chat_completion(
             messages,
-            tools=TOOLS,
+            tools=tools,
             tool_choice="auto",
             temperature=0.7,
             max_tokens=1500,
@@ -122,23 +116,14 @@ def _process_message(channel_name: str, msg: IncomingMessage):
 
         # Execute tool calls
         if response.tool_calls:
-            if response.raw:
-                messages.append(response.raw.choices[0].message)
-
-            for tc in response.tool_calls:
-                executor = FUNCTION_MAP.get(tc.function_name)
-                if executor:
-                    try:
-                        result = executor(int(user_id), tc.arguments)
-                    except Exception as e:
-                        result = {"success": False, "error": str(e)}
-                else:
-                    result = {"success": False, "error": f"Unknown function: {tc.function_name}"}
+            # Cached responses have no raw message; the tool results must follow this turn
+            messages.append(response.to_message())
 
+            for outcome in tool_runner.run(int(user_id), response.tool_calls):
                 messages.append({
                     "role": "tool",
-                    "tool_call_id": tc.id,
-                    "content": json.dumps(result, default=str),
+                    "tool_call_id": outcome.call.id,
+                    "content": tool_result_content(outcome.result),
                 })
 
             final = provider.chat_completion(messages, temperature=0.7, max_tokens=1500)
@@ -3,11 +3,17 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db
 from src.models.note import Note
 from src.models.stakeholder import Stakeholder
+from src.pagination import InvalidCursor, SortKey, page_args, paginate
+from src.response_cache import cached_response
+from src.services.note_embeddings import (
+    DEFAULT_SEMANTIC_LIMIT, EmbeddingsUnavailable, indexed_note_count, semantic_search,
+)
 
 notes_bp = Blueprint('notes', __name__)
 
 @notes_bp.route('/notes', methods=['GET'])
 @jwt_required()
+@cached_response('notes')
 def get_notes():
     try:
         # get_jwt_identity() returns a string, convert to int for database queries
@@ -16,6 +22,7 @@ def get_notes():
         # Get query parameters for filtering
         category = request.args.get('category')
         stakeholder_id = request.args.get('stakeholder_id')
+        limit, cursor = page_args()
         
         # Build query
         query = Note.query.filter_by(user_id=current_user_id)
@@ -31,12 +38,18 @@ def get_notes():
                 return jsonify({'error': 'Invalid stakeholder_id'}), 400
         
         # Order by creation date (newest first)
-        notes = query.order_by(Note.created_at.desc()).all()
+        notes, next_cursor = paginate(query, [
+            SortKey(Note.created_at, descending=True),
+            SortKey(Note.id, descending=True),
+        ], limit, cursor)
         
         return jsonify({
-            'notes': [note.to_dict() for note in notes]
+            'notes': [note.to_dict() for note in notes],
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get notes', 'details': str(e)}), 500
 
@@ -83,6 +96,36 @@ def create_note():
         db.session.rollback()
         return jsonify({'error': 'Failed to create note', 'details': str(e)}), 500
 
+@notes_bp.route('/notes/semantic-search', methods=['GET'])
+@jwt_required()
+def semantic_search_notes():
+    """Notes closest in meaning to ?q=, from the on-disk embedding index"""
+    try:
+        # get_jwt_identity() returns a string, convert to int for database queries
+        current_user_id = int(get_jwt_identity())
+        
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        try:
+            limit = int(request.args.get('limit', DEFAULT_SEMANTIC_LIMIT))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        try:
+            results = semantic_search(current_user_id, query, limit=limit)
+        except EmbeddingsUnavailable as e:
+            return jsonify({'error': str(e)}), 503
+        
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'indexed': indexed_note_count(current_user_id)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Semantic search failed', 'details': str(e)}), 500
+
 @notes_bp.route('/notes/<int:note_id>', methods=['GET'])
 @jwt_required()
 def get_note(note_id):
@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.search import DEFAULT_LIMIT, InvalidSearch, search, search_backend
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_all():
+    """Ranked full-text search across tasks, notes, stakeholders and interactions"""
+    try:
+        # get_jwt_identity() returns a string, convert to int for database queries
+        current_user_id = int(get_jwt_identity())
+        
+        query = request.args.get('q', '')
+        types = [t.strip() for t in request.args.get('types', '').split(',') if t.strip()]
+        try:
+            limit = int(request.args.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        try:
+            results = search(current_user_id, query, types=types or None, limit=limit)
+        except InvalidSearch as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'backend': search_backend()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Search failed', 'details': str(e)}), 500
@@ -1,5 +1,6 @@
 """
-Services API — manage background services (File Watcher, Email Checker).
+Services API — manage background services (File Watcher, Email Checker,
+Maintenance Scheduler).
 
 Provides endpoints to configure, start, stop, and query the status of
 background services from the frontend settings page.
@@ -7,16 +8,26 @@ background services from the frontend settings page.
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import logging
+import os
 
 from src.services.file_watcher import FileWatcherService, FileEvent
-from src.services.email_checker import EmailCheckerService, EmailRule
+from src.services.email_checker import EmailCheckerService, EmailMessage, EmailRule
+from src.services.ingest import describe_files, triage_emails
+from src.services.maintenance import MaintenanceScheduler, default_jobs
+from src.services.note_embeddings import embeddings_enabled
+from src.response_cache import cache_status
+from src.security import operator_required
 
 services_bp = Blueprint("services", __name__)
 logger = logging.getLogger(__name__)
 
+# Task.title and Note.title are String(200)
+TITLE_MAX_LENGTH = 200
+
 # Singleton service instances (initialised by init_services)
 _file_watcher: FileWatcherService | None = None
 _email_checker: EmailCheckerService | None = None
+_maintenance: MaintenanceScheduler | None = None
 
 
 def init_services(app):
@@ -25,82 +36,127 @@ def init_services(app):
 
     Called from ``main.py`` during application startup.
     """
-    global _file_watcher, _email_checker
+    global _file_watcher, _email_checker, _maintenance
+
+    def _save_rows(rows, what: str) -> int:
+        """
+        Insert ``(model, values)`` rows in one commit.  If that commit fails,
+        retry row by row in savepoints so one bad row only loses itself:
+        the services never hand the same item over twice.
+        """
+        from src.models.db import db
 
-    def _on_file_event(user_id, event: FileEvent, content: str | None):
-        """Callback: create a note from a file change."""
-        if event.event_type == "deleted":
-            return
-        if not content:
-            return
         try:
-            from src.models.note import Note
-            from src.models.db import db
-
-            # Truncate content for the note
-            preview = content[:2000]
-            note = Note(
-                user_id=int(user_id),
-                title=f"File: {event.filename}",
-                content=f"**{event.event_type.title()}:** `{event.path}`\n\n```\n{preview}\n```",
-                category="reference",
-            )
-            db.session.add(note)
+            db.session.add_all(model(**values) for model, values in rows)
             db.session.commit()
-            logger.info("Created note from file event: %s", event.filename)
+            return len(rows)
         except Exception as exc:
-            logger.error("Failed to create note from file event: %s", exc)
-
-    def _on_email(user_id, email_msg, rule: EmailRule):
-        """Callback: create a task or note from an email."""
+            db.session.rollback()
+            logger.warning("Batch of %s failed, retrying row by row: %s", what, exc.__class__.__name__)
+
+        saved = 0
+        for model, values in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(model(**values))
+                saved += 1
+            except Exception as exc:
+                logger.error("Failed to create %s %r: %s", what, values.get("title"), exc)
         try:
-            from src.models.db import db
-
-            if rule.action == "task":
-                from src.models.task import Task
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.error("Failed to create %s: %s", what, exc)
+            return 0
+        return saved
+
+    def _on_file_events(user_id, items: list[tuple[FileEvent, str | None]]):
+        """Callback: create notes from a batch of file changes, in one commit."""
+        # Deleted files and empty files produce nothing
+        items = [(event, content) for event, content in items if event.event_type != "deleted" and content]
+        if not items:
+            return
+        try:
+            from src.models.note import Note
 
-                task = Task(
-                    user_id=int(user_id),
-                    title=f"Email: {email_msg.subject}",
-                    description=(
-                        f"**From:** {email_msg.sender_name} <{email_msg.sender}>\n"
-                        f"**Date:** {email_msg.date}\n\n"
-                        f"{email_msg.body_text[:1000]}"
-                    ),
-                    priority=rule.priority,
-                    status="todo",
-                    board_column="todo",
-                    board_position=0,
-                )
-                db.session.add(task)
-                db.session.commit()
-                logger.info("Created task from email: %s", email_msg.subject)
-
-            elif rule.action == "note":
-                from src.models.note import Note
-
-                note = Note(
+            rows = []
+            for (event, content), described in zip(items, describe_files(user_id, items)):
+                # Truncate content for the note
+                preview = content[:2000]
+                body = f"**{event.event_type.title()}:** `{event.path}`\n\n```\n{preview}\n```"
+                if described.get("summary"):
+                    body = f"{described['summary']}\n\n{body}"
+                rows.append((Note, dict(
                     user_id=int(user_id),
-                    title=f"Email: {email_msg.subject}",
-                    content=(
-                        f"**From:** {email_msg.sender_name} <{email_msg.sender}>\n"
-                        f"**Date:** {email_msg.date}\n\n"
-                        f"{email_msg.body_text[:2000]}"
-                    ),
-                    category=rule.category,
-                )
-                db.session.add(note)
-                db.session.commit()
-                logger.info("Created note from email: %s", email_msg.subject)
-
-            elif rule.action == "ignore":
-                pass
-
+                    title=(described.get("title") or f"File: {event.filename}")[:TITLE_MAX_LENGTH],
+                    content=body,
+                    category=described.get("category") or "reference",
+                )))
         except Exception as exc:
-            logger.error("Failed to process email: %s", exc)
+            logger.error("Failed to create notes from file events: %s", exc)
+            return
+        created = _save_rows(rows, "notes")
+        logger.info("Created %d note(s) from %d file event(s)", created, len(items))
 
-    _file_watcher = FileWatcherService(app=app, on_file_event=_on_file_event)
-    _email_checker = EmailCheckerService(app=app, on_email=_on_email)
+    def _on_emails(user_id, items: list[tuple[EmailMessage, EmailRule]]):
+        """Callback: create tasks and notes from a batch of emails, in one commit."""
+        try:
+            from src.models.note import Note
+            from src.models.task import Task
+
+            rows = []
+            for email_msg, rule, fields in triage_emails(user_id, items):
+                if rule.action == "task":
+                    rows.append((Task, dict(
+                        user_id=int(user_id),
+                        title=(fields.get("title") or f"Email: {email_msg.subject}")[:TITLE_MAX_LENGTH],
+                        description=(
+                            f"**From:** {email_msg.sender_name} <{email_msg.sender}>\n"
+                            f"**Date:** {email_msg.date}\n\n"
+                            f"{email_msg.body_text[:1000]}"
+                        ),
+                        priority=fields.get("priority") or rule.priority,
+                        due_date=fields.get("due_date"),
+                        status="todo",
+                        board_column="todo",
+                        board_position=0,
+                    )))
+
+                elif rule.action == "note":
+                    rows.append((Note, dict(
+                        user_id=int(user_id),
+                        title=f"Email: {email_msg.subject}"[:TITLE_MAX_LENGTH],
+                        content=(
+                            f"**From:** {email_msg.sender_name} <{email_msg.sender}>\n"
+                            f"**Date:** {email_msg.date}\n\n"
+                            f"{email_msg.body_text[:2000]}"
+                        ),
+                        category=rule.category,
+                    )))
+
+                # "ignore" (and "notify", which has no handler yet) create nothing
+        except Exception as exc:
+            logger.error("Failed to process emails: %s", exc)
+            return
+        created = _save_rows(rows, "tasks/notes")
+        logger.info("Created %d task(s)/note(s) from %d email(s)", created, len(items))
+
+    # New items arrive in batches, so LLM enrichment and commits are per batch
+    _file_watcher = FileWatcherService(app=app, on_file_events=_on_file_events)
+    _email_checker = EmailCheckerService(app=app, on_emails=_on_emails)
+
+    # Database housekeeping needs no configuration, so it always runs
+    _maintenance = MaintenanceScheduler(
+        app=app,
+        jobs=default_jobs(
+            purge_interval=int(os.environ.get("DONE_TASK_PURGE_INTERVAL_SECONDS", 3600)),
+            backfill_interval=int(os.environ.get("BOARD_BACKFILL_INTERVAL_SECONDS", 3600)),
+            rebalance_interval=int(os.environ.get("RANK_REBALANCE_INTERVAL_SECONDS", 600)),
+            reconcile_interval=int(os.environ.get("TASK_STATS_RECONCILE_INTERVAL_SECONDS", 3600)),
+            embed_interval=int(os.environ.get("NOTE_EMBEDDING_INTERVAL_SECONDS", 60)) if embeddings_enabled() else None,
+        ),
+    )
+    _maintenance.start()
 
     logger.info("Background services initialised")
 
@@ -309,3 +365,23 @@ def stop_email_checker():
         return jsonify({"success": False, "error": "Email checker not initialised"}), 503
     _email_checker.stop()
     return jsonify({"success": True, "message": "Email checker stopped."}), 200
+
+
+# ── Maintenance endpoints ──────────────────────────────────────────────
+
+@services_bp.route("/services/maintenance/status", methods=["GET"])
+@jwt_required()
+@operator_required
+def maintenance_status():
+    if not _maintenance:
+        return jsonify({"success": False, "error": "Maintenance scheduler not initialised"}), 503
+    return jsonify({"success": True, "status": _maintenance.get_status()}), 200
+
+
+# ── Read cache endpoints ───────────────────────────────────────────────
+
+@services_bp.route("/services/cache/status", methods=["GET"])
+@jwt_required()
+def read_cache_status():
+    """Hit rates of the list endpoint cache (counters are per worker process)."""
+    return jsonify({"success": True, "status": cache_status()}), 200
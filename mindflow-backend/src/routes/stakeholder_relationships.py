@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db
 from src.models.stakeholder_relationship import StakeholderRelationship, StakeholderInteraction
 from src.models.stakeholder import Stakeholder
+from src.pagination import InvalidCursor, SortKey, page_args, paginate
+from src.response_cache import cached_response
 from datetime import datetime
 import json
 
@@ -17,16 +19,21 @@ def get_relationships():
     try:
         # get_jwt_identity() returns a string, convert to int for database queries
         current_user_id = int(get_jwt_identity())
-        relationships = StakeholderRelationship.query.filter_by(
+        limit, cursor = page_args()
+        query = StakeholderRelationship.query.filter_by(
             user_id=current_user_id,
             is_active=True
-        ).all()
+        )
+        relationships, next_cursor = paginate(query, [SortKey(StakeholderRelationship.id)], limit, cursor)
         
         return jsonify({
             'success': True,
-            'relationships': [rel.to_dict() for rel in relationships]
+            'relationships': [rel.to_dict() for rel in relationships],
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -171,19 +178,26 @@ def get_interactions():
         # get_jwt_identity() returns a string, convert to int for database queries
         current_user_id = int(get_jwt_identity())
         stakeholder_id = request.args.get('stakeholder_id')
+        limit, cursor = page_args()
         
         query = StakeholderInteraction.query.filter_by(user_id=current_user_id)
         
         if stakeholder_id:
             query = query.filter_by(stakeholder_id=stakeholder_id)
         
-        interactions = query.order_by(StakeholderInteraction.interaction_date.desc()).all()
+        interactions, next_cursor = paginate(query, [
+            SortKey(StakeholderInteraction.interaction_date, descending=True),
+            SortKey(StakeholderInteraction.id, descending=True),
+        ], limit, cursor)
         
         return jsonify({
             'success': True,
-            'interactions': [interaction.to_dict() for interaction in interactions]
+            'interactions': [interaction.to_dict() for interaction in interactions],
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -352,6 +366,7 @@ def delete_interaction(interaction_id):
 
 @stakeholder_relationships_bp.route('/network/graph', methods=['GET'])
 @jwt_required()
+@cached_response('network')
 def get_network_graph():
     """Get stakeholder network graph data for visualization"""
     try:
@@ -2,6 +2,12 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db
 from src.models.stakeholder import Stakeholder
+from src.pagination import InvalidCursor, SortKey, page_args, paginate
+from src.response_cache import cached_response
+from src.search import search_filter
+from src.stakeholder_match import (
+    DEFAULT_MATCH_LIMIT, find_duplicates, match_backend, match_stakeholders,
+)
 from datetime import datetime
 
 stakeholders_bp = Blueprint('stakeholders', __name__)
@@ -19,8 +25,104 @@ def clean_optional(value):
         return None
     return value_str or None
 
+def safe_int(val, default=None):
+    """Convert to int, falling back to default for None or unparseable values"""
+    if val is None:
+        return default
+    try:
+        return int(val)
+    except (ValueError, TypeError):
+        return default
+
+def joined_list(value):
+    """Store a list (or an already comma-separated string) as a comma-separated string"""
+    if isinstance(value, list):
+        return ', '.join(str(item).strip() for item in value if str(item).strip()) or None
+    return clean_optional(value)
+
+VALID_SENTIMENTS = ['positive', 'neutral', 'negative']
+
+def stakeholder_values(data):
+    """
+    Validate a stakeholder payload and map it to model column values.
+    
+    Shared by the create endpoint and the bulk importer. Raises ValueError
+    with a user-facing message for invalid input.
+    """
+    if not clean_optional(data.get('name')):
+        raise ValueError('Name is required')
+    
+    # Validate sentiment
+    sentiment = data.get('sentiment') or 'neutral'
+    if sentiment not in VALID_SENTIMENTS:
+        raise ValueError('Sentiment must be positive, neutral, or negative')
+    
+    # Validate influence and interest
+    influence = data.get('influence')
+    interest = data.get('interest')
+    try:
+        influence = int(influence) if influence not in (None, '') else 5
+        interest = int(interest) if interest not in (None, '') else 5
+        if not (1 <= influence <= 10) or not (1 <= interest <= 10):
+            raise ValueError()
+    except (ValueError, TypeError):
+        raise ValueError('Influence and interest must be integers between 1 and 10')
+    
+    # Validate trust_level
+    trust_level = safe_int(data.get('trust_level'), 5)
+    if not (1 <= trust_level <= 10):
+        trust_level = 5
+    
+    return {
+        'name': clean_optional(data.get('name')),
+        'role': clean_optional(data.get('role')),
+        'company': clean_optional(data.get('company')),
+        'department': clean_optional(data.get('department')),
+        'work_style': clean_optional(data.get('work_style')),
+        'email': clean_optional(data.get('email')),
+        'phone': clean_optional(data.get('phone')),
+        'birthday': clean_optional(data.get('birthday')),
+        'personal_notes': clean_optional(data.get('personal_notes')),
+        'sentiment': sentiment,
+        'influence': influence,
+        'interest': interest,
+        # Professional details
+        'job_title': clean_optional(data.get('job_title')),
+        'seniority_level': clean_optional(data.get('seniority_level')),
+        'years_experience': safe_int(data.get('years_experience')),
+        'specializations': joined_list(data.get('specializations')),
+        'decision_making_authority': clean_optional(data.get('decision_making_authority')),
+        'budget_authority': clean_optional(data.get('budget_authority')),
+        # Personal
+        'family_info': clean_optional(data.get('family_info')),
+        'hobbies': clean_optional(data.get('hobbies')),
+        'education': clean_optional(data.get('education')),
+        'career_history': clean_optional(data.get('career_history')),
+        # Geographic
+        'location': clean_optional(data.get('location')),
+        'timezone': clean_optional(data.get('timezone')),
+        'preferred_language': clean_optional(data.get('preferred_language')),
+        'cultural_background': clean_optional(data.get('cultural_background')),
+        # Communication
+        'preferred_communication_method': clean_optional(data.get('preferred_communication_method')),
+        'communication_frequency': clean_optional(data.get('communication_frequency')),
+        'best_contact_time': clean_optional(data.get('best_contact_time')),
+        'communication_style': clean_optional(data.get('communication_style')),
+        # Social
+        'linkedin_url': clean_optional(data.get('linkedin_url')),
+        'twitter_handle': clean_optional(data.get('twitter_handle')),
+        # Relationship
+        'trust_level': trust_level,
+        'strategic_value': clean_optional(data.get('strategic_value')),
+        'availability_status': clean_optional(data.get('availability_status')),
+        # Lists are stored comma-separated
+        'tags': joined_list(data.get('tags')),
+        'current_projects': joined_list(data.get('current_projects')),
+    }
+
 @stakeholders_bp.route('/stakeholders', methods=['GET'])
 @jwt_required()
+@cached_response('stakeholders')
 def get_stakeholders():
     try:
         # get_jwt_identity() returns a string, convert to int for database queries
@@ -29,9 +131,17 @@ def get_stakeholders():
         # Get query parameters for filtering
         sentiment = request.args.get('sentiment')
         company = request.args.get('company')
+        search = request.args.get('q')
+        limit, cursor = page_args()
+        
+        # Sparse fieldsets: ?view=summary|card|full or ?fields=name,company,...
+        try:
+            fields = Stakeholder.resolve_fields(request.args.get('view'), request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Build query
-        query = Stakeholder.query.filter_by(user_id=current_user_id)
+        # Build query, loading only the columns the response needs
+        query = Stakeholder.query.filter_by(user_id=current_user_id).options(*Stakeholder.load_options(fields))
         
         if sentiment:
             query = query.filter_by(sentiment=sentiment)
@@ -39,120 +149,100 @@ def get_stakeholders():
         if company:
             query = query.filter(Stakeholder.company.ilike(f'%{company}%'))
         
+        if search:
+            query = query.filter(search_filter('stakeholder', current_user_id, search))
+        
         # Order by name
-        stakeholders = query.order_by(Stakeholder.name).all()
+        stakeholders, next_cursor = paginate(query, [
+            SortKey(Stakeholder.name),
+            SortKey(Stakeholder.id),
+        ], limit, cursor)
         
         return jsonify({
-            'stakeholders': [stakeholder.to_dict() for stakeholder in stakeholders]
+            'stakeholders': [stakeholder.to_dict(fields) for stakeholder in stakeholders],
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get stakeholders', 'details': str(e)}), 500
 
-@stakeholders_bp.route('/stakeholders', methods=['POST'])
+@stakeholders_bp.route('/stakeholders/match', methods=['GET'])
 @jwt_required()
-def create_stakeholder():
+def match_stakeholder_candidates():
+    """Fuzzy (trigram) lookup by name, company and email.
+    
+    ?q= matches any of the three fields; ?name=&email=&company= instead
+    returns the stakeholders a new contact with those details would duplicate.
+    """
     try:
         # get_jwt_identity() returns a string, convert to int for database queries
         current_user_id = int(get_jwt_identity())
-        data = request.get_json()
         
-        # Validate required fields
-        if not data.get('name'):
-            return jsonify({'error': 'Name is required'}), 400
+        try:
+            limit = int(request.args.get('limit', DEFAULT_MATCH_LIMIT))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        query = clean_optional(request.args.get('q'))
+        name = clean_optional(request.args.get('name'))
+        email = clean_optional(request.args.get('email'))
+        if query:
+            matches = match_stakeholders(current_user_id, query, limit=limit)
+        elif name or email:
+            matches = find_duplicates(current_user_id, name=name, email=email,
+                                      company=clean_optional(request.args.get('company')), limit=limit)
+        else:
+            return jsonify({'error': 'Provide q, or name and/or email'}), 400
         
-        # Validate sentiment
-        valid_sentiments = ['positive', 'neutral', 'negative']
-        sentiment = data.get('sentiment', 'neutral')
-        if sentiment not in valid_sentiments:
-            return jsonify({'error': 'Sentiment must be positive, neutral, or negative'}), 400
+        return jsonify({
+            'matches': matches,
+            'count': len(matches),
+            'backend': match_backend()
+        }), 200
         
-        # Validate influence and interest
-        influence = data.get('influence', 5)
-        interest = data.get('interest', 5)
+    except Exception as e:
+        return jsonify({'error': 'Failed to match stakeholders', 'details': str(e)}), 500
+
+@stakeholders_bp.route('/stakeholders', methods=['POST'])
+@jwt_required()
+def create_stakeholder():
+    try:
+        # get_jwt_identity() returns a string, convert to int for database queries
+        current_user_id = int(get_jwt_identity())
+        data = request.get_json()
         
         try:
-            influence = int(influence)
-            interest = int(interest)
-            if not (1 <= influence <= 10) or not (1 <= interest <= 10):
-                raise ValueError()
-        except (ValueError, TypeError):
-            return jsonify({'error': 'Influence and interest must be integers between 1 and 10'}), 400
-        
-        # Helper for safe int conversion
-        def safe_int(val, default=None):
-            if val is None:
-                return default
-            try:
-                return int(val)
-            except (ValueError, TypeError):
-                return default
-
-        # Validate trust_level
-        trust_level = safe_int(data.get('trust_level'), 5)
-        if not (1 <= trust_level <= 10):
-            trust_level = 5
-
-        # Create stakeholder with all model fields
-        stakeholder = Stakeholder(
-            user_id=current_user_id,
-            name=clean_optional(data.get('name')),
-            role=clean_optional(data.get('role')),
-            company=clean_optional(data.get('company')),
-            department=clean_optional(data.get('department')),
-            work_style=clean_optional(data.get('work_style')),
-            email=clean_optional(data.get('email')),
-            phone=clean_optional(data.get('phone')),
-            birthday=clean_optional(data.get('birthday')),
-            personal_notes=clean_optional(data.get('personal_notes')),
-            sentiment=sentiment,
-            influence=influence,
-            interest=interest,
-            # Professional details
-            job_title=clean_optional(data.get('job_title')),
-            seniority_level=clean_optional(data.get('seniority_level')),
-            years_experience=safe_int(data.get('years_experience')),
-            specializations=clean_optional(data.get('specializations')) if isinstance(data.get('specializations'), str) else None,
-            decision_making_authority=clean_optional(data.get('decision_making_authority')),
-            budget_authority=clean_optional(data.get('budget_authority')),
-            # Personal
-            family_info=clean_optional(data.get('family_info')),
-            hobbies=clean_optional(data.get('hobbies')),
-            education=clean_optional(data.get('education')),
-            career_history=clean_optional(data.get('career_history')),
-            # Geographic
-            location=clean_optional(data.get('location')),
-            timezone=clean_optional(data.get('timezone')),
-            preferred_language=clean_optional(data.get('preferred_language')),
-            cultural_background=clean_optional(data.get('cultural_background')),
-            # Communication
-            preferred_communication_method=clean_optional(data.get('preferred_communication_method')),
-            communication_frequency=clean_optional(data.get('communication_frequency')),
-            best_contact_time=clean_optional(data.get('best_contact_time')),
-            communication_style=clean_optional(data.get('communication_style')),
-            # Social
-            linkedin_url=clean_optional(data.get('linkedin_url')),
-            twitter_handle=clean_optional(data.get('twitter_handle')),
-            # Relationship
-            trust_level=trust_level,
-            strategic_value=clean_optional(data.get('strategic_value')),
-            availability_status=clean_optional(data.get('availability_status')),
-        )
-        
-        # Handle tags
-        tags = data.get('tags', [])
-        if isinstance(tags, list):
-            stakeholder.set_tags_list(tags)
-
-        # Handle specializations as list
-        specializations = data.get('specializations')
-        if isinstance(specializations, list):
-            stakeholder.set_specializations_list(specializations)
-
-        # Handle current_projects
-        projects = data.get('current_projects')
-        if isinstance(projects, list):
-            stakeholder.set_current_projects_list(projects)
+            values = stakeholder_values(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Merge into an existing stakeholder instead of creating a new one
+        if data.get('merge_into'):
+            existing = Stakeholder.query.filter_by(id=data.get('merge_into'), user_id=current_user_id).first()
+            if not existing:
+                return jsonify({'error': 'Stakeholder to merge into not found'}), 404
+            merged_fields = existing.merge_missing(values)
+            db.session.commit()
+            return jsonify({
+                'message': 'Stakeholder merged successfully',
+                'stakeholder': existing.to_dict(),
+                'merged_fields': merged_fields
+            }), 200
+        
+        # Offer a merge when this looks like someone who already exists
+        if not data.get('allow_duplicate'):
+            duplicates = find_duplicates(current_user_id, name=values['name'],
+                                         email=values['email'], company=values['company'])
+            if duplicates:
+                return jsonify({
+                    'error': 'A similar stakeholder already exists',
+                    'duplicates': duplicates,
+                    'hint': 'Resend with merge_into=<id> to merge, or allow_duplicate=true to create anyway'
+                }), 409
+        
+        stakeholder = Stakeholder(user_id=current_user_id, **values)
         
         db.session.add(stakeholder)
         db.session.commit()
@@ -172,15 +262,20 @@ def get_stakeholder(stakeholder_id):
     try:
         # get_jwt_identity() returns a string, convert to int for database queries
         current_user_id = int(get_jwt_identity())
+        try:
+            fields = Stakeholder.resolve_fields(request.args.get('view'), request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         stakeholder = Stakeholder.query.filter_by(
             id=stakeholder_id, 
             user_id=current_user_id
-        ).first()
+        ).options(*Stakeholder.load_options(fields)).first()
         
         if not stakeholder:
             return jsonify({'error': 'Stakeholder not found'}), 404
         
-        return jsonify({'stakeholder': stakeholder.to_dict()}), 200
+        return jsonify({'stakeholder': stakeholder.to_dict(fields)}), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to get stakeholder', 'details': str(e)}), 500
@@ -3,12 +3,41 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db
 from src.models.task import Task
 from src.models.stakeholder import Stakeholder
-from datetime import datetime, timedelta
+from src.pagination import InvalidCursor, SortKey, page_args, paginate, priority_rank
+from src.ranking import apply_moves, rank_for_position
+from src.response_cache import cached_response
+from sqlalchemy import update
+from datetime import datetime
 
 tasks_bp = Blueprint('tasks', __name__)
 
+# Kanban column -> task status, shared by single and batch moves
+COLUMN_STATUS_MAPPING = {
+    'todo': 'todo',
+    'in_progress': 'in_progress',
+    'review': 'waiting',
+    'done': 'done'
+}
+
+VALID_PRIORITIES = ['low', 'medium', 'high']
+
+# Upper bound on operations per batch request
+MAX_BATCH_MOVES = 500
+
+
+def apply_column_change(task, old_column, new_column):
+    """Update status and completion after a task changes Kanban column"""
+    task.board_column = new_column
+    if new_column in COLUMN_STATUS_MAPPING:
+        task.status = COLUMN_STATUS_MAPPING[new_column]
+        if new_column == 'done':
+            task.completed = True
+        elif old_column == 'done':
+            task.completed = False
+
 @tasks_bp.route('/tasks', methods=['GET'])
 @jwt_required()
+@cached_response('tasks')
 def get_tasks():
     try:
         # Log token validation success
@@ -18,27 +47,11 @@ def get_tasks():
         current_user_id = int(current_user_id_str) if current_user_id_str else None
         logging.info(f"✅ Token validated successfully for user {current_user_id}")
         
-        # Auto-cleanup: delete tasks in "done" column for more than 1 day
-        try:
-            cutoff = datetime.utcnow() - timedelta(days=1)
-            stale_done_tasks = Task.query.filter(
-                Task.user_id == current_user_id,
-                Task.board_column == 'done',
-                Task.updated_at < cutoff
-            ).all()
-            if stale_done_tasks:
-                for t in stale_done_tasks:
-                    db.session.delete(t)
-                db.session.commit()
-                logging.info(f"Auto-cleaned {len(stale_done_tasks)} done task(s) for user {current_user_id}")
-        except Exception as cleanup_err:
-            logging.warning(f"Done task cleanup failed: {cleanup_err}")
-            db.session.rollback()
-        
         # Get query parameters for filtering
         completed = request.args.get('completed')
         priority = request.args.get('priority')
         due_date = request.args.get('due_date')
+        limit, cursor = page_args()
         
         # Build query
         query = Task.query.filter_by(user_id=current_user_id)
@@ -53,15 +66,20 @@ def get_tasks():
         if due_date:
             query = query.filter_by(due_date=due_date)
         
-        # Order by priority and creation date
-        priority_order = {'high': 1, 'medium': 2, 'low': 3}
-        tasks = query.all()
-        tasks.sort(key=lambda x: (priority_order.get(x.priority, 4), x.created_at))
+        # Order by priority and creation date (in SQL, one page at a time)
+        tasks, next_cursor = paginate(query, [
+            SortKey(priority_rank(Task.priority)),
+            SortKey(Task.created_at),
+            SortKey(Task.id),
+        ], limit, cursor)
         
         return jsonify({
-            'tasks': [task.to_dict() for task in tasks]
+            'tasks': [task.to_dict() for task in tasks],
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to get tasks', 'details': str(e)}), 500
 
@@ -78,9 +96,8 @@ def create_task():
             return jsonify({'error': 'Title is required'}), 400
         
         # Validate priority
-        valid_priorities = ['low', 'medium', 'high']
         priority = data.get('priority', 'medium')
-        if priority not in valid_priorities:
+        if priority not in VALID_PRIORITIES:
             return jsonify({'error': 'Priority must be low, medium, or high'}), 400
         
         # Validate stakeholder if provided
@@ -93,6 +110,12 @@ def create_task():
             if not stakeholder:
                 return jsonify({'error': 'Stakeholder not found'}), 404
         
+        # Explicit position: slot the card in; otherwise it is appended on insert
+        board_column = data.get('board_column', 'todo')
+        board_rank = None
+        if data.get('board_position') is not None:
+            board_rank = rank_for_position(Task, current_user_id, board_column, data['board_position'])
+        
         # Create task
         task = Task(
             user_id=current_user_id,
@@ -101,8 +124,9 @@ def create_task():
             due_date=data.get('due_date'),
             priority=priority,
             stakeholder_id=stakeholder_id,
-            board_column=data.get('board_column', 'todo'),
+            board_column=board_column,
             board_position=data.get('board_position', 0),
+            board_rank=board_rank,
             status=data.get('status', 'todo')
         )
         
@@ -160,8 +184,7 @@ def update_task(task_id):
             task.due_date = data['due_date']
         
         if 'priority' in data:
-            valid_priorities = ['low', 'medium', 'high']
-            if data['priority'] not in valid_priorities:
+            if data['priority'] not in VALID_PRIORITIES:
                 return jsonify({'error': 'Priority must be low, medium, or high'}), 400
             task.priority = data['priority']
         
@@ -213,75 +236,20 @@ def move_task(task_id):
             return jsonify({'error': 'Missing board_column'}), 400
         
         # Ensure task has board_column set (for tasks created before board_column was added)
-        if not hasattr(task, 'board_column') or not task.board_column:
+        if not task.board_column:
             task.board_column = 'todo'
-        if not hasattr(task, 'board_position') or task.board_position is None:
-            task.board_position = 0
         
         old_column = task.board_column
-        old_position = task.board_position
         
-        # If moving to a different column
+        # Place the card between its new neighbours: only this row is written
+        if new_column != old_column or new_position is not None:
+            task.board_rank = rank_for_position(
+                Task, current_user_id, new_column, new_position, exclude_id=task.id
+            )
+        
+        # If moving to a different column, update status based on column
         if new_column != old_column:
-            # Update positions in old column (shift up)
-            Task.query.filter(
-                Task.user_id == current_user_id,
-                Task.board_column == old_column,
-                Task.board_position > old_position
-            ).update({
-                Task.board_position: Task.board_position - 1
-            }, synchronize_session=False)
-            
-            # Get max position in new column
-            from sqlalchemy import func
-            max_position = db.session.query(func.max(Task.board_position)).filter_by(
-                user_id=current_user_id,
-                board_column=new_column
-            ).scalar() or 0
-            
-            # Set new position
-            task.board_column = new_column
-            task.board_position = new_position if new_position is not None else max_position + 1
-            
-            # Update status based on column
-            column_status_mapping = {
-                'todo': 'todo',
-                'in_progress': 'in_progress',
-                'review': 'waiting',
-                'done': 'done'
-            }
-            if new_column in column_status_mapping:
-                if hasattr(task, 'status'):
-                    task.status = column_status_mapping[new_column]
-                if new_column == 'done':
-                    task.completed = True
-                elif old_column == 'done':
-                    task.completed = False
-        
-        # If moving within the same column
-        elif new_position is not None and new_position != old_position:
-            if new_position > old_position:
-                # Moving down: shift tasks up
-                Task.query.filter(
-                    Task.user_id == current_user_id,
-                    Task.board_column == old_column,
-                    Task.board_position > old_position,
-                    Task.board_position <= new_position
-                ).update({
-                    Task.board_position: Task.board_position - 1
-                }, synchronize_session=False)
-            else:
-                # Moving up: shift tasks down
-                Task.query.filter(
-                    Task.user_id == current_user_id,
-                    Task.board_column == old_column,
-                    Task.board_position >= new_position,
-                    Task.board_position < old_position
-                ).update({
-                    Task.board_position: Task.board_position + 1
-                }, synchronize_session=False)
-            
-            task.board_position = new_position
+            apply_column_change(task, old_column, new_column)
         
         task.updated_at = datetime.utcnow()
         db.session.commit()
@@ -295,6 +263,88 @@ def move_task(task_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to move task', 'details': str(e)}), 500
 
+@tasks_bp.route('/tasks/board/batch', methods=['POST'])
+@jwt_required()
+def batch_move_tasks():
+    """Apply an ordered list of Kanban moves in one transaction and return the board"""
+    try:
+        # get_jwt_identity() returns a string, convert to int for database queries
+        current_user_id = int(get_jwt_identity())
+        data = request.get_json() or {}
+        operations = data.get('operations')
+        
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'operations must be a non-empty list'}), 400
+        if len(operations) > MAX_BATCH_MOVES:
+            return jsonify({'error': f'At most {MAX_BATCH_MOVES} operations per batch'}), 400
+        
+        moves = []
+        for index, op in enumerate(operations):
+            if not isinstance(op, dict):
+                return jsonify({'error': f'Operation {index} must be an object'}), 400
+            task_id, column, position = op.get('task_id'), op.get('board_column'), op.get('position')
+            if not isinstance(task_id, int) or not column or not isinstance(column, str):
+                return jsonify({'error': f'Operation {index} needs an integer task_id and a board_column'}), 400
+            if position is not None and (not isinstance(position, int) or position < 0):
+                return jsonify({'error': f'Operation {index} has an invalid position'}), 400
+            moves.append((task_id, column, position))
+        
+        # Ownership of every task, in one query
+        task_ids = {task_id for task_id, _, _ in moves}
+        tasks = {
+            task.id: task
+            for task in Task.query.filter(Task.user_id == current_user_id, Task.id.in_(task_ids)).all()
+        }
+        missing = sorted(task_ids - tasks.keys())
+        if missing:
+            return jsonify({'error': 'Task not found', 'task_ids': missing}), 404
+        
+        # Current order of every column touched, as (id, rank) pairs
+        for task in tasks.values():
+            if not task.board_column:
+                task.board_column = 'todo'
+        original_columns = {task.id: task.board_column for task in tasks.values()}
+        touched = set(original_columns.values()) | {column for _, column, _ in moves}
+        columns = {column: [] for column in touched}
+        for task_id, column, rank in db.session.query(Task.id, Task.board_column, Task.board_rank).filter(
+            Task.user_id == current_user_id,
+            Task.board_column.in_(touched)
+        ).order_by(Task.board_column, Task.board_rank, Task.id):
+            columns[column].append((task_id, rank))
+        
+        # Compute new keys in memory, then write only the rows that changed
+        changed = apply_moves(columns, moves)
+        now = datetime.utcnow()
+        for task_id, task in tasks.items():
+            column, rank = changed[task_id]
+            task.board_rank = rank
+            if column != original_columns[task_id]:
+                apply_column_change(task, original_columns[task_id], column)
+            task.updated_at = now
+        respread = [
+            {'id': task_id, 'board_rank': rank}
+            for task_id, (_, rank) in changed.items()
+            if task_id not in tasks
+        ]
+        if respread:
+            db.session.execute(update(Task), respread)
+        db.session.commit()
+        
+        board = {}
+        for task in Task.query.filter_by(user_id=current_user_id).order_by(
+            Task.board_column, Task.board_rank, Task.id
+        ):
+            board.setdefault(task.board_column or 'todo', []).append(task.to_dict())
+        
+        return jsonify({
+            'message': f'{len(moves)} move(s) applied',
+            'board': board
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to move tasks', 'details': str(e)}), 500
+
 @tasks_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 @jwt_required()
 def delete_task(task_id):
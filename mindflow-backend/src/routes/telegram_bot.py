@@ -333,6 +333,14 @@ def process_callback(chat_id, callback_data, message_id, token):
                 send_message(token, chat_id, "⚠️ Please link your account first.")
         return
     
+    if callback_data.startswith('merge_stakeholder:'):
+        target = callback_data.split(':')[1]
+        state = get_user_state(chat_id)
+        if state['state'] == 'awaiting_stakeholder_merge' and user_id:
+            clear_user_state(chat_id)
+            _finalize_stakeholder_merge(chat_id, user_id, state['data']['stakeholder'], target, token)
+        return
+    
     if callback_data.startswith('priority:'):
         priority = callback_data.split(':')[1]
         state = get_user_state(chat_id)
@@ -347,14 +355,13 @@ def process_callback(chat_id, callback_data, message_id, token):
 def _create_task_from_text(chat_id, user_id, text, token):
     """Use AI to parse text and create a task with comprehensive extraction"""
     try:
-        from src.routes.ai_assistant import get_client, _exec_create_task
+        from src.routes.ai_assistant import _get_provider, _exec_create_task
         
         today = datetime.utcnow().strftime('%Y-%m-%d')
-        client = get_client()
-        if client:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+        provider = _get_provider(user_id)
+        if provider.is_available():
+            response = provider.chat_completion(
+                [
                     {"role": "system", "content": (
                         "You are a task extraction assistant. Extract structured task data from natural language "
                         "or voice-transcribed text. Handle speech-to-text errors gracefully. Return ONLY valid JSON."
@@ -374,9 +381,10 @@ def _create_task_from_text(chat_id, user_id, text, token):
                 ],
                 response_format={"type": "json_object"},
                 temperature=0.2,
-                max_tokens=400
+                max_tokens=400,
+                cache_site="extract",
             )
-            td = json.loads(response.choices[0].message.content)
+            td = json.loads(response.content or '{}')
         else:
             td = {"title": text, "priority": "medium"}
         
@@ -437,10 +445,10 @@ def _create_note_from_text(chat_id, user_id, text, token):
 def _create_stakeholder_from_text(chat_id, user_id, text, token):
     """Use AI to parse text and create a stakeholder with comprehensive field extraction"""
     try:
-        from src.routes.ai_assistant import get_client, _exec_create_stakeholder
+        from src.routes.ai_assistant import _get_provider, _exec_create_stakeholder
         
-        client = get_client()
-        if client:
+        provider = _get_provider(user_id)
+        if provider.is_available():
             system_prompt = (
                 "You are an AI extraction system for a CRM/stakeholder management tool. "
                 "Extract ALL possible information about a person from natural language or voice-transcribed text. "
@@ -469,17 +477,17 @@ def _create_stakeholder_from_text(chat_id, user_id, text, token):
                 f"trust_level (1-10), strategic_value (low|medium|high|critical), tags (comma-separated)\n\n"
                 f"Text: \"{text}\"\n\nReturn ONLY valid JSON."
             )
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            response = provider.chat_completion(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": extraction_prompt}
                 ],
                 response_format={"type": "json_object"},
                 temperature=0.2,
-                max_tokens=600
+                max_tokens=600,
+                cache_site="extract",
             )
-            d = json.loads(response.choices[0].message.content)
+            d = json.loads(response.content or '{}')
             logger.info(f"AI stakeholder extraction result: {json.dumps(d)[:500]}")
         else:
             words = text.split()
@@ -548,6 +556,20 @@ def _create_stakeholder_from_text(chat_id, user_id, text, token):
         
         result = _exec_create_stakeholder(user_id, stakeholder_data)
         
+        if result.get('duplicate'):
+            # Offer to merge into the existing contact instead of adding a second one
+            set_user_state(chat_id, 'awaiting_stakeholder_merge', {'stakeholder': stakeholder_data})
+            msg = f"\ud83e\udd14 *{stakeholder_data['name']}* looks like a contact you already have:\n\n"
+            buttons = []
+            for d in result['duplicates']:
+                label = d['name'] + (f" ({d['company']})" if d.get('company') else "")
+                msg += f"\u2022 {label}\n"
+                buttons.append([{"text": f"\ud83d\udd17 Merge into {label}", "callback_data": f"merge_stakeholder:{d['id']}"}])
+            buttons.append([{"text": "\u2795 Add as new contact", "callback_data": "merge_stakeholder:new"}])
+            buttons.append([{"text": "\u274c Cancel", "callback_data": "cancel"}])
+            send_message(token, chat_id, msg, {"inline_keyboard": buttons})
+            return
+        
         if result['success']:
             s = result['stakeholder']
             msg = f"\u2705 *Contact added!*\n\n\ud83d\udc64 *{s['name']}*\n"
@@ -567,36 +589,63 @@ def _create_stakeholder_from_text(chat_id, user_id, text, token):
         send_message(token, chat_id, f"\u274c Error adding contact: {str(e)}")
 
 
+def _finalize_stakeholder_merge(chat_id, user_id, stakeholder_data, target, token):
+    """Merge parsed contact details into an existing stakeholder, or add them as a new one"""
+    try:
+        from src.routes.ai_assistant import _exec_create_stakeholder
+        from src.models.stakeholder import Stakeholder
+        from src.models.user import db
+        
+        if target == 'new':
+            result = _exec_create_stakeholder(user_id, dict(stakeholder_data, allow_duplicate=True))
+            if result['success']:
+                send_message(token, chat_id, f"\u2705 *Contact added:* {result['stakeholder']['name']}", main_menu_keyboard())
+            else:
+                send_message(token, chat_id, f"\u274c Failed to add contact: {result.get('message')}")
+            return
+        
+        s = Stakeholder.query.filter_by(id=int(target), user_id=user_id).first()
+        if not s:
+            send_message(token, chat_id, "\u274c That contact no longer exists.", main_menu_keyboard())
+            return
+        merged = s.merge_missing(stakeholder_data)
+        db.session.commit()
+        msg = f"\ud83d\udd17 *Merged into {s.name}*\n"
+        msg += f"Updated: {', '.join(merged)}" if merged else "Nothing new to add."
+        send_message(token, chat_id, msg, main_menu_keyboard())
+    except Exception as e:
+        logger.error(f"Stakeholder merge error: {e}")
+        send_message(token, chat_id, f"\u274c Error merging contact: {str(e)}")
+
+
 def _send_status(chat_id, user_id, token):
     """Send dashboard status"""
     try:
-        from src.routes.ai_assistant import _exec_list_tasks, _exec_list_stakeholders, _exec_list_notes
-        
-        tasks = _exec_list_tasks(user_id, {"status": "all"})
-        stakeholders = _exec_list_stakeholders(user_id, {})
-        notes = _exec_list_notes(user_id, {})
+        from src.services.insights import get_insight_snapshot
         
-        task_list = tasks.get('tasks', [])
-        total = len(task_list)
-        done = len([t for t in task_list if t.get('status') == 'done'])
-        overdue_count = len([t for t in task_list if t.get('due_date') and t['due_date'] < datetime.utcnow().strftime('%Y-%m-%d') and t.get('status') != 'done'])
+        # Counts and the five tasks shown come from the cached insight snapshot
+        snapshot = get_insight_snapshot(user_id)
+        tasks_summary = snapshot['data']['tasks_summary']
+        total, done, overdue_count = tasks_summary['total'], tasks_summary['completed'], tasks_summary['overdue_count']
+        stakeholder_count = snapshot['data']['stakeholders_summary']['total']
+        note_count = snapshot['data']['notes_summary']['total']
         
         msg = (
             f"📊 *MindFlow Status*\n\n"
             f"📝 *Tasks:* {total} total, {done} completed\n"
             f"{'⚠️ ' + str(overdue_count) + ' overdue!' if overdue_count > 0 else '✅ All on track!'}\n\n"
-            f"👥 *Contacts:* {stakeholders.get('count', 0)}\n"
-            f"📒 *Notes:* {notes.get('count', 0)}\n\n"
+            f"👥 *Contacts:* {stakeholder_count}\n"
+            f"📒 *Notes:* {note_count}\n\n"
         )
         
         # Show pending tasks
-        pending = [t for t in task_list if t.get('status') != 'done'][:5]
+        pending = snapshot['pending_tasks']
         if pending:
             msg += "*Upcoming tasks:*\n"
             for t in pending:
-                priority_emoji = {'urgent': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '🟢'}.get(t.get('priority', 'medium'), '⚪')
+                priority_emoji = {'urgent': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '🟢'}.get(t['priority'] or 'medium', '⚪')
                 msg += f"{priority_emoji} {t['title']}"
-                if t.get('due_date'):
+                if t['due_date']:
                     msg += f" (due: {t['due_date']})"
                 msg += "\n"
         
@@ -609,24 +658,23 @@ def _send_status(chat_id, user_id, token):
 def _send_insights(chat_id, user_id, token):
     """Send AI-powered insights"""
     try:
-        from src.routes.ai_assistant import get_client, _exec_generate_insights
+        from src.routes.ai_assistant import _get_provider, _exec_generate_insights
         
         result = _exec_generate_insights(user_id, {"focus": "general"})
         data = result.get('data', {})
         
-        client = get_client()
-        if client:
+        provider = _get_provider(user_id)
+        if provider.is_available():
             # Use AI to generate natural language insights
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            response = provider.chat_completion(
+                [
                     {"role": "system", "content": "You are a productivity coach. Analyze this data and provide 3-5 brief, actionable insights. Use emoji. Be encouraging but honest. Keep it under 500 characters."},
                     {"role": "user", "content": f"User productivity data: {json.dumps(data, default=str)}"}
                 ],
                 temperature=0.7,
                 max_tokens=300
             )
-            insights_text = response.choices[0].message.content
+            insights_text = response.content
         else:
             ts = data.get('tasks_summary', {})
             insights_text = (
@@ -646,20 +694,19 @@ def _send_insights(chat_id, user_id, token):
 def _ask_ai(chat_id, user_id, question, token):
     """Forward question to AI assistant"""
     try:
-        from src.routes.ai_assistant import get_client, _exec_generate_insights
+        from src.routes.ai_assistant import _get_provider, _exec_generate_insights
         
         # Gather context
         insights = _exec_generate_insights(user_id, {"focus": "general"})
         data = insights.get('data', {})
         
-        client = get_client()
-        if not client:
+        provider = _get_provider(user_id)
+        if not provider.is_available():
             send_message(token, chat_id, "❌ AI service not available.")
             return
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        response = provider.chat_completion(
+            [
                 {"role": "system", "content": f"You are OpenClaw, the MindFlow AI assistant. Answer the user's question based on their productivity data. Be concise (max 500 chars). Use emoji. Data: {json.dumps(data, default=str)}"},
                 {"role": "user", "content": question}
             ],
@@ -667,7 +714,7 @@ def _ask_ai(chat_id, user_id, question, token):
             max_tokens=300
         )
         
-        answer = response.choices[0].message.content
+        answer = response.content
         send_message(token, chat_id, f"🧠 *OpenClaw:*\n\n{answer}", main_menu_keyboard())
     except Exception as e:
         logger.error(f"AI ask error: {e}")
@@ -677,26 +724,27 @@ def _ask_ai(chat_id, user_id, question, token):
 def _smart_process(chat_id, user_id, text, token):
     """Use AI to classify and process free-form text"""
     try:
-        from src.routes.ai_assistant import get_client
+        from src.routes.ai_assistant import _get_provider
         
-        client = get_client()
-        if not client:
+        provider = _get_provider(user_id)
+        if not provider.is_available():
             # Fallback: save as note
             _create_note_from_text(chat_id, user_id, text, token)
             return
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        # Retried webhooks and repeated texts are answered from the LLM cache
+        response = provider.chat_completion(
+            [
                 {"role": "system", "content": 'Classify this text as "task", "stakeholder", "note", or "question". Return JSON: {"type": "...", "confidence": 0.0-1.0}'},
                 {"role": "user", "content": text}
             ],
             response_format={"type": "json_object"},
             temperature=0.3,
-            max_tokens=50
+            max_tokens=50,
+            cache_site="classify",
         )
         
-        classification = json.loads(response.choices[0].message.content)
+        classification = json.loads(response.content or '{}')
         content_type = classification.get('type', 'note')
         
         if content_type == 'task':
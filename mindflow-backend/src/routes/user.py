@@ -1,12 +1,17 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
+from src.pagination import InvalidCursor, SortKey, page_args, paginate
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    try:
+        limit, cursor = page_args()
+        users, next_cursor = paginate(User.query, [SortKey(User.id)], limit, cursor)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'users': [user.to_dict() for user in users], 'next_cursor': next_cursor})
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
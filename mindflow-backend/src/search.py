@@ -0,0 +1,363 @@
+"""
+Full-text search across tasks, notes, stakeholders and interactions.
+
+Three backends, picked per database:
+
+- ``postgresql``: each searchable table has a generated, stored
+  ``search_vector`` tsvector column (title weighted ``A``, body ``B``) with
+  a GIN index.  PostgreSQL keeps the column current on every write.
+- ``fts5``: SQLite (desktop mode) gets one FTS5 virtual table,
+  ``search_index``, fed by ``AFTER INSERT/UPDATE/DELETE`` triggers.  The FTS
+  rowid encodes ``(doc_type, id)`` so triggers update a single row.
+- ``like``: plain ``ILIKE`` when neither is installed (e.g. a database
+  created with ``db.create_all()`` only).  Correct, but unindexed.
+
+Migration 7 (``add_search_indexes``) installs the first two via
+``install_search_index``.  Queries are reduced to word tokens and matched
+as prefixes, so ``"proj alp"`` finds "Project Alpha".
+
+Usage::
+
+    from src.search import search, search_filter
+
+    results = search(user_id, "quarterly review", types=["note"], limit=20)
+    query = Note.query.filter(Note.user_id == user_id, search_filter("note", user_id, "review"))
+"""
+from __future__ import annotations
+
+import html
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, and_, func, inspect, literal, literal_column, or_, select, text, union_all
+from sqlalchemy.exc import OperationalError
+
+from src.models.db import db
+from src.models.note import Note
+from src.models.stakeholder import Stakeholder
+from src.models.stakeholder_relationship import StakeholderInteraction
+from src.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Words of a query that are used; the rest is ignored
+MAX_TERMS = 8
+# PostgreSQL text search configuration; 'simple' does not stem, so names and
+# mixed-language content match as typed
+TS_CONFIG = "simple"
+FTS_TABLE = "search_index"
+
+# Highlight markers used inside SQL, turned into <mark> after HTML escaping
+_START, _STOP = "\x02", "\x03"
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    """How one model is indexed."""
+    doc_type: str
+    model: type
+    title: str
+    body: Tuple[str, ...]
+    code: int  # Low bits of the FTS rowid, unique per doc_type
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+    def title_column(self):
+        return getattr(self.model, self.title)
+
+    def body_columns(self):
+        return [getattr(self.model, name) for name in self.body]
+
+
+DOCUMENTS: Dict[str, SearchDocument] = {
+    doc.doc_type: doc
+    for doc in (
+        SearchDocument("task", Task, "title", ("description",), 1),
+        SearchDocument("note", Note, "title", ("content",), 2),
+        SearchDocument("stakeholder", Stakeholder, "name",
+                       ("company", "role", "job_title", "department", "email", "tags", "personal_notes"), 3),
+        SearchDocument("interaction", StakeholderInteraction, "title",
+                       ("description", "outcome", "attendees", "tags"), 4),
+    )
+}
+_CODE_BITS = 3  # rowid = id << 3 | code
+
+
+class InvalidSearch(ValueError):
+    """Raised when a query has no searchable words or names an unknown type."""
+
+
+def query_terms(query: str) -> List[str]:
+    """Lower-cased word tokens of ``query`` (at most ``MAX_TERMS``)."""
+    return [term.lower() for term in re.findall(r"\w+", query or "", re.UNICODE)][:MAX_TERMS]
+
+
+def _fts_query(terms: Sequence[str]) -> str:
+    # Tokens are \w+ only, so quoting cannot be broken out of
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _ts_query(terms: Sequence[str]) -> str:
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+# ------------------------------------------------------------------
+# Backend detection
+# ------------------------------------------------------------------
+
+# Seconds before a ``like`` result is detected again: migration 7 may run
+# in another worker after this one first searched
+LIKE_RECHECK_SECONDS = 30
+
+_backends: Dict[str, Tuple[str, float]] = {}
+
+
+def search_backend(engine=None) -> str:
+    """``'postgresql'``, ``'fts5'`` or ``'like'`` for ``engine`` (indexed backends cached for good)."""
+    engine = engine or db.engine
+    key = engine.url.render_as_string(hide_password=True)
+    cached = _backends.get(key)
+    if cached is None or (cached[0] == "like" and cached[1] <= time.monotonic()):
+        backend = _detect_backend(engine)
+        _backends[key] = (backend, time.monotonic() + LIKE_RECHECK_SECONDS)
+        cached = _backends[key]
+    return cached[0]
+
+
+def _detect_backend(engine) -> str:
+    try:
+        with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                columns = {col["name"] for col in inspect(conn).get_columns(Note.__tablename__)}
+                return "postgresql" if "search_vector" in columns else "like"
+            if conn.dialect.name == "sqlite" and FTS_TABLE in inspect(conn).get_table_names():
+                return "fts5"
+    except Exception as exc:
+        logger.warning("Search backend detection failed, using LIKE: %s", exc)
+    return "like"
+
+
+def reset_backend_cache() -> None:
+    _backends.clear()
+
+
+# ------------------------------------------------------------------
+# Index installation (called by migration 7)
+# ------------------------------------------------------------------
+
+def _concat_sql(columns: Sequence[str], prefix: str = "") -> str:
+    return " || ' ' || ".join(f"coalesce({prefix}{name}, '')" for name in columns)
+
+
+def install_search_index(conn) -> Optional[str]:
+    """Create the search columns/indexes or FTS table and triggers. Returns the backend."""
+    existing = set(inspect(conn).get_table_names())
+    documents = [doc for doc in DOCUMENTS.values() if doc.table in existing]
+
+    if conn.dialect.name == "postgresql":
+        for doc in documents:
+            quoted = conn.dialect.identifier_preparer.quote(doc.table)
+            vector = (
+                f"setweight(to_tsvector('{TS_CONFIG}', coalesce({doc.title}, '')), 'A') || "
+                f"setweight(to_tsvector('{TS_CONFIG}', {_concat_sql(doc.body)}), 'B')"
+            )
+            conn.execute(text(
+                f"ALTER TABLE {quoted} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{doc.table}_search ON {quoted} USING GIN (search_vector)"
+            ))
+        return "postgresql"
+
+    if conn.dialect.name != "sqlite":
+        return None
+    try:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, body, doc_type UNINDEXED, doc_id UNINDEXED, user_id UNINDEXED, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+    except OperationalError as exc:
+        logger.warning("SQLite has no FTS5, search falls back to LIKE: %s", exc)
+        return None
+
+    for doc in documents:
+        quoted = conn.dialect.identifier_preparer.quote(doc.table)
+
+        def row(prefix):
+            return (
+                f"({prefix}id << {_CODE_BITS}) | {doc.code}, coalesce({prefix}{doc.title}, ''), "
+                f"{_concat_sql(doc.body, prefix)}, '{doc.doc_type}', {prefix}id, {prefix}user_id"
+            )
+
+        columns = "rowid, title, body, doc_type, doc_id, user_id"
+        delete_old = f"DELETE FROM {FTS_TABLE} WHERE rowid = (OLD.id << {_CODE_BITS}) | {doc.code};"
+        insert_new = f"INSERT INTO {FTS_TABLE}({columns}) VALUES ({row('NEW.')});"
+        for event, body in (
+            ("INSERT", insert_new),
+            ("UPDATE", delete_old + " " + insert_new),
+            ("DELETE", delete_old),
+        ):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {doc.table}_search_{event.lower()}"))
+            conn.execute(text(
+                f"CREATE TRIGGER {doc.table}_search_{event.lower()} AFTER {event} ON {quoted} "
+                f"BEGIN {body} END"
+            ))
+        # Backfill rows written before the triggers existed
+        conn.execute(text(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN "
+            f"(SELECT (id << {_CODE_BITS}) | {doc.code} FROM {quoted})"
+        ))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({columns}) SELECT {row('')} FROM {quoted}"))
+    return "fts5"
+
+
+# ------------------------------------------------------------------
+# Filtering model queries
+# ------------------------------------------------------------------
+
+def search_filter(doc_type: str, user_id: int, query: str):
+    """
+    Predicate restricting a query on ``doc_type``'s model to rows matching ``query``.
+
+    Lets list endpoints keep their own ordering and pagination while the
+    matching itself is served by the full-text index.
+    """
+    doc = DOCUMENTS[doc_type]
+    terms = query_terms(query)
+    if not terms:
+        return literal(True)
+    backend = search_backend()
+    if backend == "postgresql":
+        return literal_column(f"{doc.table}.search_vector").op("@@")(func.to_tsquery(TS_CONFIG, _ts_query(terms)))
+    if backend == "fts5":
+        matches = text(
+            f"SELECT doc_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query "
+            "AND doc_type = :fts_type AND user_id = :fts_user"
+        ).bindparams(fts_query=_fts_query(terms), fts_type=doc_type, fts_user=int(user_id))
+        return doc.model.id.in_(matches.columns(doc_id=Integer))
+    return _like_filter(doc, terms)
+
+
+def _like_filter(doc: SearchDocument, terms: Sequence[str]):
+    columns = [doc.title_column(), *doc.body_columns()]
+    return and_(*(or_(*(column.ilike(f"%{term}%") for column in columns)) for term in terms))
+
+
+# ------------------------------------------------------------------
+# Ranked, highlighted search
+# ------------------------------------------------------------------
+
+def _highlight(value: Optional[str]) -> str:
+    escaped = html.escape((value or "").strip())
+    return escaped.replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def _result(doc_type, doc_id, score, title, snippet) -> dict:
+    return {
+        "type": doc_type,
+        "id": doc_id,
+        "score": round(float(score or 0), 6),
+        "title": _highlight(title),
+        "snippet": _highlight(snippet),
+    }
+
+
+def search(user_id: int, query: str, types: Optional[Sequence[str]] = None, limit: int = DEFAULT_LIMIT) -> List[dict]:
+    """
+    Best matches for ``query`` among ``user_id``'s documents, best first.
+
+    Each result has ``type``, ``id``, ``score`` (higher is better) and an
+    HTML-escaped ``title``/``snippet`` with matches wrapped in ``<mark>``.
+    Raises InvalidSearch for an empty query or an unknown type.
+    """
+    terms = query_terms(query)
+    if not terms:
+        raise InvalidSearch("Search query has no words")
+    unknown = set(types or ()) - DOCUMENTS.keys()
+    if unknown:
+        raise InvalidSearch(f"Unknown search type(s): {', '.join(sorted(unknown))}")
+    documents = [DOCUMENTS[name] for name in (types or DOCUMENTS)]
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    user_id = int(user_id)
+
+    backend = search_backend()
+    if backend == "postgresql":
+        return _search_postgresql(user_id, terms, documents, limit)
+    if backend == "fts5":
+        return _search_fts5(user_id, terms, documents, limit)
+    return _search_like(user_id, terms, documents, limit)
+
+
+def _search_fts5(user_id, terms, documents, limit) -> List[dict]:
+    type_params = {f"type_{i}": doc.doc_type for i, doc in enumerate(documents)}
+    type_list = ", ".join(f":{name}" for name in type_params)
+    rows = db.session.execute(text(
+        f"SELECT doc_type, doc_id, -bm25({FTS_TABLE}, 5.0, 1.0) AS score, "
+        f"highlight({FTS_TABLE}, 0, :start, :stop) AS title, "
+        f"snippet({FTS_TABLE}, 1, :start, :stop, '…', 16) AS snippet "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query AND user_id = :user_id "
+        f"AND doc_type IN ({type_list}) ORDER BY bm25({FTS_TABLE}, 5.0, 1.0) LIMIT :limit"
+    ), {"query": _fts_query(terms), "user_id": user_id, "start": _START, "stop": _STOP,
+        "limit": limit, **type_params}).all()
+    return [_result(*row) for row in rows]
+
+
+def _search_postgresql(user_id, terms, documents, limit) -> List[dict]:
+    tsquery = func.to_tsquery(TS_CONFIG, _ts_query(terms))
+    ranked = union_all(*(
+        select(
+            literal(doc.doc_type).label("doc_type"),
+            doc.model.id.label("doc_id"),
+            func.ts_rank(literal_column(f"{doc.table}.search_vector"), tsquery).label("score"),
+        ).where(doc.model.user_id == user_id, literal_column(f"{doc.table}.search_vector").op("@@")(tsquery))
+        for doc in documents
+    )).subquery()
+    top = db.session.execute(
+        select(ranked).order_by(ranked.c.score.desc(), ranked.c.doc_type, ranked.c.doc_id.desc()).limit(limit)
+    ).all()
+
+    # Headlines are expensive, so only the returned rows get one (one query per type)
+    options = f"StartSel={_START}, StopSel={_STOP}"
+    headlines = {}
+    for doc in documents:
+        ids = [row.doc_id for row in top if row.doc_type == doc.doc_type]
+        if not ids:
+            continue
+        body = func.concat_ws(" ", *doc.body_columns())
+        for doc_id, title, snippet in db.session.execute(
+            select(
+                doc.model.id,
+                func.ts_headline(TS_CONFIG, func.coalesce(doc.title_column(), ""), tsquery, f"{options}, HighlightAll=true"),
+                func.ts_headline(TS_CONFIG, body, tsquery, f"{options}, MaxWords=24, MinWords=8"),
+            ).where(doc.model.id.in_(ids))
+        ):
+            headlines[(doc.doc_type, doc_id)] = (title, snippet)
+    return [
+        _result(row.doc_type, row.doc_id, row.score, *headlines.get((row.doc_type, row.doc_id), ("", "")))
+        for row in top
+    ]
+
+
+def _search_like(user_id, terms, documents, limit) -> List[dict]:
+    results = []
+    for doc in documents:
+        body = doc.body_columns()
+        rows = db.session.execute(
+            select(doc.model.id, doc.title_column(), *body)
+            .where(doc.model.user_id == user_id, _like_filter(doc, terms))
+            .order_by(doc.model.id.desc())
+            .limit(limit)
+        ).all()
+        for row in rows:
+            text_body = " ".join(value for value in row[2:] if value)
+            results.append(_result(doc.doc_type, row[0], 0, row[1], text_body[:200]))
+    return results[:limit]
@@ -144,3 +144,22 @@ def require_json(f):
             return jsonify({"error": "Content-Type must be application/json"}), 415
         return f(*args, **kwargs)
     return wrapper
+
+
+def operator_user_ids() -> set:
+    """User IDs allowed to see server internals (``OPERATOR_USER_IDS``, comma-separated)."""
+    raw = os.environ.get("OPERATOR_USER_IDS", "")
+    return {part.strip() for part in raw.split(",") if part.strip()}
+
+
+def operator_required(f):
+    """Decorator that limits a ``jwt_required`` endpoint to ``OPERATOR_USER_IDS``."""
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        from flask import jsonify
+        from flask_jwt_extended import get_jwt_identity
+
+        if str(get_jwt_identity()) not in operator_user_ids():
+            return jsonify({"error": "Operator access required"}), 403
+        return f(*args, **kwargs)
+    return wrapper
@@ -93,6 +93,10 @@ class EmailCheckerService:
     on_email : callable
         Callback ``(user_id, EmailMessage, matched_rule)`` invoked for
         each new email that matches at least one rule.
+    on_emails : callable, optional
+        Callback ``(user_id, [(EmailMessage, matched_rule), ...])`` invoked
+        once per check with all new emails, so per-email work (LLM calls,
+        commits) can be batched.  Used instead of ``on_email`` when given.
     check_interval : int
         Seconds between inbox checks (default: 300 = 5 minutes).
     """
@@ -102,9 +106,11 @@ class EmailCheckerService:
         app=None,
         on_email: Optional[Callable] = None,
         check_interval: int = 300,
+        on_emails: Optional[Callable] = None,
     ):
         self._app = app
         self._on_email = on_email
+        self._on_emails = on_emails
         self._check_interval = check_interval
         self._accounts: Dict[str, dict] = {}  # user_id -> config
         self._rules: Dict[str, List[EmailRule]] = {}  # user_id -> rules
@@ -232,6 +238,7 @@ class EmailCheckerService:
     def _check_account(self, user_id: str, config: dict) -> List[EmailMessage]:
         """Check one account for new messages."""
         new_messages: List[EmailMessage] = []
+        matched: List[tuple] = []
         try:
             conn = self._connect(config)
             conn.select(config["folder"], readonly=True)
@@ -277,15 +284,7 @@ class EmailCheckerService:
                         # Default rule: create a note
                         matched_rule = EmailRule(name="default", action="note")
 
-                    if self._on_email:
-                        try:
-                            if self._app:
-                                with self._app.app_context():
-                                    self._on_email(user_id, parsed, matched_rule)
-                            else:
-                                self._on_email(user_id, parsed, matched_rule)
-                        except Exception as exc:
-                            logger.error("Email callback error: %s", exc)
+                    matched.append((parsed, matched_rule))
 
                 except Exception as exc:
                     logger.warning("Error processing email %s: %s", num, exc)
@@ -295,11 +294,32 @@ class EmailCheckerService:
         except Exception as exc:
             logger.error("IMAP connection error for user %s: %s", user_id, exc)
 
+        if matched:
+            self._dispatch(user_id, matched)
+
         if new_messages:
             logger.info("Found %d new email(s) for user %s", len(new_messages), user_id)
 
         return new_messages
 
+    def _dispatch(self, user_id: str, matched: List[tuple]) -> None:
+        """Hand the new emails to the batch callback, or one by one to ``on_email``."""
+        if self._on_emails:
+            calls = [(self._on_emails, (user_id, matched))]
+        elif self._on_email:
+            calls = [(self._on_email, (user_id, msg, rule)) for msg, rule in matched]
+        else:
+            return
+        for callback, args in calls:
+            try:
+                if self._app:
+                    with self._app.app_context():
+                        callback(*args)
+                else:
+                    callback(*args)
+            except Exception as exc:
+                logger.error("Email callback error: %s", exc)
+
     def _connect(self, config: dict) -> imaplib.IMAP4_SSL:
         """Create an IMAP connection."""
         if config.get("use_ssl", True):
@@ -32,6 +32,9 @@ SUPPORTED_EXTENSIONS = {
 # Maximum file size to process (5 MB)
 MAX_FILE_SIZE = 5 * 1024 * 1024
 
+# Events buffered for ``on_file_events`` before a flush is forced
+MAX_PENDING_EVENTS = 50
+
 
 class FileEvent:
     """Represents a file system event."""
@@ -67,6 +70,15 @@ class FileWatcherService:
         relevant file change is detected.
     poll_interval : int
         Seconds between polls in polling mode (default: 30).
+    on_file_events : callable, optional
+        Callback ``(user_id, [(FileEvent, content), ...])`` used instead of
+        ``on_file_event``: polling hands over each pass's changes at once,
+        watchdog events are collected for ``batch_delay`` seconds (or up to
+        ``MAX_PENDING_EVENTS``), so a folder being copied in is processed
+        as a few batches instead of file by file.
+    batch_delay : float
+        Seconds watchdog events are collected before a batch is flushed
+        (default: 2).
     """
 
     def __init__(
@@ -74,9 +86,16 @@ class FileWatcherService:
         app=None,
         on_file_event: Optional[Callable] = None,
         poll_interval: int = 30,
+        on_file_events: Optional[Callable] = None,
+        batch_delay: float = 2.0,
     ):
         self._app = app
         self._on_file_event = on_file_event
+        self._on_file_events = on_file_events
+        self._batch_delay = batch_delay
+        self._pending: Dict[str, List[tuple]] = {}  # user_id -> [(event, content), ...]
+        self._pending_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
         self._poll_interval = poll_interval
         self._watched_dirs: Dict[str, dict] = {}  # user_id -> {path, recursive, ...}
         self._file_hashes: Dict[str, str] = {}  # path -> hash
@@ -139,6 +158,7 @@ class FileWatcherService:
         if self._thread:
             self._thread.join(timeout=5)
             self._thread = None
+        self._flush()
         logger.info("File watcher stopped")
 
     def get_status(self) -> dict:
@@ -244,6 +264,8 @@ class FileWatcherService:
                 del self._file_hashes[fp]
                 self._handle_file_change(fp, "deleted")
 
+        self._flush()
+
     # ------------------------------------------------------------------
     # Internal: Shared helpers
     # ------------------------------------------------------------------
@@ -275,15 +297,43 @@ class FileWatcherService:
                 user_id = uid
                 break
 
-        if self._on_file_event and user_id:
-            try:
-                if self._app:
-                    with self._app.app_context():
-                        self._on_file_event(user_id, event, content)
-                else:
-                    self._on_file_event(user_id, event, content)
-            except Exception as exc:
-                logger.error("File event callback error: %s", exc)
+        if not user_id:
+            return
+        if self._on_file_events:
+            self._enqueue(user_id, event, content)
+        elif self._on_file_event:
+            self._run_callback(self._on_file_event, user_id, event, content)
+
+    def _run_callback(self, callback: Callable, *args) -> None:
+        try:
+            if self._app:
+                with self._app.app_context():
+                    callback(*args)
+            else:
+                callback(*args)
+        except Exception as exc:
+            logger.error("File event callback error: %s", exc)
+
+    def _enqueue(self, user_id: str, event: FileEvent, content: Optional[str]) -> None:
+        with self._pending_lock:
+            self._pending.setdefault(user_id, []).append((event, content))
+            full = sum(len(items) for items in self._pending.values()) >= MAX_PENDING_EVENTS
+            if not full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self._batch_delay, self._flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        if full:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Hand every pending event to ``on_file_events``, one call per user."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        for user_id, items in pending.items():
+            self._run_callback(self._on_file_events, user_id, items)
 
     def _index_directory(self, directory: str, recursive: bool) -> None:
         """Build initial hash index of files in a directory."""
@@ -0,0 +1,150 @@
+"""
+LLM enrichment for background ingestion.
+
+The email checker and the file watcher hand over their new items in
+batches (``on_emails`` / ``on_file_events``).  With
+``INGEST_AI_ENABLED=1`` the items of a batch are enriched through the
+user's LLM provider with the batched helpers, so a backlog of 50 emails
+costs a few requests instead of 50:
+
+- ``triage_emails``: emails that only matched the default rule are
+  classified as task, note or ignore (``classify_batch``), and the emails
+  that become tasks get a title, priority and due date
+  (``extract_json_batch``).
+- ``describe_files``: created or modified files get a title, category and
+  short summary for their note (``extract_json_batch``).
+
+Without the setting, or when the provider is unavailable or fails, items
+keep their rule-based handling; ingestion never waits on the LLM.
+"""
+from __future__ import annotations
+
+import dataclasses
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.llm.provider import LlmProvider
+from src.services.email_checker import EmailMessage, EmailRule
+from src.services.file_watcher import FileEvent
+
+logger = logging.getLogger(__name__)
+
+# Characters of an email body or file sent to the model
+EMAIL_TEXT_CHARS = 3000
+FILE_TEXT_CHARS = 4000
+
+EMAIL_CATEGORIES = ["task", "note", "ignore"]
+# Task.priority is low/medium/high (VALID_PRIORITIES in routes/tasks.py);
+# models still answer "urgent" now and then, which is filed as high
+TASK_PRIORITIES = {"low": "low", "medium": "medium", "high": "high", "urgent": "high"}
+NOTE_CATEGORIES = ("general", "meeting", "idea", "reference", "project")
+
+EMAIL_TASK_PROMPT = (
+    "Extract the action the recipient has to take from this email. Return JSON with: "
+    "title (concise and action-oriented, max 80 chars), "
+    "priority (low|medium|high), "
+    "due_date (YYYY-MM-DD, or null if none is mentioned)."
+)
+FILE_NOTE_PROMPT = (
+    "Describe this file for a personal notes app. Return JSON with: "
+    "title (max 80 chars), "
+    f"category ({'|'.join(NOTE_CATEGORIES)}), "
+    "summary (at most two sentences)."
+)
+
+
+def ingest_ai_enabled() -> bool:
+    return os.environ.get("INGEST_AI_ENABLED", "").strip().lower() in ("1", "true", "yes")
+
+
+def _get_provider(user_id: str) -> Optional[LlmProvider]:
+    if not ingest_ai_enabled():
+        return None
+    try:
+        from src.routes.llm_settings import get_provider_for_user
+
+        provider = get_provider_for_user(user_id)
+        return provider if provider.is_available() else None
+    except Exception as exc:
+        logger.warning("No LLM provider for ingestion (user %s): %s", user_id, exc)
+        return None
+
+
+def email_text(msg: EmailMessage) -> str:
+    return f"From: {msg.sender_name} <{msg.sender}>\nSubject: {msg.subject}\n\n{msg.body_text[:EMAIL_TEXT_CHARS]}"
+
+
+# ------------------------------------------------------------------
+# Emails
+# ------------------------------------------------------------------
+
+def triage_emails(
+    user_id: str,
+    items: List[Tuple[EmailMessage, EmailRule]],
+) -> List[Tuple[EmailMessage, EmailRule, Dict[str, Any]]]:
+    """
+    ``(email, rule, task_fields)`` for each item.  ``rule`` is the matched
+    rule, or a copy with the LLM's action for default-rule emails;
+    ``task_fields`` holds the extracted title/priority/due_date of tasks.
+    """
+    triaged = [(msg, rule, {}) for msg, rule in items]
+    provider = _get_provider(user_id)
+    if provider is None:
+        return triaged
+
+    try:
+        # User rules are explicit; only the catch-all default is left to the model
+        open_items = [i for i, (_, rule, _) in enumerate(triaged) if rule.name == "default"]
+        actions = provider.classify_batch([email_text(triaged[i][0]) for i in open_items], EMAIL_CATEGORIES)
+        for i, action in zip(open_items, actions):
+            msg, rule, fields = triaged[i]
+            triaged[i] = (msg, dataclasses.replace(rule, action=action), fields)
+
+        task_items = [i for i, (_, rule, _) in enumerate(triaged) if rule.action == "task"]
+        extracted = provider.extract_json_batch([email_text(triaged[i][0]) for i in task_items], EMAIL_TASK_PROMPT)
+        for i, data in zip(task_items, extracted):
+            triaged[i][2].update(_task_fields(data))
+    except Exception as exc:
+        logger.warning("Email triage failed for user %s, using the rules: %s", user_id, exc)
+        return [(msg, rule, {}) for msg, rule in items]
+    return triaged
+
+
+def _task_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {}
+    if isinstance(data.get("title"), str) and data["title"].strip():
+        fields["title"] = data["title"].strip()[:200]
+    priority = TASK_PRIORITIES.get(str(data.get("priority", "")).strip().lower())
+    if priority:
+        fields["priority"] = priority
+    if isinstance(data.get("due_date"), str) and data["due_date"].strip():
+        fields["due_date"] = data["due_date"].strip()[:50]
+    return fields
+
+
+# ------------------------------------------------------------------
+# Files
+# ------------------------------------------------------------------
+
+def describe_files(user_id: str, items: List[Tuple[FileEvent, str]]) -> List[Dict[str, Any]]:
+    """``{title, category, summary}`` (any may be missing) for each ``(event, content)``."""
+    descriptions: List[Dict[str, Any]] = [{} for _ in items]
+    provider = _get_provider(user_id)
+    if provider is None or not items:
+        return descriptions
+
+    texts = [f"File: {event.filename}\n\n{content[:FILE_TEXT_CHARS]}" for event, content in items]
+    try:
+        extracted = provider.extract_json_batch(texts, FILE_NOTE_PROMPT, tokens_per_item=150)
+    except Exception as exc:
+        logger.warning("File descriptions failed for user %s: %s", user_id, exc)
+        return descriptions
+    for description, data in zip(descriptions, extracted):
+        if isinstance(data.get("title"), str) and data["title"].strip():
+            description["title"] = data["title"].strip()[:200]
+        if str(data.get("category", "")).lower() in NOTE_CATEGORIES:
+            description["category"] = str(data["category"]).lower()
+        if isinstance(data.get("summary"), str) and data["summary"].strip():
+            description["summary"] = data["summary"].strip()
+    return descriptions
@@ -0,0 +1,119 @@
+"""
+Insight snapshots for MindFlow/Rovot.
+
+A snapshot is the per-user summary behind the assistant's
+``generate_insights`` tool, ``/api/ai/quick-insight`` and the Telegram
+``/status``, ``/insights`` and ``/ask`` commands.  It is built from GROUP BY
+aggregates and small top-N queries, so no table is ever hydrated in full.
+
+Snapshots are stored in the read cache (``src.response_cache``) under the
+user's ``insights`` generation, which committed writes to tasks,
+stakeholders or notes bump, so no worker serves a snapshot older than the
+last write.  Without a read cache backend every call builds a snapshot.
+
+Usage::
+
+    from src.services.insights import get_insight_snapshot
+
+    snapshot = get_insight_snapshot(user_id)
+    snapshot["data"]["tasks_summary"]["overdue_count"]
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import func
+
+from src.models.db import db
+from src.models.note import Note
+from src.models.stakeholder import Stakeholder
+from src.models.task import Task
+from src.pagination import priority_rank
+from src.response_cache import cached_value
+
+logger = logging.getLogger(__name__)
+
+# Entries in each top-N list
+TOP_N = 5
+HIGH_INFLUENCE = 8
+
+
+# ------------------------------------------------------------------
+# Building
+# ------------------------------------------------------------------
+
+def _counts(column, user_column, user_id, default: str) -> Dict[str, int]:
+    """``{value: count}`` for one column, with NULL folded into ``default``."""
+    counts: Dict[str, int] = {}
+    for value, count in db.session.query(column, func.count()).filter(user_column == user_id).group_by(column):
+        key = value or default
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def build_insight_snapshot(user_id: int) -> dict:
+    """Aggregate one user's tasks, stakeholders and notes (no caching)."""
+    today = datetime.utcnow().strftime('%Y-%m-%d')
+    not_done = db.or_(Task.status.is_(None), Task.status != 'done')
+
+    by_status = _counts(Task.status, Task.user_id, user_id, 'todo')
+    total_tasks = sum(by_status.values())
+    done_tasks = by_status.get('done', 0)
+    overdue_filter = (Task.user_id == user_id, Task.due_date.isnot(None), Task.due_date < today, not_done)
+    overdue_count = db.session.query(func.count(Task.id)).filter(*overdue_filter).scalar()
+
+    overdue = db.session.query(Task.title, Task.due_date, Task.priority).filter(*overdue_filter) \
+        .order_by(Task.due_date, Task.id).limit(TOP_N).all()
+    high_priority = db.session.query(Task.title, Task.due_date).filter(
+        Task.user_id == user_id, Task.priority.in_(('high', 'urgent')), not_done
+    ).order_by(priority_rank(Task.priority), Task.due_date.is_(None), Task.due_date, Task.id).limit(TOP_N).all()
+    pending = db.session.query(Task.title, Task.due_date, Task.priority).filter(
+        Task.user_id == user_id, not_done
+    ).order_by(Task.created_at.desc(), Task.id.desc()).limit(TOP_N).all()
+
+    by_sentiment = _counts(Stakeholder.sentiment, Stakeholder.user_id, user_id, 'neutral')
+    high_influence = db.session.query(Stakeholder.name, Stakeholder.company, Stakeholder.influence).filter(
+        Stakeholder.user_id == user_id, Stakeholder.influence >= HIGH_INFLUENCE
+    ).order_by(Stakeholder.influence.desc(), Stakeholder.name).limit(TOP_N * 2).all()
+
+    by_category = _counts(Note.category, Note.user_id, user_id, 'general')
+    recent_notes = db.session.query(func.substr(Note.content, 1, 100), Note.category).filter(
+        Note.user_id == user_id
+    ).order_by(Note.created_at.desc(), Note.id.desc()).limit(TOP_N).all()
+
+    data = {
+        "tasks_summary": {
+            "total": total_tasks,
+            "completed": done_tasks,
+            "completion_rate": round(done_tasks / total_tasks * 100, 1) if total_tasks > 0 else 0,
+            "overdue_count": overdue_count,
+            "overdue_tasks": [{"title": t.title, "due_date": t.due_date, "priority": t.priority} for t in overdue],
+            "high_priority_pending": [{"title": t.title, "due_date": t.due_date} for t in high_priority],
+            "by_status": by_status,
+            "by_priority": _counts(Task.priority, Task.user_id, user_id, 'medium'),
+        },
+        "stakeholders_summary": {
+            "total": sum(by_sentiment.values()),
+            "by_sentiment": by_sentiment,
+            "high_influence": [{"name": s.name, "company": s.company, "influence": s.influence} for s in high_influence],
+            "recent_contacts": [],
+        },
+        "notes_summary": {
+            "total": sum(by_category.values()),
+            "by_category": by_category,
+            "recent": [{"content": content, "category": category} for content, category in recent_notes],
+        },
+    }
+    return {
+        "data": data,
+        "pending_tasks": [{"title": t.title, "due_date": t.due_date, "priority": t.priority} for t in pending],
+        "built_at": datetime.utcnow().isoformat(),
+    }
+
+
+def get_insight_snapshot(user_id) -> dict:
+    """Cached snapshot for ``user_id`` (accepts the string JWT identity too)."""
+    user_id = int(user_id)
+    return cached_value("insights", user_id, lambda: build_insight_snapshot(user_id))
@@ -0,0 +1,430 @@
+"""
+Maintenance Scheduler for MindFlow/Rovot.
+
+Housekeeping that used to run inside GET handlers (and so on every page
+load) now runs here, in the background, on an interval:
+
+- ``purge_done_tasks``: delete cards that have sat in the "done" column
+  for longer than the retention period.
+- ``backfill_board_fields``: give legacy cards a ``board_column`` and a
+  ``board_position`` at the end of their column.
+- ``rebalance_ranks``: rewrite Kanban columns whose ``board_rank`` keys
+  got too long or are missing (see ``src.ranking``).
+- ``reconcile_stats``: recompute the ``user_task_stats`` analytics rollup
+  (see ``src.models.task_stats``) to repair drift from bulk writes.
+- ``embed_notes``: bring the per-user note embedding indexes up to date
+  (see ``src.services.note_embeddings``); only scheduled when enabled.
+
+Every job works per tenant in batched statements and commits per tenant,
+so a failure for one user never blocks the others.
+
+Every gunicorn worker starts a scheduler, but only the one holding the
+database-wide ``SchedulerLease`` runs jobs; the others retry the lease on
+each tick and take over when the holder exits.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.engine import Engine
+
+from src.models.board_version import bump_board_versions
+from src.models.db import db
+from src.models.task_stats import reconcile_task_stats, refresh_task_stats
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Cards in "done" longer than this are purged
+DONE_RETENTION = timedelta(days=1)
+# Rows per DELETE / UPDATE statement
+BATCH_SIZE = 500
+
+# Advisory lock key of the scheduler lease ("mindmain"); distinct from the migration lock
+_LEASE_LOCK_KEY = 0x6D696E646D61696E
+
+
+# ------------------------------------------------------------------
+# Jobs
+# ------------------------------------------------------------------
+
+def _board_models():
+    from src.models.enhanced_task import EnhancedTask
+    from src.models.task import Task
+
+    return Task, EnhancedTask
+
+
+def _stale_done(model, cutoff: datetime):
+    """Predicate for cards that have been done since before ``cutoff``."""
+    if hasattr(model, "completed_at"):
+        finished = db.or_(
+            db.and_(model.completed_at.isnot(None), model.completed_at < cutoff),
+            db.and_(model.completed_at.is_(None), model.updated_at < cutoff),
+        )
+    else:
+        finished = model.updated_at < cutoff
+    return db.and_(model.board_column == "done", finished)
+
+
+def purge_done_tasks(retention: timedelta = DONE_RETENTION, batch_size: int = BATCH_SIZE) -> int:
+    """Delete stale "done" cards, ``batch_size`` rows per statement. Returns rows deleted."""
+    Task, EnhancedTask = _board_models()
+    cutoff = datetime.utcnow() - retention
+    deleted = 0
+    for model in (Task, EnhancedTask):
+        stale = _stale_done(model, cutoff)
+        user_ids = db.session.execute(select(model.user_id).where(stale).distinct()).scalars().all()
+        for user_id in user_ids:
+            try:
+                while True:
+                    ids = db.session.execute(
+                        select(model.id).where(model.user_id == user_id, stale).limit(batch_size)
+                    ).scalars().all()
+                    if not ids:
+                        break
+                    if hasattr(model, "parent_task_id"):
+                        # Orphan subtasks instead of leaving a dangling foreign key
+                        db.session.execute(
+                            update(model).where(model.parent_task_id.in_(ids)).values(parent_task_id=None)
+                        )
+                    db.session.execute(delete(model).where(model.id.in_(ids)))
+                    bump_board_versions(db.session.connection(), [user_id])
+                    if model is EnhancedTask:
+                        refresh_task_stats(db.session.connection(), user_id)
+                    db.session.commit()
+                    deleted += len(ids)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Failed to purge done %s for user %s", model.__tablename__, user_id)
+    if deleted:
+        logger.info("Purged %d done task(s)", deleted)
+    return deleted
+
+
+def backfill_board_fields() -> int:
+    """Set missing ``board_column`` / ``board_position`` values. Returns values set."""
+    fixed = 0
+    for model in _board_models():
+        try:
+            user_ids = db.session.execute(
+                select(model.user_id).where(model.board_column.is_(None)).distinct()
+            ).scalars().all()
+            if user_ids:
+                fixed += db.session.execute(
+                    update(model).where(model.board_column.is_(None)).values(board_column="todo")
+                ).rowcount or 0
+                bump_board_versions(db.session.connection(), user_ids)
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Failed to backfill board_column on %s", model.__tablename__)
+            continue
+
+        columns = db.session.execute(
+            select(model.user_id, model.board_column).where(model.board_position.is_(None)).distinct()
+        ).all()
+        for user_id, column in columns:
+            in_column = db.and_(model.user_id == user_id, model.board_column == column)
+            try:
+                tail = db.session.execute(select(func.max(model.board_position)).where(in_column)).scalar() or 0
+                ids = db.session.execute(
+                    select(model.id).where(in_column, model.board_position.is_(None)).order_by(model.id)
+                ).scalars().all()
+                rows = [{"id": row_id, "board_position": tail + i} for i, row_id in enumerate(ids, start=1)]
+                for start in range(0, len(rows), BATCH_SIZE):
+                    db.session.execute(update(model), rows[start:start + BATCH_SIZE])
+                bump_board_versions(db.session.connection(), [user_id])
+                db.session.commit()
+                fixed += len(rows)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Failed to backfill board_position on %s for user %s", model.__tablename__, user_id)
+    if fixed:
+        logger.info("Backfilled board fields on %d task(s)", fixed)
+    return fixed
+
+
+def rebalance_ranks(max_length: Optional[int] = None) -> int:
+    """Rebalance Kanban columns with missing or over-long keys. Returns columns rewritten."""
+    from src.ranking import REBALANCE_RANK_LENGTH, rebalance_long_ranks
+
+    rebalanced = sum(
+        rebalance_long_ranks(model, max_length or REBALANCE_RANK_LENGTH)
+        for model in _board_models()
+    )
+    if rebalanced:
+        logger.info("Rebalanced %d Kanban column(s)", rebalanced)
+    return rebalanced
+
+
+def reconcile_stats() -> int:
+    """Recompute every analytics rollup row. Returns rows that had drifted."""
+    return reconcile_task_stats()
+
+
+def embed_notes() -> int:
+    """Embed new and changed notes. Returns notes embedded."""
+    from src.services.note_embeddings import sync_note_embeddings
+
+    return sync_note_embeddings()
+
+
+# ------------------------------------------------------------------
+# Scheduler
+# ------------------------------------------------------------------
+
+class SchedulerLease:
+    """
+    Database-wide lease electing the one process that runs maintenance jobs.
+
+    PostgreSQL uses a session-level advisory lock held on a dedicated
+    connection, so it is released when the process (or its connection)
+    goes away.  File-backed SQLite uses a non-blocking ``flock`` on a
+    sibling ``.maintenance.lock`` file.  In-memory databases are private
+    to the process and other dialects have no lock, so the lease is
+    always held there.
+
+    Parameters
+    ----------
+    engine : Engine
+        Engine of the database the jobs maintain.
+    """
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._conn = None
+        self._lock_file = None
+        self._held = False
+
+    @property
+    def held(self) -> bool:
+        return self._held
+
+    def acquire(self) -> bool:
+        """Take the lease if it is free, or confirm it is still held. Never blocks."""
+        if self._engine.dialect.name == "postgresql":
+            return self._acquire_advisory_lock()
+
+        database = self._engine.url.database if self._engine.dialect.name == "sqlite" else None
+        if not database or database == ":memory:" or fcntl is None:
+            self._held = True
+            return True
+        if self._lock_file is None:
+            lock_file = open(f"{os.path.abspath(database)}.maintenance.lock", "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._lock_file = lock_file
+            self._held = True
+        return True
+
+    def _acquire_advisory_lock(self) -> bool:
+        if self._conn is not None:
+            try:
+                # The lock lives as long as this connection
+                self._conn.execute(text("SELECT 1"))
+                return True
+            except Exception as exc:
+                logger.warning("Maintenance lease connection lost: %s", exc)
+                self.release()
+        conn = self._engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _LEASE_LOCK_KEY}).scalar()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        self._held = True
+        return True
+
+    def release(self) -> None:
+        """Give the lease up (no-op when it is not held)."""
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LEASE_LOCK_KEY})
+            except Exception:
+                pass  # closing the connection releases the lock as well
+            finally:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self._held = False
+
+
+@dataclass
+class MaintenanceJob:
+    """A callable run every ``interval`` seconds inside the app context."""
+    name: str
+    func: Callable[[], int]
+    interval: int
+    last_run: Optional[datetime] = None
+    last_result: Optional[int] = None
+    last_error: Optional[str] = None
+    next_run: float = 0.0
+
+
+class MaintenanceScheduler:
+    """
+    Background thread that runs maintenance jobs on their own intervals.
+
+    Parameters
+    ----------
+    app : Flask
+        Flask application instance (for app context).
+    jobs : list of MaintenanceJob
+        Jobs to run; defaults to ``default_jobs()``.
+    initial_delay : int
+        Seconds to wait after start before the first pass, so booting
+        workers do not all hit the database at once (default: 60).
+    tick : int
+        Seconds between checks for due jobs (default: 30).
+    lease : SchedulerLease, optional
+        Lease that must be held to run jobs; defaults to one on the app's
+        database engine.
+    """
+
+    def __init__(self, app=None, jobs: Optional[List[MaintenanceJob]] = None,
+                 initial_delay: int = 60, tick: int = 30,
+                 lease: Optional[SchedulerLease] = None):
+        self._app = app
+        self._lease = lease
+        self._jobs: Dict[str, MaintenanceJob] = {job.name: job for job in (jobs or default_jobs())}
+        self._initial_delay = initial_delay
+        self._tick = tick
+        self._running = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the scheduler in a background thread."""
+        if self._running:
+            return
+        self._running = True
+        self._stop.clear()
+        first_run = time.monotonic() + self._initial_delay
+        for job in self._jobs.values():
+            job.next_run = first_run
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        logger.info("Maintenance scheduler started (jobs=%s)", ", ".join(self._jobs))
+
+    def stop(self) -> None:
+        """Stop the scheduler."""
+        self._running = False
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self._lease is not None:
+            self._lease.release()
+        logger.info("Maintenance scheduler stopped")
+
+    def run_now(self, name: str) -> int:
+        """Run one job immediately. Raises KeyError for an unknown job."""
+        job = self._jobs[name]
+        with self._app.app_context():
+            try:
+                job.last_result = job.func()
+                job.last_error = None
+            except Exception as exc:
+                db.session.rollback()
+                job.last_error = str(exc)
+                logger.error("Maintenance job %s failed: %s", name, exc)
+                raise
+            finally:
+                job.last_run = datetime.utcnow()
+                job.next_run = time.monotonic() + job.interval
+        return job.last_result
+
+    def get_status(self) -> dict:
+        """Return the current status of the scheduler and its jobs."""
+        return {
+            "running": self._running,
+            "leader": self._lease is not None and self._lease.held,
+            "jobs": {
+                job.name: {
+                    "interval": job.interval,
+                    "last_run": job.last_run.isoformat() if job.last_run else None,
+                    "last_result": job.last_result,
+                    "last_error": job.last_error,
+                }
+                for job in self._jobs.values()
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _is_leader(self) -> bool:
+        was_leader = self._lease is not None and self._lease.held
+        try:
+            with self._app.app_context():
+                if self._lease is None:
+                    # Created on first use: the scheduler starts before the app's database is set up
+                    self._lease = SchedulerLease(db.engine)
+                leader = self._lease.acquire()
+        except Exception as exc:
+            logger.warning("Maintenance lease check failed: %s", exc)
+            leader = False
+        if leader != was_leader:
+            logger.info("Maintenance scheduler %s the lease", "acquired" if leader else "lost")
+        return leader
+
+    def _loop(self) -> None:
+        while self._running:
+            now = time.monotonic()
+            # Dict order is job order: backfill before rebalance, etc.
+            due = [job for job in self._jobs.values() if job.next_run <= now]
+            # The lease is only checked when there is work, never during the initial delay
+            if due and self._is_leader():
+                for job in due:
+                    if not self._running:
+                        break
+                    try:
+                        self.run_now(job.name)
+                    except Exception:
+                        pass  # already logged and recorded in get_status()
+            self._stop.wait(self._tick)
+
+
+def default_jobs(purge_interval: int = 3600, backfill_interval: int = 3600,
+                 rebalance_interval: int = 600, reconcile_interval: int = 3600,
+                 embed_interval: Optional[int] = None) -> List[MaintenanceJob]:
+    """The standard job set, in the order they should run. ``embed_notes`` only with an interval."""
+    jobs = [
+        MaintenanceJob("purge_done_tasks", purge_done_tasks, purge_interval),
+        MaintenanceJob("backfill_board_fields", backfill_board_fields, backfill_interval),
+        MaintenanceJob("rebalance_ranks", rebalance_ranks, rebalance_interval),
+        MaintenanceJob("reconcile_stats", reconcile_stats, reconcile_interval),
+    ]
+    if embed_interval:
+        jobs.append(MaintenanceJob("embed_notes", embed_notes, embed_interval))
+    return jobs
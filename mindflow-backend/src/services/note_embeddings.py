@@ -0,0 +1,478 @@
+"""
+Semantic search over notes for MindFlow/Rovot.
+
+Notes are embedded in batches through the configured ``LlmProvider``
+(OpenAI, or a local Ollama / LM Studio endpoint) and stored per user as a
+memory-mapped float32 matrix::
+
+    <NOTE_EMBEDDINGS_DIR>/user_<id>/
+        manifest.json       model, dimensions, rows, capacity, sync watermark
+        vectors.<gen>.f32   capacity x dim float32, rows L2-normalised
+        ids.<gen>.i64       note id per row (-1 = free slot)
+        hashes.<gen>.bin    16-byte content hash per row
+
+A query is one matrix-vector product over the mapped rows and an
+``argpartition`` top-k; the OS page cache shares the matrix between
+workers.  Syncing is incremental: only notes updated since the watermark
+are read, text whose content hash is unchanged is never re-embedded, and
+identical text reuses an existing vector.  The ``embed_notes`` maintenance
+job runs the sync; readers pick up a new manifest on their next query.
+
+Set ``NOTE_EMBEDDINGS_ENABLED=1`` to turn the feature on (embedding calls
+may cost money on hosted providers).  NumPy is required.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select
+
+from src.models.db import db
+from src.models.note import Note
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_DIR = os.environ.get("NOTE_EMBEDDINGS_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "database", "embeddings"
+)
+# Notes sent to the embedding endpoint per request
+EMBED_BATCH_SIZE = 64
+# Characters of a note (title + content) that are embedded
+MAX_EMBED_CHARS = 8000
+INITIAL_CAPACITY = 1024
+DEFAULT_SEMANTIC_LIMIT = 10
+MAX_SEMANTIC_LIMIT = 50
+# Open indexes and query vectors kept per process
+READER_CACHE_SIZE = 64
+QUERY_CACHE_SIZE = 512
+HASH_BYTES = 16
+
+
+class EmbeddingsUnavailable(RuntimeError):
+    """Raised when semantic search is disabled or cannot run."""
+
+
+def embeddings_enabled() -> bool:
+    return os.environ.get("NOTE_EMBEDDINGS_ENABLED", "").strip().lower() in ("1", "true", "yes")
+
+
+def note_text(title: Optional[str], content: Optional[str]) -> str:
+    """The text of a note that is embedded."""
+    text = f"{title}\n\n{content or ''}" if title else (content or "")
+    return text[:MAX_EMBED_CHARS]
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=HASH_BYTES).digest()
+
+
+def _normalise(vectors):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _provider():
+    from src.llm.factory import get_llm_provider
+
+    return get_llm_provider()
+
+
+def _user_dir(user_id: int) -> str:
+    return os.path.join(EMBEDDINGS_DIR, f"user_{int(user_id)}")
+
+
+# ------------------------------------------------------------------
+# On-disk index
+# ------------------------------------------------------------------
+
+class NoteEmbeddingIndex:
+    """
+    One user's note vectors.
+
+    Parameters
+    ----------
+    directory : str
+        The user's index directory (created on first write).
+    writable : bool
+        Map the arrays read-write; only do this while holding ``write_lock``.
+    """
+
+    def __init__(self, directory: str, writable: bool = False):
+        self.directory = directory
+        self.writable = writable
+        self.manifest: dict = {}
+        self.vectors = self.ids = self.hashes = None
+        self._stamp = None
+        self._obsolete: List[str] = []
+        self._load()
+
+    @property
+    def rows(self) -> int:
+        return self.manifest.get("rows", 0)
+
+    @property
+    def model(self) -> Optional[str]:
+        return self.manifest.get("model")
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _manifest_stamp(self):
+        try:
+            stat = os.stat(self._path("manifest.json"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def is_stale(self) -> bool:
+        """True when a writer has published a newer manifest."""
+        return self._manifest_stamp() != self._stamp
+
+    def _load(self) -> None:
+        self._stamp = self._manifest_stamp()
+        if self._stamp is None:
+            return
+        with open(self._path("manifest.json")) as fh:
+            self.manifest = json.load(fh)
+        if "vectors" not in self.manifest:
+            return
+        capacity, dim = self.manifest["capacity"], self.manifest["dim"]
+        mode = "r+" if self.writable else "r"
+        self.vectors = np.memmap(self._path(self.manifest["vectors"]), dtype=np.float32, mode=mode, shape=(capacity, dim))
+        self.ids = np.memmap(self._path(self.manifest["ids"]), dtype=np.int64, mode=mode, shape=(capacity,))
+        self.hashes = np.memmap(self._path(self.manifest["hashes"]), dtype=np.uint8, mode=mode, shape=(capacity, HASH_BYTES))
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def live_count(self) -> int:
+        return int(np.count_nonzero(self.ids[:self.rows] >= 0)) if self.rows else 0
+
+    def search(self, query_vector, limit: int) -> List[Tuple[int, float]]:
+        """``(note_id, cosine similarity)`` of the ``limit`` closest notes, best first."""
+        rows = self.rows
+        if not rows:
+            return []
+        scores = np.asarray(self.vectors[:rows] @ query_vector)
+        scores[np.asarray(self.ids[:rows]) < 0] = -np.inf
+        k = min(limit, rows)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    # ------------------------------------------------------------------
+    # Writing (under write_lock)
+    # ------------------------------------------------------------------
+
+    def clear(self) -> None:
+        """Drop every row, e.g. when the embedding model changes."""
+        self._obsolete.extend(self.manifest[key] for key in ("vectors", "ids", "hashes") if key in self.manifest)
+        self.vectors = self.ids = self.hashes = None
+        self.manifest = {"generation": self.manifest.get("generation", 0), "rows": 0}
+
+    def allocate(self, capacity: int, dim: int, keep_rows: int = 0) -> None:
+        """Map fresh arrays of ``capacity`` rows, copying the first ``keep_rows``."""
+        generation = self.manifest.get("generation", 0) + 1
+        names = {
+            "vectors": f"vectors.{generation}.f32",
+            "ids": f"ids.{generation}.i64",
+            "hashes": f"hashes.{generation}.bin",
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        vectors = np.memmap(self._path(names["vectors"]), dtype=np.float32, mode="w+", shape=(capacity, dim))
+        ids = np.memmap(self._path(names["ids"]), dtype=np.int64, mode="w+", shape=(capacity,))
+        hashes = np.memmap(self._path(names["hashes"]), dtype=np.uint8, mode="w+", shape=(capacity, HASH_BYTES))
+        ids[:] = -1
+        if keep_rows:
+            vectors[:keep_rows] = self.vectors[:keep_rows]
+            ids[:keep_rows] = self.ids[:keep_rows]
+            hashes[:keep_rows] = self.hashes[:keep_rows]
+        # Readers may still map the old files; they are unlinked after the manifest moves on
+        self._obsolete.extend(self.manifest[key] for key in names if key in self.manifest)
+        self.vectors, self.ids, self.hashes = vectors, ids, hashes
+        self.manifest.update(names, capacity=capacity, dim=dim, generation=generation, rows=keep_rows)
+
+    def publish(self, **fields) -> None:
+        """Flush the arrays and atomically replace the manifest."""
+        for array in (self.vectors, self.ids, self.hashes):
+            if array is not None:
+                array.flush()
+        self.manifest.update(fields)
+        tmp = self._path("manifest.json.tmp")
+        with open(tmp, "w") as fh:
+            json.dump(self.manifest, fh)
+        os.replace(tmp, self._path("manifest.json"))
+        self._stamp = self._manifest_stamp()
+        for name in self._obsolete:
+            with contextlib.suppress(OSError):
+                os.remove(self._path(name))
+        self._obsolete.clear()
+
+
+@contextlib.contextmanager
+def write_lock(directory: str) -> Iterator[bool]:
+    """Exclusive, non-blocking lock on a user's index; yields False if another process holds it."""
+    os.makedirs(directory, exist_ok=True)
+    if fcntl is None:
+        yield True
+        return
+    with open(os.path.join(directory, ".lock"), "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ------------------------------------------------------------------
+# Sync
+# ------------------------------------------------------------------
+
+class _Writer:
+    """Row bookkeeping for one sync of one index."""
+
+    def __init__(self, index: NoteEmbeddingIndex):
+        self.index = index
+        self.row_of: Dict[int, int] = {}
+        self.by_hash: Dict[bytes, int] = {}
+        self.free: List[int] = []
+        for row in range(index.rows):
+            note_id = int(index.ids[row])
+            if note_id < 0:
+                self.free.append(row)
+            else:
+                self.row_of[note_id] = row
+                self.by_hash[bytes(index.hashes[row])] = row
+
+    def unchanged(self, note_id: int, digest: bytes) -> bool:
+        row = self.row_of.get(note_id)
+        return row is not None and bytes(self.index.hashes[row]) == digest
+
+    def known_vector(self, digest: bytes):
+        row = self.by_hash.get(digest)
+        return None if row is None else np.array(self.index.vectors[row])
+
+    def remove(self, note_id: int) -> None:
+        row = self.row_of.pop(note_id)
+        self._forget_hash(row)
+        self.index.ids[row] = -1
+        self.free.append(row)
+
+    def put(self, note_id: int, digest: bytes, vector) -> None:
+        index = self.index
+        if index.vectors is None:
+            index.allocate(INITIAL_CAPACITY, len(vector))
+        row = self.row_of.get(note_id)
+        if row is not None:
+            self._forget_hash(row)
+        elif self.free:
+            row = self.free.pop()
+        else:
+            if index.rows == index.manifest["capacity"]:
+                index.allocate(index.manifest["capacity"] * 2, index.manifest["dim"], keep_rows=index.rows)
+            row = index.rows
+            index.manifest["rows"] = row + 1
+        # Vector before id, so a concurrent reader never scores a half-written row
+        index.vectors[row] = vector
+        index.hashes[row] = np.frombuffer(digest, dtype=np.uint8)
+        index.ids[row] = note_id
+        self.row_of[note_id] = row
+        self.by_hash[digest] = row
+
+    def _forget_hash(self, row: int) -> None:
+        digest = bytes(self.index.hashes[row])
+        if self.by_hash.get(digest) == row:
+            del self.by_hash[digest]
+
+
+def sync_user_embeddings(user_id: int, provider=None) -> int:
+    """
+    Bring one user's index up to date with their notes. Returns notes embedded.
+
+    Skips (returns 0) when another process is syncing the same user.
+    """
+    provider = provider or _provider()
+    model = provider.embedding_model
+    directory = _user_dir(user_id)
+    with write_lock(directory) as acquired:
+        if not acquired:
+            return 0
+        index = NoteEmbeddingIndex(directory, writable=True)
+        if index.model is not None and index.model != model:
+            logger.info("Embedding model changed to %s, rebuilding note index for user %s", model, user_id)
+            index.clear()
+        writer = _Writer(index)
+        watermark = index.manifest.get("synced_at")
+
+        # Read the new watermark first; notes updated while we scan are picked up next time
+        new_watermark = db.session.execute(
+            select(func.max(Note.updated_at)).where(Note.user_id == user_id)
+        ).scalar()
+        current_ids = set(db.session.execute(select(Note.id).where(Note.user_id == user_id)).scalars())
+        for note_id in [note_id for note_id in writer.row_of if note_id not in current_ids]:
+            writer.remove(note_id)
+
+        changed = select(Note.id, Note.title, Note.content).where(Note.user_id == user_id)
+        if watermark is not None:
+            since = datetime.fromisoformat(watermark)
+            changed = changed.where(or_(Note.updated_at.is_(None), Note.updated_at >= since))
+        embedded = 0
+        pending: List[Tuple[int, bytes, str]] = []
+
+        def flush_pending():
+            nonlocal embedded
+            vectors = _normalise(provider.embed([text for _, _, text in pending], model=model))
+            for (note_id, digest, _), vector in zip(pending, vectors):
+                writer.put(note_id, digest, vector)
+            embedded += len(pending)
+            pending.clear()
+            # Publish progress so a long first build is searchable as it goes
+            index.publish(model=model)
+
+        for note_id, title, content in db.session.execute(changed.execution_options(yield_per=1000)):
+            text = note_text(title, content)
+            digest = content_hash(text)
+            if writer.unchanged(note_id, digest):
+                continue
+            vector = writer.known_vector(digest)
+            if vector is not None:
+                writer.put(note_id, digest, vector)
+                continue
+            pending.append((note_id, digest, text))
+            if len(pending) >= EMBED_BATCH_SIZE:
+                flush_pending()
+        if pending:
+            flush_pending()
+
+        index.publish(
+            model=model,
+            synced_at=new_watermark.isoformat() if new_watermark else watermark,
+            notes=len(current_ids),
+        )
+        return embedded
+
+
+def sync_note_embeddings(provider=None) -> int:
+    """Sync every user whose notes changed since their last sync. Returns notes embedded."""
+    if np is None or not embeddings_enabled():
+        return 0
+    provider = provider or _provider()
+    embedded = 0
+    for user_id, count, last_update in db.session.execute(
+        select(Note.user_id, func.count(), func.max(Note.updated_at)).group_by(Note.user_id)
+    ).all():
+        manifest = NoteEmbeddingIndex(_user_dir(user_id)).manifest
+        if (manifest.get("model") == provider.embedding_model and manifest.get("notes") == count
+                and manifest.get("synced_at") == (last_update.isoformat() if last_update else None)):
+            continue
+        try:
+            embedded += sync_user_embeddings(user_id, provider)
+        except Exception:
+            logger.exception("Failed to embed notes for user %s", user_id)
+    if embedded:
+        logger.info("Embedded %d note(s)", embedded)
+    return embedded
+
+
+# ------------------------------------------------------------------
+# Search
+# ------------------------------------------------------------------
+
+_readers: "OrderedDict[int, NoteEmbeddingIndex]" = OrderedDict()
+_query_vectors: "OrderedDict[tuple, object]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _reader(user_id: int) -> NoteEmbeddingIndex:
+    with _cache_lock:
+        index = _readers.get(user_id)
+        if index is None or index.is_stale():
+            try:
+                index = NoteEmbeddingIndex(_user_dir(user_id))
+            except FileNotFoundError:
+                # A writer replaced the arrays between reading the manifest and mapping them
+                index = NoteEmbeddingIndex(_user_dir(user_id))
+            _readers[user_id] = index
+        _readers.move_to_end(user_id)
+        while len(_readers) > READER_CACHE_SIZE:
+            _readers.popitem(last=False)
+        return index
+
+
+def _query_vector(provider, query: str):
+    key = (provider.embedding_model, query)
+    with _cache_lock:
+        vector = _query_vectors.get(key)
+        if vector is not None:
+            _query_vectors.move_to_end(key)
+            return vector
+    vector = _normalise(provider.embed([query]))[0]
+    with _cache_lock:
+        _query_vectors[key] = vector
+        while len(_query_vectors) > QUERY_CACHE_SIZE:
+            _query_vectors.popitem(last=False)
+    return vector
+
+
+def indexed_note_count(user_id) -> int:
+    if np is None:
+        return 0
+    return _reader(int(user_id)).live_count()
+
+
+def semantic_search(user_id, query: str, limit: int = DEFAULT_SEMANTIC_LIMIT, provider=None) -> List[dict]:
+    """
+    ``user_id``'s notes closest in meaning to ``query``, best first.
+
+    Each result is the note's ``to_dict()`` plus ``score`` (cosine
+    similarity).  Raises EmbeddingsUnavailable when the feature is off,
+    NumPy is missing or the index was built with another model.
+    """
+    if np is None:
+        raise EmbeddingsUnavailable("Semantic search needs NumPy")
+    if not embeddings_enabled():
+        raise EmbeddingsUnavailable("Semantic search is disabled (set NOTE_EMBEDDINGS_ENABLED=1)")
+    user_id = int(user_id)
+    limit = max(1, min(int(limit), MAX_SEMANTIC_LIMIT))
+    provider = provider or _provider()
+
+    index = _reader(user_id)
+    if not index.rows:
+        return []
+    if index.model != provider.embedding_model:
+        raise EmbeddingsUnavailable("The note index is being rebuilt for a new embedding model")
+    vector = _query_vector(provider, query)
+    if vector.shape[0] != index.manifest["dim"]:
+        raise EmbeddingsUnavailable("Query and index embeddings have different dimensions")
+
+    hits = index.search(vector, limit)
+    notes = {
+        note.id: note
+        for note in Note.query.filter(Note.user_id == user_id, Note.id.in_([note_id for note_id, _ in hits]))
+    }
+    return [dict(notes[note_id].to_dict(), score=round(score, 4)) for note_id, score in hits if note_id in notes]
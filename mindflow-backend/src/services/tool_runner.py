@@ -0,0 +1,208 @@
+"""
+Execution of the assistant's tool calls for one chat turn.
+
+The model may ask for several tools at once ("add these five tasks",
+"show my overdue tasks and my notes about Acme").  ``ToolRunner.run``
+executes them as one unit of work:
+
+- Read-only tools that come before any write run concurrently, each in a
+  pool thread with its own app context and session.
+- The remaining calls run in order on the request's session.  Executors
+  call ``save()`` instead of ``db.session.commit()``; inside a unit of work
+  that only flushes, and the runner commits once after the last call.
+- If a write raises or the commit fails, the turn is rolled back and every
+  write in it is reported as failed, so the model never confirms a change
+  that was not stored.
+
+Called outside a unit of work (the Telegram commands call executors
+directly), ``save()`` commits as before.
+
+Usage::
+
+    from src.services.tool_runner import ToolRunner, save
+
+    runner = ToolRunner(FUNCTION_MAP, read_only=READ_ONLY_TOOLS)
+    for outcome in runner.run(user_id, response.tool_calls):
+        outcome.result, outcome.duration_ms
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.llm.provider import ToolCall
+from src.models.db import db
+
+logger = logging.getLogger(__name__)
+
+# Threads shared by all requests for concurrent read tools
+TOOL_WORKERS = int(os.environ.get('TOOL_WORKERS', 4))
+
+_UNIT_OF_WORK_KEY = 'tool_runner_unit_of_work'
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix='tool')
+        return _pool
+
+
+# ------------------------------------------------------------------
+# Unit of work
+# ------------------------------------------------------------------
+
+def save(session=None) -> None:
+    """Commit, or only flush while a unit of work is open on *session*."""
+    session = session or db.session
+    if session.info.get(_UNIT_OF_WORK_KEY):
+        session.flush()
+    else:
+        session.commit()
+
+
+@contextmanager
+def unit_of_work(session=None):
+    """Turn ``save()`` calls into flushes and commit once on exit; roll back on error."""
+    session = session or db.session
+    session.info[_UNIT_OF_WORK_KEY] = True
+    try:
+        yield session
+        session.info.pop(_UNIT_OF_WORK_KEY, None)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop(_UNIT_OF_WORK_KEY, None)
+
+
+# ------------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------------
+
+@dataclass
+class ToolOutcome:
+    """Result of one tool call; ``executed`` is False for failed, skipped or rolled-back calls."""
+    call: ToolCall
+    result: Dict[str, Any] = field(default_factory=dict)
+    duration_ms: float = 0.0
+    executed: bool = False
+
+    def action(self) -> Dict[str, Any]:
+        """Entry for the ``actions`` list of the chat response."""
+        return {
+            "function": self.call.function_name,
+            "args": self.call.arguments,
+            "result": self.result,
+            "duration_ms": self.duration_ms,
+        }
+
+
+class _TurnAborted(Exception):
+    """A write failed; the unit of work is rolled back."""
+
+
+class ToolRunner:
+    """
+    Runs a turn's tool calls (see module docstring).
+
+    Parameters
+    ----------
+    executors : dict
+        Tool name -> ``executor(user_id, args) -> dict``.
+    read_only : iterable of str
+        Tools that never write and may run concurrently in other sessions.
+    """
+
+    def __init__(self, executors: Dict[str, Callable], read_only: Iterable[str] = ()):
+        self.executors = executors
+        self.read_only = frozenset(read_only)
+
+    def run(self, user_id: int, tool_calls: List[ToolCall]) -> List[ToolOutcome]:
+        """Execute *tool_calls* for *user_id* and return their outcomes in call order."""
+        outcomes = [ToolOutcome(call) for call in tool_calls]
+
+        # Reads ahead of the first write cannot depend on anything this turn writes
+        lead = 0
+        while lead < len(outcomes) and outcomes[lead].call.function_name in self.read_only:
+            lead += 1
+        if lead > 1:
+            self._run_concurrently(user_id, outcomes[:lead])
+        else:
+            lead = 0
+
+        inline = outcomes[lead:]
+        if inline:
+            self._run_unit_of_work(user_id, inline)
+        return outcomes
+
+    def _run_concurrently(self, user_id: int, outcomes: List[ToolOutcome]) -> None:
+        app = current_app._get_current_object()
+
+        def run_one(outcome):
+            # A fresh app context gets its own scoped session, removed on exit
+            with app.app_context():
+                self._execute(user_id, outcome)
+
+        for future in [_get_pool().submit(run_one, outcome) for outcome in outcomes]:
+            future.result()
+
+    def _run_unit_of_work(self, user_id: int, outcomes: List[ToolOutcome]) -> None:
+        writes: List[ToolOutcome] = []
+        failure = None
+        try:
+            with unit_of_work():
+                for index, outcome in enumerate(outcomes):
+                    is_write = outcome.call.function_name not in self.read_only
+                    if is_write:
+                        writes.append(outcome)
+                    try:
+                        self._execute(user_id, outcome, reraise=is_write)
+                    except Exception as exc:
+                        failure = f"{outcome.call.function_name} failed: {exc}"
+                        for skipped in outcomes[index + 1:]:
+                            skipped.result = {"success": False, "error": f"Not run because {failure}"}
+                        raise _TurnAborted(failure) from exc
+        except Exception as exc:
+            failure = failure or f"saving the changes failed: {exc}"
+            logger.warning("Tool calls rolled back for user %s: %s", user_id, failure)
+            for outcome in writes:
+                if outcome.executed:
+                    outcome.executed = False
+                    outcome.result = {"success": False, "error": f"Rolled back because {failure}"}
+
+    def _execute(self, user_id: int, outcome: ToolOutcome, reraise: bool = False) -> None:
+        call = outcome.call
+        executor = self.executors.get(call.function_name)
+        if executor is None:
+            outcome.result = {"success": False, "error": f"Unknown function: {call.function_name}"}
+            return
+
+        logger.info(f"Executing function: {call.function_name} with args: {json.dumps(call.arguments)}")
+        start = time.perf_counter()
+        try:
+            outcome.result = executor(user_id, call.arguments)
+            outcome.executed = True
+        except Exception as e:
+            logger.error(f"Function execution error: {e}")
+            outcome.result = {"success": False, "error": str(e)}
+            # A database error leaves the session unusable for the rest of the turn
+            if reraise or isinstance(e, SQLAlchemyError):
+                raise
+        finally:
+            outcome.duration_ms = round((time.perf_counter() - start) * 1000, 1)
@@ -0,0 +1,338 @@
+"""
+Fuzzy stakeholder lookup by name, company and email.
+
+Voice-transcribed names arrive misspelled ("Niclas Delfs" for "Nicolas
+Delfs"), so exact and prefix search miss them.  Matching here is by
+trigram similarity, the measure PostgreSQL's ``pg_trgm`` uses: each word is
+padded (``"  nicolas "``) and cut into three-character grams, and two
+strings score ``shared / (grams_a + grams_b - shared)``.
+
+Two backends, picked per database:
+
+- ``pg_trgm``: PostgreSQL with the extension installed.  GIN trigram
+  indexes on ``name``, ``company`` and ``email`` serve the ``%`` operator.
+- ``ngram``: everything else (SQLite desktop mode, or PostgreSQL without
+  the extension).  An in-process inverted trigram index per user, built
+  from three columns and cached; committed stakeholder writes invalidate
+  the owner's index.
+
+Migration 8 (``add_trigram_indexes``) installs the first one.
+
+Usage::
+
+    from src.stakeholder_match import find_duplicates, match_stakeholders
+
+    match_stakeholders(user_id, "niclas delfs")
+    find_duplicates(user_id, name="Niclas Delfs", company="Acme")
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, func, inspect, or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.models.db import db
+from src.models.stakeholder import Stakeholder
+from src.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MATCH_FIELDS = ("name", "company", "email")
+DEFAULT_MATCH_LIMIT = 5
+MAX_MATCH_LIMIT = 25
+# Lowest similarity returned by match_stakeholders (pg_trgm's default threshold)
+MATCH_THRESHOLD = 0.3
+# Lowest combined score at which a new stakeholder counts as a likely duplicate
+DUPLICATE_THRESHOLD = 0.5
+# Seconds an in-process index may be used before it is rebuilt; bounds how
+# long another worker's writes can go unnoticed
+INDEX_TTL = 300
+INDEX_CACHE_SIZE = 256
+
+_INVALIDATE_KEY = "stakeholder_match_users"
+
+
+# ------------------------------------------------------------------
+# Trigrams
+# ------------------------------------------------------------------
+
+def normalize(value: Optional[str]) -> str:
+    """Lower-case ``value`` and strip accents, so "Zürich" matches "Zurich"."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def trigrams(value: Optional[str]) -> FrozenSet[str]:
+    """pg_trgm-style trigram set of ``value``."""
+    grams = set()
+    for word in re.findall(r"[^\W_]+", normalize(value)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Trigram similarity of two strings, between 0 and 1."""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+
+# ------------------------------------------------------------------
+# In-process index
+# ------------------------------------------------------------------
+
+class NgramIndex:
+    """
+    Inverted trigram index over one user's stakeholders.
+
+    Parameters
+    ----------
+    rows : iterable of tuple
+        ``(id, name, company, email)`` rows.
+    """
+
+    def __init__(self, rows):
+        self.rows: Dict[int, tuple] = {}
+        self._grams: Dict[str, Dict[int, int]] = {field: {} for field in MATCH_FIELDS}
+        self._postings: Dict[str, Dict[str, List[int]]] = {field: defaultdict(list) for field in MATCH_FIELDS}
+        for row in rows:
+            row_id = row[0]
+            self.rows[row_id] = tuple(row)
+            for field, value in zip(MATCH_FIELDS, row[1:]):
+                grams = trigrams(value)
+                if not grams:
+                    continue
+                self._grams[field][row_id] = len(grams)
+                for gram in grams:
+                    self._postings[field][gram].append(row_id)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def scores(self, query: str, field: str) -> Dict[int, float]:
+        """Similarity of ``query`` to ``field`` for every row sharing a trigram with it."""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return {}
+        postings = self._postings[field]
+        shared = Counter(chain.from_iterable(postings.get(gram, ()) for gram in query_grams))
+        sizes = self._grams[field]
+        return {
+            row_id: count / (len(query_grams) + sizes[row_id] - count)
+            for row_id, count in shared.items()
+        }
+
+
+_indexes = TTLCache(ttl=INDEX_TTL, max_entries=INDEX_CACHE_SIZE)
+
+
+def _ngram_index(user_id: int) -> NgramIndex:
+    index = _indexes.get(user_id)
+    if index is None:
+        index = NgramIndex(db.session.execute(
+            select(Stakeholder.id, Stakeholder.name, Stakeholder.company, Stakeholder.email)
+            .where(Stakeholder.user_id == user_id)
+        ).all())
+        _indexes.put(user_id, index)
+    return index
+
+
+def invalidate_match_index(user_id) -> None:
+    """Drop ``user_id``'s in-process index, e.g. after bulk inserts that bypass the ORM."""
+    _indexes.invalidate(int(user_id))
+
+
+def index_cache_status() -> dict:
+    return _indexes.get_status()
+
+
+# ------------------------------------------------------------------
+# Backend detection
+# ------------------------------------------------------------------
+
+# Seconds before PostgreSQL without pg_trgm is checked again: migration 8
+# may install the extension in another worker after this one first matched
+NGRAM_RECHECK_SECONDS = 30
+
+_backends: Dict[str, Tuple[str, float]] = {}
+
+
+def match_backend(engine=None) -> str:
+    """``'pg_trgm'`` or ``'ngram'`` for ``engine`` (cached; PostgreSQL ``ngram`` is re-checked)."""
+    engine = engine or db.engine
+    key = engine.url.render_as_string(hide_password=True)
+    cached = _backends.get(key)
+    if cached is None or (cached[0] == "ngram" and cached[1] <= time.monotonic()):
+        backend = _detect_backend(engine)
+        recheck = NGRAM_RECHECK_SECONDS if engine.dialect.name == "postgresql" else float("inf")
+        cached = _backends[key] = (backend, time.monotonic() + recheck)
+    return cached[0]
+
+
+def _detect_backend(engine) -> str:
+    if engine.dialect.name != "postgresql":
+        return "ngram"
+    try:
+        with engine.connect() as conn:
+            if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+                return "pg_trgm"
+    except Exception as exc:
+        logger.warning("pg_trgm detection failed, using the in-process index: %s", exc)
+    return "ngram"
+
+
+def reset_backend_cache() -> None:
+    _backends.clear()
+
+
+def install_trigram_indexes(conn) -> Optional[str]:
+    """Enable pg_trgm and index the match fields (PostgreSQL only). Returns the backend."""
+    if conn.dialect.name != "postgresql":
+        return None
+    table = Stakeholder.__tablename__
+    if table not in inspect(conn).get_table_names():
+        return None
+    try:
+        # Needs CREATE privilege on the database; without it the ngram backend is used
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except SQLAlchemyError as exc:
+        logger.warning("Could not enable pg_trgm, stakeholder matching stays in-process: %s", exc)
+        return None
+    quoted = conn.dialect.identifier_preparer.quote(table)
+    for field in MATCH_FIELDS:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{field}_trgm ON {quoted} USING GIN ({field} gin_trgm_ops)"
+        ))
+    return "pg_trgm"
+
+
+# ------------------------------------------------------------------
+# Matching
+# ------------------------------------------------------------------
+
+def _candidate(row, score: float, field: str) -> dict:
+    return {
+        "id": row[0],
+        "name": row[1],
+        "company": row[2],
+        "email": row[3],
+        "score": round(score, 4),
+        "matched_on": field,
+    }
+
+
+def _field_scores(user_id: int, query: str, fields: Sequence[str], limit: int):
+    """``{id: (row, {field: score})}`` for rows similar to ``query`` on any of ``fields``."""
+    if match_backend() == "pg_trgm":
+        columns = [getattr(Stakeholder, field) for field in fields]
+        rows = db.session.execute(
+            select(
+                Stakeholder.id, Stakeholder.name, Stakeholder.company, Stakeholder.email,
+                *(func.coalesce(func.similarity(column, query), 0) for column in columns),
+            )
+            .where(Stakeholder.user_id == user_id, or_(*(column.op("%")(query) for column in columns)))
+            .order_by(func.greatest(*(func.coalesce(func.similarity(column, query), 0) for column in columns)).desc())
+            .limit(limit)
+        ).all()
+        return {row[0]: (tuple(row[:4]), dict(zip(fields, row[4:]))) for row in rows}
+
+    index = _ngram_index(user_id)
+    found: Dict[int, tuple] = {}
+    for field in fields:
+        for row_id, score in index.scores(query, field).items():
+            found.setdefault(row_id, (index.rows[row_id], {}))[1][field] = score
+    return found
+
+
+def match_stakeholders(user_id, query: str, limit: int = DEFAULT_MATCH_LIMIT,
+                       fields: Sequence[str] = MATCH_FIELDS, threshold: float = MATCH_THRESHOLD) -> List[dict]:
+    """
+    Stakeholders of ``user_id`` whose name, company or email resemble ``query``, best first.
+
+    Each candidate has ``id``, ``name``, ``company``, ``email``, ``score``
+    (0-1) and ``matched_on`` (the field that scored best).
+    """
+    user_id = int(user_id)
+    limit = max(1, min(int(limit), MAX_MATCH_LIMIT))
+    if not trigrams(query):
+        return []
+    candidates = []
+    for row, scores in _field_scores(user_id, query, fields, limit * 4).values():
+        field, score = max(scores.items(), key=lambda item: item[1])
+        if score >= threshold:
+            candidates.append(_candidate(row, score, field))
+    candidates.sort(key=lambda c: (-c["score"], c["name"] or "", c["id"]))
+    return candidates[:limit]
+
+
+def find_duplicates(user_id, name: Optional[str] = None, email: Optional[str] = None,
+                    company: Optional[str] = None, limit: int = 3,
+                    threshold: float = DUPLICATE_THRESHOLD) -> List[dict]:
+    """
+    Existing stakeholders that a new one with these details probably duplicates.
+
+    The same email (ignoring case) is a certain match.  Otherwise the name
+    must be similar; when both sides name a company it weighs in a fifth of
+    the score, so a namesake at another company ranks lower.
+    """
+    user_id = int(user_id)
+    candidates: Dict[int, dict] = {}
+    if email and email.strip():
+        for row in db.session.execute(
+            select(Stakeholder.id, Stakeholder.name, Stakeholder.company, Stakeholder.email)
+            .where(Stakeholder.user_id == user_id, func.lower(Stakeholder.email) == email.strip().lower())
+            .limit(limit)
+        ):
+            candidates[row[0]] = _candidate(row, 1.0, "email")
+
+    if name and trigrams(name):
+        for row, scores in _field_scores(user_id, name, ("name",), limit * 4).values():
+            if row[0] in candidates:
+                continue
+            score = scores["name"]
+            if company and row[2]:
+                score = 0.8 * score + 0.2 * similarity(company, row[2])
+            if score >= threshold:
+                candidates[row[0]] = _candidate(row, score, "name")
+
+    ranked = sorted(candidates.values(), key=lambda c: (-c["score"], c["id"]))
+    return ranked[:limit]
+
+
+# ------------------------------------------------------------------
+# Invalidation: collect owners on flush, drop their indexes on commit
+# ------------------------------------------------------------------
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    users = {
+        obj.user_id
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, Stakeholder)
+    }
+    if users:
+        session.info.setdefault(_INVALIDATE_KEY, set()).update(users)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop(_INVALIDATE_KEY, ()):
+        if user_id is not None:
+            _indexes.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop(_INVALIDATE_KEY, None)
@@ -0,0 +1,74 @@
+"""
+Small in-process cache with a TTL and LRU eviction.
+
+For per-user values that are expensive to build and cheap to rebuild,
+such as the stakeholder trigram index.  Entries live in one worker only;
+values other workers must see invalidated belong in the shared
+response cache (``src.response_cache``) instead.
+
+Usage::
+
+    from src.ttl_cache import TTLCache
+
+    _indexes = TTLCache(ttl=300, max_entries=256)
+    index = _indexes.get(user_id)
+    if index is None:
+        _indexes.put(user_id, build_index(user_id))
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU of values that expire ``ttl`` seconds after being stored.
+
+    Parameters
+    ----------
+    ttl : int
+        Seconds an entry stays valid.
+    max_entries : int
+        Least recently used entries are evicted beyond this size.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl": self._ttl}
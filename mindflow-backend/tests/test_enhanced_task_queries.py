@@ -0,0 +1,127 @@
+"""
+Query-count regression tests for the enhanced task list endpoints.
+
+``GET /api/tasks`` and ``GET /api/tasks/kanban`` serialize their tasks
+with ``EnhancedTask.to_dict_many``, so a request must cost a fixed number
+of statements (load, subtask counts, dependency statuses), however many
+tasks the user has.  The app here registers only the enhanced task
+blueprint, whose ``/tasks`` list the main app's ``tasks_bp`` would shadow.
+"""
+import contextlib
+import json
+import os
+import sys
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.db import db  # noqa: E402
+from src.models.user import User  # noqa: E402
+from src.models.stakeholder import Stakeholder  # noqa: E402,F401
+from src.models.task import Task  # noqa: E402,F401
+from src.models.note import Note  # noqa: E402,F401
+from src.models.enhanced_task import EnhancedTask  # noqa: E402
+from src.routes.enhanced_tasks import enhanced_tasks_bp  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['JWT_SECRET_KEY'] = 'test-secret-key-of-at-least-32-bytes'
+    JWTManager(app)
+    db.init_app(app)
+    app.register_blueprint(enhanced_tasks_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@contextlib.contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def seed_tasks(count):
+    """*count* tasks, each with a subtask, a dependency on the previous task and one on a done task"""
+    user = User(username=f'user{count}', email=f'user{count}@example.com')
+    db.session.add(user)
+    db.session.flush()
+
+    done = [EnhancedTask(user_id=user.id, title=f'Done {i}', status='done') for i in range(count)]
+    db.session.add_all(done)
+    db.session.flush()
+
+    tasks = []
+    for i in range(count):
+        task = EnhancedTask(user_id=user.id, title=f'Task {i}')
+        task.depends_on_tasks = json.dumps([done[i].id] + ([tasks[-1].id] if tasks else []))
+        db.session.add(task)
+        db.session.flush()
+        db.session.add(EnhancedTask(user_id=user.id, title=f'Subtask {i}', parent_task_id=task.id))
+        tasks.append(task)
+    db.session.commit()
+    return user.id
+
+
+def get(client, path, user_id):
+    """GET *path* as *user_id*; returns (JSON body, statement count)"""
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    db.session.expire_all()
+    with count_statements() as statements:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json(), len(statements)
+
+
+@pytest.mark.parametrize('path', ['/api/tasks', '/api/tasks/kanban'])
+def test_list_query_count_is_constant(client, path):
+    small_body, small = get(client, path, seed_tasks(3))
+    large_body, large = get(client, path, seed_tasks(40))
+
+    if path == '/api/tasks':
+        assert len(small_body['tasks']) == 3 * 3
+        assert len(large_body['tasks']) == 40 * 3
+    else:
+        assert sum(map(len, large_body['kanban'].values())) == 40 * 3
+    assert small == large
+
+
+def test_list_query_count(client):
+    _, count = get(client, '/api/tasks', seed_tasks(10))
+    # Load + subtask counts + dependency statuses
+    assert count <= 3
+
+
+def test_list_matches_to_dict(client):
+    user_id = seed_tasks(5)
+    body, _ = get(client, '/api/tasks', user_id)
+    tasks = EnhancedTask.query.filter(EnhancedTask.id.in_([t['id'] for t in body['tasks']])).all()
+    expected = {task.id: task.to_dict() for task in tasks}
+
+    for serialized in body['tasks']:
+        assert serialized['subtask_count'] == expected[serialized['id']]['subtask_count']
+        assert serialized['can_start'] == expected[serialized['id']]['can_start']
+    assert {t['subtask_count'] for t in body['tasks'] if t['title'].startswith('Task')} == {1}
@@ -83,21 +83,34 @@ const AIChatWidget = ({ onDataChange }) => {
         content: m.content
       }));
       
-      const response = await aiAPI.chat(text.trim(), history);
+      // Tokens are appended to a placeholder reply as they stream in
+      let streamed = '';
+      const result = await aiAPI.chatStream(text.trim(), history, (event, data) => {
+        if (event !== 'token') return;
+        streamed += data.text;
+        const content = streamed;
+        setMessages(prev => {
+          const last = prev[prev.length - 1];
+          if (last?.streaming) {
+            return [...prev.slice(0, -1), { ...last, content }];
+          }
+          return [...prev, { role: 'assistant', content, streaming: true, timestamp: new Date() }];
+        });
+      });
       
-      if (response.data?.success) {
+      if (result?.success) {
         const assistantMessage = {
           role: 'assistant',
-          content: response.data.message,
-          actions: response.data.actions || [],
-          hasActions: response.data.has_actions || false,
+          content: result.message,
+          actions: result.actions || [],
+          hasActions: result.has_actions || false,
           timestamp: new Date()
         };
         
-        setMessages(prev => [...prev, assistantMessage]);
+        setMessages(prev => [...prev.filter(m => !m.streaming), assistantMessage]);
         
         // If actions were taken (create/update/delete), notify parent to refresh data
-        if (response.data.has_actions && onDataChange) {
+        if (result.has_actions && onDataChange) {
           onDataChange();
         }
         
@@ -105,7 +118,7 @@ const AIChatWidget = ({ onDataChange }) => {
           setUnreadCount(prev => prev + 1);
         }
       } else {
-        throw new Error(response.data?.error || 'Unknown error');
+        throw new Error(result?.error || 'Unknown error');
       }
     } catch (error) {
       console.error('AI chat error:', error);
@@ -115,7 +128,7 @@ const AIChatWidget = ({ onDataChange }) => {
         isError: true,
         timestamp: new Date()
       };
-      setMessages(prev => [...prev, errorMessage]);
+      setMessages(prev => [...prev.filter(m => !m.streaming), errorMessage]);
     } finally {
       setIsLoading(false);
     }
@@ -345,8 +358,8 @@ const AIChatWidget = ({ onDataChange }) => {
             <div className="space-y-1">
               {messages.map((msg, i) => renderMessage(msg, i))}
               
-              {/* Loading indicator */}
-              {isLoading && (
+              {/* Loading indicator (until the reply starts streaming) */}
+              {isLoading && !messages[messages.length - 1]?.streaming && (
                 <div className="flex gap-2 mb-3">
                   <div className="w-7 h-7 rounded-full bg-gradient-to-br from-purple-500 to-indigo-600 flex items-center justify-center flex-shrink-0">
                     <Bot className="w-3.5 h-3.5 text-white" />
@@ -262,6 +262,9 @@ const EnhancedDashboard = () => {
   const [relationships, setRelationships] = useState([]);
   const [notes, setNotes] = useState([]);
   const [loading, setLoading] = useState(true);
+  // Cursor of the next page of each list, null once it is fully loaded
+  const [nextCursors, setNextCursors] = useState({ tasks: null, stakeholders: null, notes: null });
+  const [loadingMore, setLoadingMore] = useState(null);
   
   // Modal states
   const [isQuickAddOpen, setIsQuickAddOpen] = useState(false);
@@ -368,6 +371,11 @@ const EnhancedDashboard = () => {
       setTasks(tasksRes.data.tasks || []);
       setStakeholders(stakeholdersRes.data.stakeholders || []);
       setNotes(notesRes.data.notes || []);
+      setNextCursors({
+        tasks: tasksRes.data.next_cursor || null,
+        stakeholders: stakeholdersRes.data.next_cursor || null,
+        notes: notesRes.data.next_cursor || null,
+      });
       
       // Load relationships if available
       try {
@@ -386,6 +394,40 @@ const EnhancedDashboard = () => {
     }
   };
 
+  // Lists load one page at a time; the next page is fetched on demand
+  const pagedLists = {
+    tasks: { fetch: tasksAPI.getTasks, set: setTasks },
+    stakeholders: { fetch: stakeholdersAPI.getStakeholders, set: setStakeholders },
+    notes: { fetch: notesAPI.getNotes, set: setNotes },
+  };
+
+  const loadMore = async (key) => {
+    const cursor = nextCursors[key];
+    if (!cursor || loadingMore) return;
+    try {
+      setLoadingMore(key);
+      const response = await pagedLists[key].fetch({ cursor });
+      const items = response.data[key] || [];
+      pagedLists[key].set(prev => {
+        const seen = new Set(prev.map(item => item.id));
+        return [...prev, ...items.filter(item => !seen.has(item.id))];
+      });
+      setNextCursors(prev => ({ ...prev, [key]: response.data.next_cursor || null }));
+    } catch (error) {
+      console.error(`Failed to load more ${key}:`, error);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const renderLoadMore = (key) => nextCursors[key] && (
+    <div className="flex justify-center">
+      <Button variant="outline" onClick={() => loadMore(key)} disabled={loadingMore === key}>
+        {loadingMore === key ? 'Loading...' : 'Load more'}
+      </Button>
+    </div>
+  );
+
   // Enhanced content analysis with AI-like intelligence
   const analyzeContent = (text) => {
     const lowerText = text.toLowerCase();
@@ -1046,9 +1088,16 @@ const EnhancedDashboard = () => {
   };
 
   // Stakeholder management functions
-  const handleStakeholderClick = (stakeholder) => {
-    setSelectedStakeholder(stakeholder);
-    setIsStakeholderModalOpen(true);
+  const handleStakeholderClick = async (stakeholder) => {
+    try {
+      // The list holds the card view; the edit form needs every field
+      const response = await stakeholdersAPI.getStakeholder(stakeholder.id);
+      setSelectedStakeholder(response.data.stakeholder);
+      setIsStakeholderModalOpen(true);
+    } catch (error) {
+      console.error('Failed to load stakeholder:', error);
+      alert('Failed to load stakeholder details. Please try again.');
+    }
   };
 
   const handleStakeholderSave = async (stakeholderData) => {
@@ -1058,8 +1107,22 @@ const EnhancedDashboard = () => {
         await stakeholdersAPI.updateStakeholder(selectedStakeholder.id, stakeholderData);
         alert('Stakeholder updated successfully!');
       } else {
-        await stakeholdersAPI.createStakeholder(stakeholderData);
-        alert('Stakeholder created successfully!');
+        try {
+          await stakeholdersAPI.createStakeholder(stakeholderData);
+          alert('Stakeholder created successfully!');
+        } catch (error) {
+          const duplicate = error.response?.status === 409 && error.response.data?.duplicates?.[0];
+          if (!duplicate) throw error;
+          // A similar contact exists: merge into it, or create anyway
+          const label = duplicate.company ? `${duplicate.name} (${duplicate.company})` : duplicate.name;
+          if (window.confirm(`${label} looks like the same person. Merge the new details into that contact?\n\nCancel creates a separate contact.`)) {
+            await stakeholdersAPI.createStakeholder({ ...stakeholderData, merge_into: duplicate.id });
+            alert(`Merged into ${duplicate.name}.`);
+          } else {
+            await stakeholdersAPI.createStakeholder({ ...stakeholderData, allow_duplicate: true });
+            alert('Stakeholder created successfully!');
+          }
+        }
       }
       setIsStakeholderModalOpen(false);
       setSelectedStakeholder(null);
@@ -1382,6 +1445,7 @@ const EnhancedDashboard = () => {
           }}
         />
       )}
+      {renderLoadMore('tasks')}
     </div>
   );
 
@@ -1403,6 +1467,7 @@ const EnhancedDashboard = () => {
         relationships={relationships}
         onNodeClick={handleStakeholderClick}
       />
+      {renderLoadMore('stakeholders')}
     </div>
   );
 
@@ -1462,6 +1527,7 @@ const EnhancedDashboard = () => {
           </div>
         )}
       </div>
+      {renderLoadMore('notes')}
     </div>
   );
 
@@ -109,9 +109,16 @@ const KanbanBoard = ({
       }
     });
 
-    // Sort tasks within each column by board_position
+    // Sort tasks within each column by rank key (plain string order), then id
+    const byRank = (a, b) => {
+      if (a.board_rank && b.board_rank && a.board_rank !== b.board_rank) {
+        return a.board_rank < b.board_rank ? -1 : 1;
+      }
+      if (!a.board_rank !== !b.board_rank) return a.board_rank ? -1 : 1;
+      return (a.board_position || 0) - (b.board_position || 0) || a.id - b.id;
+    };
     Object.keys(organizedColumns).forEach(columnId => {
-      organizedColumns[columnId].tasks.sort((a, b) => (a.board_position || 0) - (b.board_position || 0));
+      organizedColumns[columnId].tasks.sort(byRank);
     });
 
     setColumns(organizedColumns);
@@ -186,32 +186,96 @@ export const authAPI = {
   changePassword: (passwordData) => api.put('/auth/change-password', passwordData),
 };
 
+// List endpoints are keyset-paginated: each call returns one page
+// ({ items, next_cursor }). Pass { cursor: next_cursor } to get the next one.
 export const tasksAPI = {
   getTasks: (params) => api.get('/tasks', { params }),
   createTask: (task) => api.post('/tasks', task),
   updateTask: (taskId, task) => api.put(`/tasks/${taskId}`, task),
   moveTask: (taskId, boardColumn, boardPosition) => api.post(`/tasks/${taskId}/move`, { board_column: boardColumn, board_position: boardPosition }),
+  batchMoveTasks: (operations) => api.post(`/tasks/board/batch`, { operations }),
   deleteTask: (taskId) => api.delete(`/tasks/${taskId}`),
   toggleTask: (taskId) => api.patch(`/tasks/${taskId}/toggle`),
 };
 
 export const stakeholdersAPI = {
-  getStakeholders: () => api.get('/stakeholders'),
+  // The list only needs the card fields; getStakeholder returns the full record
+  getStakeholders: (params) => api.get('/stakeholders', { params: { view: 'card', ...params } }),
+  getStakeholder: (stakeholderId) => api.get(`/stakeholders/${stakeholderId}`),
   createStakeholder: (stakeholder) => api.post('/stakeholders', stakeholder),
+  matchStakeholders: (q, limit = 5) => api.get('/stakeholders/match', { params: { q, limit } }),
   updateStakeholder: (stakeholderId, stakeholder) => api.put(`/stakeholders/${stakeholderId}`, stakeholder),
   deleteStakeholder: (stakeholderId) => api.delete(`/stakeholders/${stakeholderId}`),
 };
 
 export const notesAPI = {
-  getNotes: () => api.get('/notes'),
+  getNotes: (params) => api.get('/notes', { params }),
   createNote: (note) => api.post('/notes', note),
   updateNote: (noteId, note) => api.put(`/notes/${noteId}`, note),
   deleteNote: (noteId) => api.delete(`/notes/${noteId}`),
 };
 
+// Streams an AI chat turn as server-sent events. onEvent(event, data) sees
+// every token / tool_call / tool_result event; resolves with the final
+// payload ({ success, message, actions, has_actions }), the same shape as
+// aiAPI.chat returns in response.data. Non-stream replies (errors, expired
+// tokens) go through axios so its refresh handling applies.
+const streamChat = async (message, history, onEvent = () => {}) => {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('token') : null;
+  const response = await fetch(`${baseURL}/ai/chat`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+      ...(token ? { Authorization: `Bearer ${token.trim()}` } : {}),
+    },
+    body: JSON.stringify({ message, history }),
+  });
+  // Only replay the turn through axios when the server rejected it before running
+  // anything: the stream was refused (406/415) or the token needs refreshing (401).
+  // Any other failure may come after write tools ran, so it is surfaced instead.
+  if ([401, 406, 415].includes(response.status)) {
+    const fallback = await api.post('/ai/chat', { message, history });
+    return fallback.data;
+  }
+  const isStream = response.headers.get('Content-Type')?.startsWith('text/event-stream');
+  if (!response.ok || !isStream) {
+    const body = await response.json().catch(() => null);
+    if (response.ok && body) return body;
+    throw new Error(body?.error || `AI chat failed (HTTP ${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === 'error') throw new Error(payload.error || 'AI chat failed');
+      if (event === 'done') return payload;
+      onEvent(event, payload);
+    }
+  }
+  throw new Error('AI chat stream ended unexpectedly');
+};
+
 export const aiAPI = {
   parseContent: (text) => api.post('/ai/parse-content', { text }),
   chat: (message, history) => api.post('/ai/chat', { message, history }),
+  chatStream: streamChat,
   quickInsight: () => api.get('/ai/quick-insight'),
 };
 